@@ -1,13 +1,12 @@
 import streamlit as st
-import pyttsx3
 import speech_recognition as sr
 import json
 from PIL import Image
 import numpy as np
 import cv2
-from gtts import gTTS
-import tempfile
 import os
+from speech_service import AudioClip, get_speech_service
+from tts_service import get_tts_service
 
 class AccessibilityInterface:
     def __init__(self):
@@ -36,6 +35,8 @@ class AccessibilityInterface:
         }
         self.voice_settings = self.load_voice_settings()
         self.accessibility_preferences = {}
+        self.speech_service = get_speech_service()
+        self.tts_service = get_tts_service()
         
     def load_voice_settings(self):
         """Ses ayarlarını yükle"""
@@ -80,10 +81,8 @@ class AccessibilityInterface:
     def text_to_speech(self, text):
         """Metni sese çevir"""
         try:
-            tts = gTTS(text=text, lang='tr')
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-                tts.save(fp.name)
-                return fp.name
+            # Ses ayarları önbellek anahtarına dahildir ve çevrimdışı sentezde uygulanır
+            return self.tts_service.synthesize(text, 'tr', self.voice_settings)
         except Exception as e:
             st.error(f"Ses dönüşümü hatası: {str(e)}")
             return None
@@ -95,8 +94,8 @@ class AccessibilityInterface:
             st.write("Dinleniyor...")
             audio = recognizer.listen(source)
             try:
-                text = recognizer.recognize_google(audio, language='tr-TR')
-                return text
+                clip = AudioClip(audio.get_raw_data(convert_width=2), audio.sample_rate, 2)
+                return self.speech_service.transcribe(clip, 'tr-TR')
             except Exception as e:
                 st.error(f"Ses tanıma hatası: {str(e)}")
                 return None
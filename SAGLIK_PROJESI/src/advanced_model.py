@@ -5,8 +5,21 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
 import os
+from concurrent.futures import ThreadPoolExecutor
+from model_registry import get_registry
+from feature_encoding import FeatureEncoder
+from flat_forest import FlatForest
+
+MODEL_TYPES = ['diagnosis', 'severity', 'department']
+
+# Başlıkları eşzamanlı çalıştırmak için paylaşılan iş parçacığı havuzu
+_inference_pool = ThreadPoolExecutor(max_workers=len(MODEL_TYPES))
 
 class AdvancedMedicalModel:
+    # Düzleştirilmiş orman küçük girdilerde hızlıdır; büyük toplu girdilerde
+    # sklearn'ün derlenmiş dolaşımı daha verimli olduğundan ona dönülür
+    flat_max_rows = 256
+    
     def __init__(self):
         self.models = {
             'diagnosis': RandomForestClassifier(n_estimators=200, random_state=42),
@@ -15,7 +28,10 @@ class AdvancedMedicalModel:
         }
         
         self.best_models = {}
+        self.flat_models = {}
         self.feature_importance = {}
+        # load_models sonrası başlıklar ilk kullanımda diskten yüklenir
+        self.lazy_load = False
     
     def train_models(self, X, y, model_type):
         """Belirli bir tahmin türü için modeli eğitir"""
@@ -30,21 +46,75 @@ class AdvancedMedicalModel:
         print(f"Training score: {train_score:.4f}")
         
         self.best_models[model_type] = model
+        self.flat_models.pop(model_type, None)
         self.feature_importance[model_type] = model.feature_importances_
         
         return train_score
     
+    def get_estimator(self, model_type, n_rows=1):
+        """Tahmin için kullanılacak modeli döndürür (varsa düzleştirilmiş hali)"""
+        if n_rows <= self.flat_max_rows or not self.has_sklearn_model(model_type):
+            flat = self.load_flat_model(model_type)
+            if flat is not None:
+                return flat
+        model = self.load_sklearn_model(model_type)
+        if model is None:
+            raise ValueError(f"Model {model_type} not trained yet!")
+        return model
+    
+    def has_sklearn_model(self, model_type):
+        """Başlığın sklearn modeli bellekte ya da diskte var mı"""
+        return model_type in self.best_models or (
+            self.lazy_load and os.path.exists(f'models/{model_type}_model.pkl'))
+    
+    def load_flat_model(self, model_type):
+        """Düzleştirilmiş ormanı ilk kullanımda bellek eşlemeli olarak yükle"""
+        flat_path = f'models/{model_type}_flat'
+        if model_type not in self.flat_models and self.lazy_load and os.path.isdir(flat_path):
+            self.flat_models[model_type] = get_registry().get(
+                flat_path, loader=FlatForest.load
+            )
+        return self.flat_models.get(model_type)
+    
+    def load_sklearn_model(self, model_type):
+        """sklearn modelini ilk kullanımda yükle"""
+        model_path = f'models/{model_type}_model.pkl'
+        if model_type not in self.best_models and self.lazy_load and os.path.exists(model_path):
+            # Süreç genelindeki önbellekten al; dosya değişmediyse yeniden yüklenmez
+            self.best_models[model_type] = get_registry().get(model_path)
+        return self.best_models.get(model_type)
+    
     def predict(self, X, model_type):
         """Tahmin yapar"""
-        if model_type not in self.best_models:
-            raise ValueError(f"Model {model_type} not trained yet!")
-        return self.best_models[model_type].predict(X)
+        return self.get_estimator(model_type, X.shape[0]).predict(X)
     
     def predict_proba(self, X, model_type):
         """Tahmin olasılıklarını döndürür"""
-        if model_type not in self.best_models:
-            raise ValueError(f"Model {model_type} not trained yet!")
-        return self.best_models[model_type].predict_proba(X)
+        return self.get_estimator(model_type, X.shape[0]).predict_proba(X)
+    
+    def predict_all(self, X, model_types=None, parallel=False):
+        """Tüm başlıklar için olasılıkları ve etiketleri tek çağrıda döndürür
+
+        Her orman yalnızca bir kez dolaşılır; etiketler olasılıklardan türetilir
+        (RandomForestClassifier.predict ile aynı sonuç). parallel=True ise
+        başlıklar paylaşılan iş parçacığı havuzunda eşzamanlı çalışır.
+        """
+        if model_types is None:
+            model_types = MODEL_TYPES
+        # Tekrarlanan başlıkları bir kez hesapla
+        model_types = list(dict.fromkeys(model_types))
+        estimators = {model_type: self.get_estimator(model_type, X.shape[0])
+                      for model_type in model_types}
+        
+        def run_head(model_type):
+            model = estimators[model_type]
+            proba = model.predict_proba(X)
+            labels = model.classes_.take(np.argmax(proba, axis=1))
+            return model_type, {'proba': proba, 'labels': labels}
+        
+        if parallel and len(model_types) > 1:
+            return dict(_inference_pool.map(run_head, model_types))
+        return dict(map(run_head, model_types))
     
     def save_models(self):
         """Eğitilmiş modelleri kaydet"""
@@ -55,30 +125,42 @@ class AdvancedMedicalModel:
         if self.feature_importance:
             np.save('models/feature_importance.npy', self.feature_importance)
     
-    def load_models(self):
-        """Kaydedilmiş modelleri yükle"""
+    def export_flat_models(self, save=True):
+        """Eğitilmiş ormanları düzleştirilmiş NumPy dizilerine dönüştür"""
+        for model_type in MODEL_TYPES:
+            model = self.load_sklearn_model(model_type)
+            if model is None:
+                continue
+            self.flat_models[model_type] = FlatForest.from_sklearn(model)
+            if save:
+                os.makedirs('models', exist_ok=True)
+                self.flat_models[model_type].save(f'models/{model_type}_flat')
+    
+    def load_models(self, lazy=True):
+        """Kaydedilmiş modelleri yükle
+
+        lazy=True ise dosyalar yalnızca kontrol edilir; her başlık ilk
+        kullanıldığında yüklenir. Dışa aktarılmış düzleştirilmiş ormanlar
+        bellek eşlemeli açıldığından aynı makinedeki işçi süreçleri aynı
+        fiziksel sayfaları işletim sistemi önbelleği üzerinden paylaşır.
+        """
+        self.lazy_load = True
         try:
-            for model_type in ['diagnosis', 'severity', 'department']:
+            for model_type in MODEL_TYPES:
                 model_path = f'models/{model_type}_model.pkl'
-                if os.path.exists(model_path):
-                    self.best_models[model_type] = joblib.load(model_path)
-                else:
+                flat_path = f'models/{model_type}_flat'
+                if not os.path.exists(model_path) and not os.path.isdir(flat_path):
                     print(f"Warning: Model file {model_path} not found!")
+                elif not lazy:
+                    self.load_flat_model(model_type)
+                    self.load_sklearn_model(model_type)
         except Exception as e:
             print(f"Error loading models: {str(e)}")
 
 def prepare_features(df):
     """Özellik matrisini hazırla"""
-    # Belirti sütunlarını seç
-    symptom_cols = [col for col in df.columns if col.startswith('symptom_')]
-    
-    # Kronik hastalık sütunlarını seç
-    chronic_cols = [col for col in df.columns if col.startswith('chronic_')]
-    
-    # Temel özellikler
-    feature_cols = symptom_cols + ['age', 'gender_encoded'] + chronic_cols
-    
-    return df[feature_cols]
+    # Sütun düzeni arayüz ve toplu puanlayıcı ile aynı kodlayıcıdan gelir
+    return df[FeatureEncoder.from_columns(df.columns).columns]
 
 def train_and_evaluate():
     """Ana eğitim ve değerlendirme fonksiyonu"""
@@ -127,6 +209,7 @@ def train_and_evaluate():
         
         # Modelleri kaydet
         medical_model.save_models()
+        medical_model.export_flat_models()
         print("\nModels have been saved successfully!")
         
         return medical_model
@@ -137,5 +220,17 @@ def train_and_evaluate():
         print(traceback.format_exc())
         return None
 
+def export_saved_models():
+    """Kayıtlı .pkl modellerini yeniden eğitmeden düzleştirilmiş biçime aktar"""
+    medical_model = AdvancedMedicalModel()
+    medical_model.load_models()
+    medical_model.export_flat_models()
+    print(f"Exported flat models: {', '.join(medical_model.flat_models)}")
+    return medical_model
+
 if __name__ == "__main__":
-    trained_model = train_and_evaluate()
\ No newline at end of file
+    import sys
+    if sys.argv[1:] == ['export-flat']:
+        export_saved_models()
+    else:
+        trained_model = train_and_evaluate()
\ No newline at end of file
@@ -0,0 +1,215 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_BASE_URL = "http://api.openweathermap.org/data/2.5"
+
+# API bileşen adları -> uygulamadaki kirletici adları
+COMPONENTS = {
+    'PM2.5': 'pm2_5',
+    'PM10': 'pm10',
+    'O3': 'o3',
+    'NO2': 'no2'
+}
+
+
+class TokenBucket:
+    """İş parçacığı güvenli token bucket hız sınırlayıcı
+
+    Saniyede rate token eklenir, en fazla capacity token birikir. Tüm
+    oturumlar aynı kovayı paylaştığında API kotası birlikte korunur.
+    Bekleme, saatle birlikte verilen sleep ile yapılır (testlerde sahte
+    saat).
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = capacity
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, timeout=None):
+        """Token al; timeout içinde alınamazsa False döndür"""
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None and self.clock() + wait > deadline:
+                return False
+            self.sleep(wait)
+
+    def penalize(self, seconds):
+        """Sunucu yavaşlamamızı istediğinde kovayı seconds süresince boşalt"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+class AirQualityClient:
+    """Önbellekli ve hız sınırlı OpenWeatherMap hava kalitesi istemcisi
+
+    Konumlar tile_precision ondalığa yuvarlanmış enlem/boylam karolarına
+    eşlenir; aynı karodaki tüm istekler tek önbellek kaydını paylaşır.
+    ttl saniyeden genç kayıt doğrudan döner. stale_ttl'e kadar olan eski
+    kayıt da hemen döner, ama arka planda yenilenir. Daha eski veya hiç
+    olmayan kayıt için istek beklenir. Bağlantılar havuzlu bir oturumla
+    yeniden kullanılır ve her isteğin zaman aşımı vardır. 429 yanıtında
+    Retry-After (yoksa üstel artan) süre kadar kova boşaltılır ve istek
+    en fazla max_throttle_retries kez yinelenir.
+    """
+
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, ttl=600, stale_ttl=3600,
+                 tile_precision=2, timeout=(3.05, 10), rate_limiter=None,
+                 clock=time.monotonic, sleep=time.sleep, max_throttle_retries=3,
+                 throttle_backoff=2.0):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.tile_precision = tile_precision
+        self.timeout = timeout
+        # OpenWeatherMap ücretsiz planı: dakikada 60 istek
+        self.rate_limiter = rate_limiter or TokenBucket(rate=1.0, capacity=60, clock=clock, sleep=sleep)
+        self.clock = clock
+        self.max_throttle_retries = max_throttle_retries
+        self.throttle_backoff = throttle_backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            # 429 burada değil _fetch'te kova üzerinden ele alınır
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504],
+                              allowed_methods=['GET'], respect_retry_after_header=False)
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._cache = {}
+        self._refreshing = set()
+        self._tile_locks = {}
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix='air-quality')
+        self.stats = {'hits': 0, 'stale': 0, 'fetches': 0, 'throttled': 0, 'errors': 0}
+
+    def tile(self, lat, lon):
+        return (round(float(lat), self.tile_precision), round(float(lon), self.tile_precision))
+
+    def get(self, lat, lon):
+        """Konumun kirletici değerlerini döndür (ör. {'PM2.5': 12.3, ...})"""
+        tile = self.tile(lat, lon)
+        with self._lock:
+            entry = self._cache.get(tile)
+        if entry is not None:
+            data, fetched_at = entry
+            age = self.clock() - fetched_at
+            if age < self.ttl:
+                self.stats['hits'] += 1
+                return data
+            if age < self.stale_ttl:
+                self.stats['stale'] += 1
+                self._refresh_in_background(tile)
+                return data
+        return self._refresh(tile)
+
+    def _refresh_in_background(self, tile):
+        with self._lock:
+            if tile in self._refreshing:
+                return
+            self._refreshing.add(tile)
+
+        def refresh():
+            try:
+                self._refresh(tile)
+            except Exception:
+                # Eski kayıt kullanılmaya devam eder; sonraki istekte yeniden denenir
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(tile)
+
+        self._refresher.submit(refresh)
+
+    def _refresh(self, tile):
+        with self._lock:
+            tile_lock = self._tile_locks.setdefault(tile, threading.Lock())
+        with tile_lock:
+            # Beklerken başka bir iş parçacığı yenilemiş olabilir
+            with self._lock:
+                entry = self._cache.get(tile)
+            if entry is not None and self.clock() - entry[1] < self.ttl:
+                return entry[0]
+            data = self._fetch(*tile)
+            with self._lock:
+                self._cache[tile] = (data, self.clock())
+            return data
+
+    def _throttle_delay(self, response, attempt):
+        try:
+            return max(0.0, float(response.headers['Retry-After']))
+        except (KeyError, ValueError):
+            return self.throttle_backoff * 2 ** attempt
+
+    def _fetch(self, lat, lon):
+        delay = 0.0
+        try:
+            for attempt in range(self.max_throttle_retries + 1):
+                # 429 sonrası istenen bekleme süresi zaman aşımına eklenir
+                if not self.rate_limiter.acquire(timeout=self.timeout[1] + delay):
+                    raise RuntimeError("Hava kalitesi API istek sınırı aşıldı")
+                self.stats['fetches'] += 1
+                response = self.session.get(
+                    f"{self.base_url}/air_pollution",
+                    params={"lat": lat, "lon": lon, "appid": self.api_key},
+                    timeout=self.timeout
+                )
+                if response.status_code != 429 or attempt == self.max_throttle_retries:
+                    break
+                self.stats['throttled'] += 1
+                delay = self._throttle_delay(response, attempt)
+                self.rate_limiter.penalize(delay)
+            response.raise_for_status()
+            components = response.json()['list'][0]['components']
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+        return {name: components[key] for name, key in COMPONENTS.items()}
+
+    def close(self):
+        self._refresher.shutdown(wait=False)
+        self.session.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_air_quality_client(api_key, base_url=None):
+    """Süreç genelinde paylaşılan istemciyi döndür
+
+    Önbellek, bağlantı havuzu ve hız sınırı tüm oturumlar arasında
+    paylaşılır. base_url verilmezse AIR_QUALITY_BASE_URL ortam değişkeni
+    (ör. testlerde yerel sahte sunucu) veya OpenWeatherMap kullanılır.
+    """
+    base_url = base_url or os.environ.get('AIR_QUALITY_BASE_URL', DEFAULT_BASE_URL)
+    key = (api_key, base_url)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = AirQualityClient(api_key, base_url)
+        return _clients[key]
@@ -5,6 +5,7 @@ import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
 from advanced_model import AdvancedMedicalModel, train_and_evaluate
+from feature_encoding import FeatureEncoder
 from patient_management import PatientManagement
 import joblib
 import os
@@ -15,11 +16,16 @@ from ai_prediction import AIPrediction
 from data_integration import DataIntegration
 from reliability_layers import ReliabilityLayers
 from genetic_analysis import GeneticAnalysis
+from model_registry import get_registry
+from report_templates import render_patient_report
 
 # Sayfa yapılandırması en üstte olmalı
 st.set_page_config(page_title="PulsAI(Sağlık Asistanı)", layout="wide")
 
 class HealthAssistantApp:
+    # Geçmiş ziyaretler bu boyutta sayfalar halinde gösterilir
+    HISTORY_PAGE_SIZE = 10
+    
     def __init__(self):
         self.patient_manager = PatientManagement()
         
@@ -100,13 +106,22 @@ class HealthAssistantApp:
         """Hasta geçmişini göster"""
         st.header("Geçmiş Ziyaretler")
         
-        history = self.patient_manager.get_visit_history(patient_id)
+        # Yalnızca en yeni sayfa okunur; daha eskileri istek üzerine eklenir
+        if st.session_state.get('history_patient_id') != patient_id:
+            st.session_state['history_patient_id'] = patient_id
+            st.session_state['history_limit'] = self.HISTORY_PAGE_SIZE
+        limit = st.session_state['history_limit']
+        
+        # Bir fazlası, daha eski ziyaret olup olmadığını anlamak için okunur
+        history = self.patient_manager.get_visit_history(
+            patient_id, limit=limit + 1, newest_first=True
+        )
         
         if not history:
             st.info("Henüz ziyaret geçmişi bulunmuyor.")
             return
         
-        for visit in reversed(history):
+        for visit in history[:limit]:
             with st.expander(f"Ziyaret: {visit['timestamp'][:10]}"):
                 st.write("**Belirtiler:**")
                 st.write(", ".join(visit['symptoms']))
@@ -123,6 +138,11 @@ class HealthAssistantApp:
                 
                 st.write("**Önerilen Bölüm:**")
                 st.write(visit['department'])
+        
+        if len(history) > limit:
+            if st.button("Daha Fazla Yükle"):
+                st.session_state['history_limit'] = limit + self.HISTORY_PAGE_SIZE
+                st.rerun()
     
     def check_model_files(self):
         """Model dosyalarının varlığını kontrol et"""
@@ -136,11 +156,14 @@ class HealthAssistantApp:
     def load_encoders_and_symptoms(self):
         """Etiket kodlayıcıları ve belirti listesini yükle"""
         try:
-            self.processed_df = pd.read_csv('data/processed_medical_dataset.csv')
-            self.symptom_cols = [col.replace('symptom_', '') for col in 
-                               self.processed_df.columns if col.startswith('symptom_')]
-            self.chronic_cols = [col.replace('chronic_', '') for col in 
-                               self.processed_df.columns if col.startswith('chronic_')]
+            # Veri seti süreç başına bir kez okunur ve oturumlar arasında paylaşılır
+            self.processed_df = get_registry().get(
+                'data/processed_medical_dataset.csv', loader=pd.read_csv
+            )
+            # Belirti/kronik hastalık sözlüğü bir kez indekslenir
+            self.feature_encoder = FeatureEncoder.from_columns(self.processed_df.columns)
+            self.symptom_cols = self.feature_encoder.symptom_names
+            self.chronic_cols = self.feature_encoder.chronic_names
             
             # Label Encoder'ları yükle
             self.diagnosis_classes = sorted(self.processed_df['diagnosis'].unique())
@@ -155,22 +178,9 @@ class HealthAssistantApp:
     def prepare_input_features(self, selected_symptoms, age, gender, chronic_conditions):
         """Kullanıcı girdilerini model için hazırla"""
         try:
-            # Belirti vektörü
-            symptom_vector = np.zeros(len(self.symptom_cols))
-            for i, symptom in enumerate(self.symptom_cols):
-                if symptom in selected_symptoms:
-                    symptom_vector[i] = 1
-            
-            # Hasta bilgileri
-            patient_vector = np.array([age, 1 if gender == "Erkek" else 0])
-            
-            # Kronik hastalıklar
-            chronic_vector = np.zeros(len(self.chronic_cols))
-            for i, condition in enumerate(self.chronic_cols):
-                if condition in chronic_conditions:
-                    chronic_vector[i] = 1
-            
-            return np.hstack([symptom_vector, patient_vector, chronic_vector])
+            return self.feature_encoder.encode_one(
+                selected_symptoms, age, gender, chronic_conditions
+            )
             
         except Exception as e:
             st.error(f"Özellik hazırlama hatası: {str(e)}")
@@ -195,54 +205,10 @@ class HealthAssistantApp:
         ))
         return fig
     
-    def generate_report(self, patient_info, analysis_results):
-        """Detaylı rapor oluştur"""
+    def generate_report(self, patient_info, analysis_results, lang='tr'):
+        """Detaylı rapor oluştur (dil başına önceden derlenmiş şablondan)"""
         now = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        
-        report = f"""SAĞLIK RAPORU
-Tarih: {now}
-
-HASTA BİLGİLERİ
---------------
-Yaş: {patient_info['age']}
-Cinsiyet: {patient_info['gender']}
-Kronik Hastalıklar: {', '.join(patient_info['chronic_conditions']) if patient_info['chronic_conditions'] else 'Yok'}
-
-BELİRTİLER
-----------
-Seçilen Belirtiler: {', '.join(patient_info['symptoms'])}
-Ek Şikayetler: {patient_info['additional_symptoms']}
-
-ANALİZ SONUÇLARI
----------------
-Olası Tanı: {analysis_results['diagnosis']}
-Tanı Güven Oranı: %{analysis_results['diagnosis_prob']:.1f}
-
-Risk Seviyesi: {analysis_results['severity']}
-Risk Oranı: %{analysis_results['severity_prob']:.1f}
-
-Önerilen Bölüm: {analysis_results['department']}
-
-ÖNERİLER
---------
-{analysis_results['recommendation']}
-
-YAŞAM TARZI ÖNERİLERİ
----------------------
-- Düzenli egzersiz yapmayı deneyin.
-- Sağlıklı beslenmeye özen gösterin.
-- Stres yönetimi tekniklerini uygulayın.
-
-PSİKOLOJİK DESTEK
------------------
-- Meditasyon veya derin nefes alma tekniklerini uygulayın.
-- Gerekirse bir terapiste başvurun.
-
-NOT: Bu rapor bir yapay zeka asistanı (PulsAI) tarafından oluşturulmuştur ve 
-sadece bilgilendirme amaçlıdır. Kesin tanı için mutlaka bir sağlık 
-kuruluşuna başvurunuz.
-"""
-        return report
+        return render_patient_report(patient_info, analysis_results, now, lang)
     
     def show_diagnosis_info(self, diagnosis):
         """Verilen tanının kısaca tanımını gösterir"""
@@ -372,19 +338,16 @@ kuruluşuna başvurunuz.
                     # Yaşam tarzı riskini hesapla
                     self.risk_modeling.calculate_lifestyle_risk(lifestyle_choices)
                     
-                    # Hastalık gelişim olasılığını tahmin et
-                    disease_probability = self.ai_prediction.predict_disease_probability(features)
-                    
-                    # Tahminler
-                    diagnosis_proba = self.model.predict_proba(
-                        features.reshape(1, -1), 'diagnosis'
+                    # Tahminler: üç başlık tek çağrıda, ormanlar eşzamanlı dolaşılır
+                    predictions = self.model.predict_all(
+                        features.reshape(1, -1), parallel=True
                     )
-                    severity_proba = self.model.predict_proba(
-                        features.reshape(1, -1), 'severity'
-                    )
-                    department_pred = self.model.predict(
-                        features.reshape(1, -1), 'department'
-                    )[0]
+                    diagnosis_proba = predictions['diagnosis']['proba']
+                    severity_proba = predictions['severity']['proba']
+                    department_pred = predictions['department']['labels'][0]
+                    
+                    # Hastalık gelişim olasılığı tanı olasılıklarından alınır
+                    disease_probability = diagnosis_proba
                     
                     # En olası tanı ve olasılığı
                     max_diagnosis_idx = np.argmax(diagnosis_proba)
@@ -0,0 +1,212 @@
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+DEFAULT_RESOURCE = 'genel'
+
+
+class AppointmentScheduler:
+    """Kaynak (doktor/bölüm) ve gün başına bit maskeli randevu takvimi
+
+    Her (kaynak, gün) için boş slotlar tek bir tamsayının bitlerinde
+    tutulur ve yalnızca o gün ilk sorgulandığında SQLite'taki
+    randevulardan kurulur; böylece aylar süren bir ufuk için bile slot
+    nesneleri önceden oluşturulmaz. Randevu alma (kaynak, gün, slot)
+    birincil anahtarlı INSERT ile yapılır: aynı slotu iki istek (başka
+    süreçten bile olsa) aynı anda almaya çalışırsa yalnızca biri başarılı
+    olur. Başka bağlantıların yazdığı değişiklikler PRAGMA data_version
+    ile fark edilir ve bellekteki maskeler yeniden kurulur.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS appointments (
+            resource TEXT NOT NULL,
+            day TEXT NOT NULL,
+            slot INTEGER NOT NULL,
+            patient_id TEXT NOT NULL,
+            reason TEXT,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (resource, day, slot)
+        );
+        CREATE INDEX IF NOT EXISTS idx_appointments_patient ON appointments (patient_id, day);
+    """
+
+    def __init__(self, db_path='data/appointments.db', day_start=9, day_end=17, slot_minutes=30,
+                 workdays=(0, 1, 2, 3, 4), horizon_days=90):
+        self.db_path = db_path
+        self.day_start = day_start
+        self.slot_minutes = slot_minutes
+        self.slots_per_day = (day_end - day_start) * 60 // slot_minutes
+        self.workdays = set(workdays)
+        self.horizon_days = horizon_days
+        # Çalışma günündeki tüm slotların boş olduğu maske
+        self.full_mask = (1 << self.slots_per_day) - 1
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # Her iş parçacığı kendi bağlantısını kullanır
+        self._local = threading.local()
+        self._masks = {}
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.data_version = None
+        return conn
+
+    def _sync(self, conn):
+        """Başka bir bağlantı yazdıysa bellekteki maskeleri geçersiz kıl"""
+        version = conn.execute('PRAGMA data_version').fetchone()[0]
+        if self._local.data_version is not None and version != self._local.data_version:
+            with self._lock:
+                self._masks.clear()
+        self._local.data_version = version
+
+    def _locate(self, when):
+        """Tarih-saati (gün, slot) çiftine çevir; slot sınırında değilse None"""
+        minutes = (when.hour - self.day_start) * 60 + when.minute
+        if when.second or when.microsecond or minutes % self.slot_minutes:
+            return None
+        slot = minutes // self.slot_minutes
+        if not 0 <= slot < self.slots_per_day:
+            return None
+        return when.date(), slot
+
+    def slot_time(self, day, slot):
+        start = datetime(day.year, day.month, day.day, self.day_start)
+        return start + timedelta(minutes=slot * self.slot_minutes)
+
+    def in_horizon(self, day, today=None):
+        today = today or date.today()
+        return day.weekday() in self.workdays and today <= day < today + timedelta(days=self.horizon_days)
+
+    def _mask(self, conn, resource, day):
+        """(kaynak, gün) boş slot maskesi; ilk kullanımda kayıtlı randevulardan kurulur"""
+        key = (resource, day)
+        # Maske kilit altında kurulur: kurulum sırasında başka bir iş
+        # parçacığının yaptığı randevu, kilidi bekleyen _update_mask ile
+        # kurulan maskeye işlenir ya da sorguda zaten görünür
+        with self._lock:
+            mask = self._masks.get(key)
+            if mask is None:
+                mask = self.full_mask
+                for (slot,) in conn.execute('SELECT slot FROM appointments WHERE resource = ? AND day = ?',
+                                            (resource, day.isoformat())):
+                    mask &= ~(1 << slot)
+                self._masks[key] = mask
+            return mask
+
+    def _update_mask(self, resource, day, slot, free):
+        with self._lock:
+            mask = self._masks.get((resource, day))
+            if mask is not None:
+                self._masks[(resource, day)] = mask | (1 << slot) if free else mask & ~(1 << slot)
+
+    def is_available(self, when, resource=DEFAULT_RESOURCE):
+        located = self._locate(when)
+        if located is None or not self.in_horizon(located[0]):
+            return False
+        conn = self._connect()
+        self._sync(conn)
+        return bool(self._mask(conn, resource, located[0]) >> located[1] & 1)
+
+    def book(self, patient_id, when, reason=None, resource=DEFAULT_RESOURCE):
+        """Slotu ayır; slot geçersiz, ufuk dışında veya doluysa False"""
+        located = self._locate(when)
+        if located is None or not self.in_horizon(located[0]):
+            return False
+        day, slot = located
+        conn = self._connect()
+        self._sync(conn)
+        if not self._mask(conn, resource, day) >> slot & 1:
+            return False
+        try:
+            with conn:
+                conn.execute(
+                    'INSERT INTO appointments (resource, day, slot, patient_id, reason, created_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (resource, day.isoformat(), slot, str(patient_id), reason, datetime.now().isoformat())
+                )
+        except sqlite3.IntegrityError:
+            # Başka bir istek aynı slotu önce aldı
+            self._update_mask(resource, day, slot, free=False)
+            return False
+        self._update_mask(resource, day, slot, free=False)
+        return True
+
+    def cancel(self, when, resource=DEFAULT_RESOURCE, patient_id=None):
+        """Randevuyu iptal et; patient_id verilirse yalnızca o hastanın randevusu silinir"""
+        located = self._locate(when)
+        if located is None:
+            return False
+        day, slot = located
+        conn = self._connect()
+        query = 'DELETE FROM appointments WHERE resource = ? AND day = ? AND slot = ?'
+        params = [resource, day.isoformat(), slot]
+        if patient_id is not None:
+            query += ' AND patient_id = ?'
+            params.append(str(patient_id))
+        with conn:
+            deleted = conn.execute(query, params).rowcount
+        if deleted:
+            self._update_mask(resource, day, slot, free=True)
+        return bool(deleted)
+
+    def free_slots(self, day, resource=DEFAULT_RESOURCE):
+        """Günün boş slot zamanları (sıralı)"""
+        if not self.in_horizon(day):
+            return []
+        conn = self._connect()
+        self._sync(conn)
+        mask = self._mask(conn, resource, day)
+        return [self.slot_time(day, slot) for slot in range(self.slots_per_day) if mask >> slot & 1]
+
+    def bookings(self, day, resource=DEFAULT_RESOURCE):
+        """Günün randevuları {slot zamanı: (hasta, neden)}"""
+        rows = self._connect().execute(
+            'SELECT slot, patient_id, reason FROM appointments WHERE resource = ? AND day = ?',
+            (resource, day.isoformat())
+        )
+        return {self.slot_time(day, slot): (patient_id, reason) for slot, patient_id, reason in rows}
+
+    def days(self, start=None, n_days=7):
+        """start'tan itibaren n_days içindeki çalışma günleri (ufukla sınırlı)"""
+        start = start or date.today()
+        return [day for day in (start + timedelta(days=i) for i in range(n_days)) if self.in_horizon(day)]
+
+    def patient_appointments(self, patient_id):
+        """Hastanın tüm randevuları (zaman, kaynak, neden) zaman sırasıyla"""
+        rows = self._connect().execute(
+            'SELECT day, slot, resource, reason FROM appointments WHERE patient_id = ? ORDER BY day, slot',
+            (str(patient_id),)
+        )
+        return [(self.slot_time(date.fromisoformat(day), slot), resource, reason)
+                for day, slot, resource, reason in rows]
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Süreç genelinde tek bir randevu takvimi döndür
+
+    Veritabanı yolu APPOINTMENTS_DB, ufuk APPOINTMENT_HORIZON_DAYS ortam
+    değişkenleriyle ayarlanır.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = AppointmentScheduler(
+                os.environ.get('APPOINTMENTS_DB', 'data/appointments.db'),
+                horizon_days=int(os.environ.get('APPOINTMENT_HORIZON_DAYS', 90))
+            )
+        return _scheduler
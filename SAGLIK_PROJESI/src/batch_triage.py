@@ -0,0 +1,148 @@
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from advanced_model import AdvancedMedicalModel
+from feature_encoding import FeatureEncoder
+from model_registry import get_registry
+
+
+def split_list(value):
+    """Virgülle ayrılmış hücreyi listeye çevir ('yok' ve boş değerler hariç)"""
+    if not isinstance(value, str):
+        return []
+    items = [item.strip() for item in value.split(',')]
+    return [item for item in items if item and item != 'yok']
+
+
+class BatchTriage:
+    """Hasta kohortlarını arayüz olmadan toplu olarak puanlar
+
+    Girdi dosyasında hasta başına bir satır bulunur:
+    symptoms (virgülle ayrılmış), age, gender ('Erkek'/'Kadın' veya 'E'/'K')
+    ve isteğe bağlı chronic_conditions. Diğer sütunlar (ör. patient_id)
+    çıktıya aynen aktarılır. Özellikler arayüzdeki prepare_input_features
+    ile aynı düzende hazırlanır.
+    """
+
+    def __init__(self, dataset_path='data/processed_medical_dataset.csv', model=None):
+        processed_df = get_registry().get(dataset_path, loader=pd.read_csv)
+        self.encoder = FeatureEncoder.from_columns(processed_df.columns)
+        self.class_names = {
+            'diagnosis': np.array(sorted(processed_df['diagnosis'].unique()), dtype=object),
+            'severity': np.array(sorted(processed_df['severity'].unique()), dtype=object),
+            'department': np.array(sorted(processed_df['department'].unique()), dtype=object)
+        }
+
+        if model is None:
+            model = AdvancedMedicalModel()
+            model.load_models()
+        self.model = model
+
+    def encode_chunk(self, chunk):
+        """Bir veri parçasını tek NumPy işlemiyle özellik matrisine çevir"""
+        genders = chunk['gender'].replace({'E': 'Erkek', 'K': 'Kadın'})
+        chronic = chunk['chronic_conditions'] if 'chronic_conditions' in chunk else [None] * len(chunk)
+        return self.encoder.encode(
+            [split_list(symptoms) for symptoms in chunk['symptoms']],
+            chunk['age'].values,
+            genders.values,
+            [split_list(conditions) for conditions in chronic]
+        )
+
+    def score_chunk(self, chunk):
+        """Bir veri parçasını tüm model başlıklarıyla puanla"""
+        X = self.encode_chunk(chunk)
+        predictions = self.model.predict_all(X)
+
+        result = chunk.drop(columns=['symptoms', 'chronic_conditions'], errors='ignore').copy()
+        for model_type in ['diagnosis', 'severity', 'department']:
+            head = predictions[model_type]
+            result[model_type] = self.class_names[model_type][head['labels']]
+            if model_type != 'department':
+                result[f'{model_type}_prob'] = head['proba'].max(axis=1) * 100
+        return result
+
+    def read_chunks(self, input_path, chunksize):
+        """Girdi dosyasını sabit boyutlu parçalar halinde akış olarak oku"""
+        if input_path.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            parquet_file = pq.ParquetFile(input_path)
+            for batch in parquet_file.iter_batches(batch_size=chunksize):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(input_path, chunksize=chunksize)
+
+    def score_file(self, input_path, output_path, chunksize=5000, n_jobs=1):
+        """Dosyayı parça parça puanla ve sonuçları akış olarak yaz
+
+        Bellekte en fazla 2 * n_jobs parça tutulur; sonuçlar girdi sırasıyla
+        yazılır.
+        """
+        writer = ResultWriter(output_path)
+        total = 0
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                pending = deque()
+                for chunk in self.read_chunks(input_path, chunksize):
+                    pending.append(executor.submit(self.score_chunk, chunk))
+                    # Bellek sınırı: en eski parça bitmeden yeni parça okuma
+                    while len(pending) >= 2 * n_jobs:
+                        total += writer.write(pending.popleft().result())
+                while pending:
+                    total += writer.write(pending.popleft().result())
+        finally:
+            writer.close()
+
+        elapsed = time.perf_counter() - start
+        print(f"{total} hasta {elapsed:.2f} sn içinde puanlandı -> {output_path}")
+        return total
+
+
+class ResultWriter:
+    """Sonuç parçalarını CSV veya Parquet dosyasına ekleyerek yazar"""
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.parquet_writer = None
+        self.header_written = False
+        if os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    def write(self, df):
+        if self.output_path.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.output_path, table.schema)
+            self.parquet_writer.write_table(table)
+        else:
+            df.to_csv(self.output_path, mode='a' if self.header_written else 'w',
+                      header=not self.header_written, index=False)
+            self.header_written = True
+        return len(df)
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Toplu triyaj puanlaması")
+    parser.add_argument('input', help="Hasta dosyası (.csv veya .parquet)")
+    parser.add_argument('output', help="Sonuç dosyası (.csv veya .parquet)")
+    parser.add_argument('--chunksize', type=int, default=5000)
+    parser.add_argument('--n-jobs', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    BatchTriage().score_file(args.input, args.output,
+                             chunksize=args.chunksize, n_jobs=args.n_jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,676 @@
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from advanced_model import AdvancedMedicalModel, MODEL_TYPES, prepare_features
+from flat_forest import FlatForest
+
+
+def time_call(func, runs):
+    """Fonksiyonu runs kez çalıştırıp gecikme istatistiklerini (ms) döndür"""
+    func()  # Isınma
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings = np.array(timings)
+    return {
+        'mean_ms': timings.mean(),
+        'p50_ms': np.percentile(timings, 50),
+        'p95_ms': np.percentile(timings, 95)
+    }
+
+
+def print_results(title, results):
+    """Benchmark sonuçlarını tablo olarak yazdır"""
+    print(f"\n{title}")
+    print(f"{'Yöntem':<32}{'ortalama':>12}{'p50':>12}{'p95':>12}")
+    for name, stats in results.items():
+        print(f"{name:<32}{stats['mean_ms']:>10.2f}ms{stats['p50_ms']:>10.2f}ms"
+              f"{stats['p95_ms']:>10.2f}ms")
+
+
+def load_sample_features(n_rows=1):
+    """İşlenmiş veri setinden örnek özellik satırları al"""
+    df = pd.read_csv('data/processed_medical_dataset.csv')
+    X = prepare_features(df).values
+    return X[np.arange(n_rows) % len(X)]
+
+
+def benchmark_inference(runs=50):
+    """'Analiz Et' yolundaki istek başına tahmin gecikmesini ölç"""
+    model = AdvancedMedicalModel()
+    model.load_models()
+    X = load_sample_features(1)
+
+    def legacy_request():
+        # Eski yol: tanı iki kez, şiddet ve bölüm ayrı ayrı
+        model.predict_proba(X, 'diagnosis')
+        model.predict_proba(X, 'diagnosis')
+        model.predict_proba(X, 'severity')
+        model.predict(X, 'department')
+
+    results = {
+        'önceki (4 ayrı çağrı)': time_call(legacy_request, runs),
+        'predict_all (sıralı)': time_call(lambda: model.predict_all(X), runs),
+        'predict_all (paralel)': time_call(
+            lambda: model.predict_all(X, parallel=True), runs
+        )
+    }
+    print_results("İstek başına tahmin gecikmesi", results)
+    return results
+
+
+def check_flat_parity(model, X):
+    """Düzleştirilmiş ormanların sklearn ile aynı olasılıkları verdiğini doğrula"""
+    for model_type in MODEL_TYPES:
+        forest = model.load_sklearn_model(model_type)
+        flat = FlatForest.from_sklearn(forest)
+        expected = forest.predict_proba(X)
+        actual = flat.predict_proba(X)
+        max_diff = np.abs(expected - actual).max()
+        labels_match = np.array_equal(forest.predict(X), flat.predict(X))
+        print(f"{model_type:<12} maks. fark: {max_diff:.2e}  etiketler aynı: {labels_match}")
+        if not np.allclose(expected, actual, rtol=0, atol=1e-9) or not labels_match:
+            raise AssertionError(f"{model_type} düzleştirilmiş orman sklearn ile uyuşmuyor")
+
+
+def benchmark_flat_forest(runs=50):
+    """Düzleştirilmiş orman ile sklearn predict_proba gecikmesini karşılaştır"""
+    model = AdvancedMedicalModel()
+    model.load_models()
+
+    # Eğitim verisi ve rastgele girdiler üzerinde eşdeğerlik kontrolü
+    X_data = load_sample_features(20)
+    rng = np.random.default_rng(42)
+    X_random = X_data[rng.integers(0, len(X_data), 500)].copy()
+    X_random[:, :-1] = rng.integers(0, 2, X_random[:, :-1].shape)
+    print("\nEşdeğerlik kontrolü")
+    check_flat_parity(model, np.vstack([X_data, X_random]))
+
+    forest = model.load_sklearn_model('diagnosis')
+    flat = FlatForest.from_sklearn(forest)
+    results = {}
+    for n_rows in (1, 1000):
+        X = load_sample_features(n_rows)
+        results[f'sklearn ({n_rows} satır)'] = time_call(
+            lambda: forest.predict_proba(X), runs
+        )
+        results[f'FlatForest ({n_rows} satır)'] = time_call(
+            lambda: flat.predict_proba(X), runs
+        )
+    print_results("Tanı ormanı predict_proba gecikmesi", results)
+    return results
+
+
+def read_memory_usage():
+    """Sürecin bellek kullanımını (MB) /proc üzerinden oku"""
+    usage = {}
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('VmRSS', 'RssAnon', 'RssFile'):
+                    usage[key] = int(value.split()[0]) / 1024
+    except FileNotFoundError:
+        import resource
+        usage['VmRSS'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return usage
+
+
+def probe_model_loading(mode):
+    """Yeni bir süreçte başlangıç süresini ve RSS'i ölç (alt süreç olarak çalışır)
+
+    Sayfa yalnızca tanı başlığını kullanıyormuş gibi tek bir tahmin yapılır.
+    """
+    X = load_sample_features(1)
+    baseline = read_memory_usage()
+    start = time.perf_counter()
+    model = AdvancedMedicalModel()
+    if mode == 'eager_pickle':
+        model.load_models(lazy=False)
+        model.flat_models.clear()
+        model.lazy_load = False
+    else:
+        model.load_models(lazy=True)
+    load_ms = (time.perf_counter() - start) * 1000
+    model.predict_proba(X, 'diagnosis')
+    first_prediction_ms = (time.perf_counter() - start) * 1000
+    usage = read_memory_usage()
+    print(json.dumps({
+        'load_ms': load_ms,
+        'first_prediction_ms': first_prediction_ms,
+        'rss_mb': usage.get('VmRSS', 0) - baseline.get('VmRSS', 0),
+        'anon_mb': usage.get('RssAnon', 0) - baseline.get('RssAnon', 0),
+        'file_mb': usage.get('RssFile', 0) - baseline.get('RssFile', 0)
+    }))
+
+
+def benchmark_model_loading(runs=5):
+    """Tam yükleme ile tembel/bellek eşlemeli yüklemenin başlangıç maliyeti"""
+    if not os.path.isdir('models/diagnosis_flat'):
+        print("Düzleştirilmiş modeller bulunamadı: önce 'python src/advanced_model.py export-flat'")
+        return None
+
+    results = {}
+    for mode in ('eager_pickle', 'lazy_mmap'):
+        samples = []
+        for _ in range(max(1, min(runs, 5))):
+            output = subprocess.run(
+                [sys.executable, '-W', 'ignore', os.path.abspath(__file__), '_probe_loading', mode],
+                capture_output=True, text=True, check=True
+            ).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+        results[mode] = {key: np.median([s[key] for s in samples]) for key in samples[0]}
+
+    print("\nİşçi süreci başına model yükleme maliyeti (medyan)")
+    print(f"{'Mod':<16}{'yükleme':>12}{'ilk tahmin':>14}{'RSS':>10}{'özel':>10}{'paylaşılan':>12}")
+    for mode, stats in results.items():
+        print(f"{mode:<16}{stats['load_ms']:>10.1f}ms{stats['first_prediction_ms']:>12.1f}ms"
+              f"{stats['rss_mb']:>8.1f}MB{stats['anon_mb']:>8.1f}MB{stats['file_mb']:>10.1f}MB")
+    return results
+
+
+def legacy_check_drug_interactions(table, medications):
+    """Eski uygulama: her çift için tüm tabloda boolean maske"""
+    warnings = []
+    for i, drug1 in enumerate(medications):
+        for drug2 in medications[i+1:]:
+            interaction = table[
+                ((table['drug1'] == drug1) & (table['drug2'] == drug2)) |
+                ((table['drug1'] == drug2) & (table['drug2'] == drug1))
+            ]
+            if not interaction.empty:
+                warnings.append({
+                    'drugs': f"{drug1} - {drug2}",
+                    'severity': interaction.iloc[0]['severity'],
+                    'description': interaction.iloc[0]['description']
+                })
+    return warnings
+
+
+def benchmark_drug_interactions(runs=50, n_rows=200_000, n_drugs=2000, n_medications=15):
+    """Çift indeksi ile tam tablo taramasını karşılaştır"""
+    from patient_safety import PatientSafety, load_interaction_table
+
+    rng = np.random.default_rng(42)
+    drugs = np.array([f'ilac_{i}' for i in range(n_drugs)])
+    table = pd.DataFrame({
+        'drug1': drugs[rng.integers(0, n_drugs, n_rows)],
+        'drug2': drugs[rng.integers(0, n_drugs, n_rows)],
+        'severity': rng.choice(['düşük', 'orta', 'yüksek'], n_rows),
+        'description': [f'etkileşim {i}' for i in range(n_rows)]
+    })
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'drug_interactions.csv')
+        table.to_csv(path, index=False)
+        start = time.perf_counter()
+        table, index = load_interaction_table(path)
+        build_ms = (time.perf_counter() - start) * 1000
+
+    safety = PatientSafety.__new__(PatientSafety)
+    safety.drug_interactions = table
+    safety.interaction_index = index
+
+    # Bilinen etkileşimli çiftleri içeren bir polifarmasi listesi
+    medications = list(dict.fromkeys(
+        list(table['drug1'][:3]) + list(table['drug2'][:3]) +
+        list(drugs[rng.integers(0, n_drugs, n_medications)])
+    ))[:n_medications]
+    patients = [list(drugs[rng.integers(0, n_drugs, n_medications)]) for _ in range(1000)]
+
+    expected = legacy_check_drug_interactions(table, medications)
+    if safety.check_drug_interactions(medications) != expected:
+        raise AssertionError("İndeksli etkileşim kontrolü eski sonuçla uyuşmuyor")
+    print(f"\nİndeks kurulumu (tablo okuma dahil): {build_ms:.0f}ms, "
+          f"{len(index)} çift, bulunan etkileşim: {len(expected)}")
+
+    results = {
+        f'tam tarama ({n_medications} ilaç)': time_call(
+            lambda: legacy_check_drug_interactions(table, medications), max(1, min(runs, 3))
+        ),
+        f'indeks ({n_medications} ilaç)': time_call(
+            lambda: safety.check_drug_interactions(medications), runs
+        ),
+        'indeks toplu (1000 hasta)': time_call(
+            lambda: safety.check_drug_interactions_bulk(patients), max(1, runs // 10)
+        )
+    }
+    print_results(f"İlaç etkileşimi kontrolü ({n_rows} satırlık tablo)", results)
+    return results
+
+
+def legacy_find_nearest_hospitals(hospitals, lat, lon, radius_km, emergency_only=False):
+    """Eski uygulama: her hastane için iterrows + geodesic"""
+    from geopy.distance import geodesic
+
+    nearby_hospitals = []
+    for _, hospital in hospitals.iterrows():
+        distance = geodesic((lat, lon), (hospital['lat'], hospital['lon'])).km
+        if distance <= radius_km:
+            if not emergency_only or hospital['emergency']:
+                nearby_hospitals.append({
+                    'name': hospital['name'],
+                    'distance': round(distance, 2),
+                    'coords': (hospital['lat'], hospital['lon']),
+                    'emergency': hospital['emergency']
+                })
+    return sorted(nearby_hospitals, key=lambda x: x['distance'])
+
+
+def benchmark_hospital_search(runs=50, n_hospitals=10_000, radius_km=10):
+    """Uzamsal indeks ile tüm hastaneleri dolaşmayı karşılaştır"""
+    from hospital_index import HospitalIndex
+
+    rng = np.random.default_rng(42)
+    hospitals = pd.DataFrame({
+        'name': [f'hastane_{i}' for i in range(n_hospitals)],
+        'lat': rng.uniform(36.0, 42.0, n_hospitals),
+        'lon': rng.uniform(26.0, 45.0, n_hospitals),
+        'type': 'devlet',
+        'emergency': rng.random(n_hospitals) < 0.4
+    })
+    start = time.perf_counter()
+    index = HospitalIndex(hospitals)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # Ankara merkezi
+    lat, lon = 39.93, 32.85
+    expected = legacy_find_nearest_hospitals(hospitals, lat, lon, radius_km)
+    found = index.query(lat, lon, radius_km=radius_km)
+    if [(h['name'], h['distance']) for h in found] != [(h['name'], h['distance']) for h in expected]:
+        raise AssertionError("İndeksli hastane araması eski sonuçla uyuşmuyor")
+    print(f"\nİndeks kurulumu: {build_ms:.1f}ms, {radius_km} km içinde {len(found)} hastane")
+
+    results = {
+        'tam tarama': time_call(
+            lambda: legacy_find_nearest_hospitals(hospitals, lat, lon, radius_km),
+            max(1, min(runs, 3))
+        ),
+        f'indeks ({radius_km} km)': time_call(
+            lambda: index.query(lat, lon, radius_km=radius_km), runs
+        ),
+        'indeks (en yakın 5, acil)': time_call(
+            lambda: index.query(lat, lon, radius_km=None, k=5, emergency_only=True), runs
+        )
+    }
+    print_results(f"En yakın hastane araması ({n_hospitals} hastane)", results)
+    return results
+
+
+def legacy_analyze_environmental_risks(env, air_quality, weather_data, patient_conditions):
+    """Eski uygulama: hasta başına iç içe sözlük dolaşımı"""
+    risks = []
+    for pollutant, value in air_quality.items():
+        thresholds = env.air_quality_thresholds[pollutant]
+        if value > thresholds['unhealthy']:
+            risks.append({'type': 'air_quality', 'severity': 'high',
+                          'description': f"Yüksek {pollutant} seviyesi: {value}"})
+        elif value > thresholds['moderate']:
+            risks.append({'type': 'air_quality', 'severity': 'medium',
+                          'description': f"Orta {pollutant} seviyesi: {value}"})
+
+    temp = weather_data.get('temperature', 20)
+    humidity = weather_data.get('humidity', 50)
+    conditions = env.climate_related_conditions
+    if temp > 35:
+        risks.extend({'type': 'weather', 'severity': 'high', 'description': risk}
+                     for risk in conditions['sıcak_hava'])
+    elif temp < 0:
+        risks.extend({'type': 'weather', 'severity': 'high', 'description': risk}
+                     for risk in conditions['soğuk_hava'])
+    if humidity > 70:
+        risks.extend({'type': 'weather', 'severity': 'medium', 'description': risk}
+                     for risk in conditions['yüksek_nem'])
+
+    for condition in patient_conditions:
+        if 'astım' in condition.lower():
+            risks.extend({'type': 'condition', 'severity': 'high', 'description': risk}
+                         for risk in conditions['hava_kirliliği'])
+        if 'alerji' in condition.lower():
+            risks.extend({'type': 'condition', 'severity': 'medium', 'description': risk}
+                         for risk in conditions['polen'])
+    return risks
+
+
+def benchmark_environmental_risks(runs=5, n_patients=50_000):
+    """Toplu vektörel risk puanlamasını hasta başına döngüyle karşılaştır"""
+    from environmental_health import EnvironmentalHealth
+
+    env = EnvironmentalHealth()
+    rng = np.random.default_rng(42)
+    air_quality = pd.DataFrame({
+        'PM2.5': rng.uniform(0, 80, n_patients).round(1),
+        'PM10': rng.uniform(0, 300, n_patients).round(1),
+        'O3': rng.integers(0, 200, n_patients),
+        'NO2': rng.uniform(0, 400, n_patients).round(1)
+    })
+    weather = pd.DataFrame({
+        'temperature': rng.uniform(-10, 42, n_patients).round(1),
+        'humidity': rng.uniform(20, 95, n_patients).round()
+    })
+    condition_choices = ['Astım', 'alerjik rinit', 'diyabet', 'hipertansiyon', 'KOAH']
+    conditions = [list(rng.choice(condition_choices, rng.integers(0, 3), replace=False))
+                  for _ in range(n_patients)]
+
+    air_records = air_quality.to_dict('records')
+    weather_records = weather.to_dict('records')
+
+    def legacy():
+        return [legacy_analyze_environmental_risks(env, air, weather_data, patient_conditions)
+                for air, weather_data, patient_conditions in zip(air_records, weather_records, conditions)]
+
+    expected = legacy()
+    if env.analyze_environmental_risks_batch(air_records, weather_records, conditions) != expected:
+        raise AssertionError("Toplu risk puanlaması hasta başına sonuçlarla uyuşmuyor")
+    if [env.analyze_environmental_risks(*args) for args in
+            zip(air_records[:1000], weather_records[:1000], conditions[:1000])] != expected[:1000]:
+        raise AssertionError("Tek hasta risk analizi eski sonuçla uyuşmuyor")
+    frame = env.analyze_environmental_risks_batch(air_quality, weather, conditions, as_frame=True)
+    flattened = [dict(risk, patient=i) for i, risks in enumerate(expected) for risk in risks]
+    if frame.to_dict('records') != flattened:
+        raise AssertionError("Tablo biçimindeki riskler hasta başına sonuçlarla uyuşmuyor")
+    print(f"\nToplam risk kaydı: {sum(len(risks) for risks in expected)}")
+
+    results = {
+        'hasta başına döngü': time_call(legacy, runs),
+        'toplu (liste)': time_call(
+            lambda: env.analyze_environmental_risks_batch(air_quality, weather, conditions), runs
+        ),
+        'toplu (tablo)': time_call(
+            lambda: env.analyze_environmental_risks_batch(air_quality, weather, conditions,
+                                                          as_frame=True), runs
+        ),
+        'yalnızca seviye matrisi': time_call(
+            lambda: env.risk_engine.pollutant_levels(air_quality.to_numpy(dtype=float),
+                                                     list(air_quality.columns)), runs
+        )
+    }
+    print_results(f"Çevresel risk puanlaması ({n_patients} hasta)", results)
+    return results
+
+
+def make_sample_scans(n_pages=6, seed=42):
+    """Hafif eğik taranmış laboratuvar çıktılarına benzeyen çok sayfalı TIFF üret (300 dpi A4)"""
+    import cv2
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    tests = ['Hemoglobin', 'WBC', 'Platelet', 'Glucose', 'Creatinine', 'ALT', 'AST', 'TSH']
+    pages = []
+    for _ in range(n_pages):
+        page = np.full((3508, 2480), 255, dtype=np.uint8)
+        for i in range(36):
+            test = tests[rng.integers(len(tests))]
+            line = f"{test:<12} {rng.uniform(1, 300):8.1f}   ref {rng.integers(1, 50)}-{rng.integers(60, 400)}"
+            cv2.putText(page, line, (180, 260 + i * 85), cv2.FONT_HERSHEY_SIMPLEX, 1.5, 0, 3)
+        matrix = cv2.getRotationMatrix2D((1240, 1754), rng.uniform(-3, 3), 1.0)
+        page = cv2.warpAffine(page, matrix, (2480, 3508), borderValue=255)
+        noise = rng.normal(0, 12, page.shape)
+        pages.append(Image.fromarray(np.clip(page + noise, 0, 255).astype(np.uint8)))
+    buffer = io.BytesIO()
+    pages[0].save(buffer, format='TIFF', save_all=True, append_images=pages[1:], compression='tiff_lzw')
+    return buffer.getvalue()
+
+
+def legacy_ocr_document(data):
+    """Eski uygulama: her sayfa tam çözünürlükte, istek iş parçacığında tek OCR çağrısı"""
+    import cv2
+    import pytesseract
+    from image_pipeline import iter_pages
+
+    texts = []
+    for gray in iter_pages(data):
+        texts.append(pytesseract.image_to_string(cv2.equalizeHist(gray)))
+    return texts
+
+
+def benchmark_ocr_pipeline(runs=3, n_pages=6):
+    """Karolu, süreç havuzlu OCR hattının sayfa/sn verimini eski akışla karşılaştır"""
+    from image_pipeline import ImagePipeline, OCRCache
+
+    data = make_sample_scans(n_pages)
+    runs = max(1, min(runs, 3))
+    pipeline = ImagePipeline()
+    with tempfile.TemporaryDirectory() as tmp:
+        cached = ImagePipeline(cache=OCRCache(os.path.join(tmp, 'ocr_cache.db')))
+        cached.process(data)
+        results = {
+            'tam sayfa, sıralı': time_call(lambda: legacy_ocr_document(data), runs),
+            f'karolu, {pipeline.max_workers} süreç': time_call(lambda: pipeline.process(data), runs),
+            'önbellekten': time_call(lambda: cached.process(data), runs)
+        }
+    pipeline.close()
+    print_results(f"Tıbbi görüntü OCR ({n_pages} sayfalık TIFF)", results)
+    for name, stats in results.items():
+        print(f"{name:<32}{n_pages / (stats['mean_ms'] / 1000):>10.2f} sayfa/sn")
+    return results
+
+
+def legacy_analyze_lab_results(results):
+    """Eski uygulama: sözlükteki her test için ayrı karşılaştırma"""
+    analysis = {'normal': [], 'high': [], 'low': [], 'critical': []}
+    reference_ranges = {
+        'hemoglobin': {'min': 12, 'max': 16},
+        'wbc': {'min': 4000, 'max': 11000},
+        'platelet': {'min': 150000, 'max': 450000},
+        'glucose': {'min': 70, 'max': 100}
+    }
+    for test, value in results.items():
+        if test in reference_ranges:
+            ref = reference_ranges[test]
+            if value < ref['min']:
+                if value < ref['min'] * 0.7:
+                    analysis['critical'].append(f"{test}: {value} (Kritik düşük)")
+                else:
+                    analysis['low'].append(f"{test}: {value} (Düşük)")
+            elif value > ref['max']:
+                if value > ref['max'] * 1.3:
+                    analysis['critical'].append(f"{test}: {value} (Kritik yüksek)")
+                else:
+                    analysis['high'].append(f"{test}: {value} (Yüksek)")
+            else:
+                analysis['normal'].append(f"{test}: {value} (Normal)")
+    return analysis
+
+
+def benchmark_lab_results(runs=5, n_patients=20_000, n_documents=2000):
+    """Toplu laboratuvar sınıflandırmasını ve OCR metni çıkarımını ölç"""
+    from lab_extraction import LabResultExtractor, classify_lab_results, summarize_lab_results
+
+    rng = np.random.default_rng(42)
+    generators = {
+        'hemoglobin': lambda: round(float(rng.uniform(6, 22)), 1),
+        'wbc': lambda: int(rng.integers(2000, 16000)),
+        'platelet': lambda: int(rng.integers(80000, 650000)),
+        'glucose': lambda: int(rng.integers(40, 160))
+    }
+    patients = [{test: generate() for test, generate in generators.items()} for _ in range(n_patients)]
+    batch = pd.DataFrame([(i, test, value) for i, results in enumerate(patients)
+                          for test, value in results.items()], columns=['patient', 'test', 'value'])
+
+    # Eşdeğerlik: toplu sonuçlar hasta başına eski sonuçlarla aynı olmalı
+    classified = classify_lab_results(batch)
+    for i in range(min(n_patients, 2000)):
+        rows = classified[classified['patient'] == i]
+        expected = legacy_analyze_lab_results(patients[i])
+        if summarize_lab_results(rows, rows['test'].tolist(), list(patients[i].values())) != expected:
+            raise AssertionError("Toplu laboratuvar sınıflandırması eski sonuçla uyuşmuyor")
+
+    extractor = LabResultExtractor()
+    documents = [
+        f"Hemoglobin (HGB): {results['hemoglobin']} g/dL\nLökosit {results['wbc'] / 1000:.1f} x10^3/uL\n"
+        f"PLT {results['platelet'] // 1000} K/µL\nAçlık kan şekeri {results['glucose']} mg/dL\n"
+        for results in patients[:n_documents]
+    ]
+    extracted = extractor.extract_many(documents)
+    if len(extracted) != 4 * n_documents:
+        raise AssertionError(f"Beklenen {4 * n_documents} sonuç, çıkarılan {len(extracted)}")
+
+    results = {
+        'hasta başına sözlük': time_call(lambda: [legacy_analyze_lab_results(r) for r in patients], runs),
+        'toplu sınıflandırma': time_call(lambda: classify_lab_results(batch), runs),
+        f'metin çıkarımı ({n_documents} belge)': time_call(lambda: extractor.extract_many(documents), runs)
+    }
+    print_results(f"Laboratuvar sonuçları ({len(batch)} sonuç)", results)
+    return results
+
+
+class FakeClock:
+    """Elle ilerletilen saat; sleep gerçek beklemeden saati ileri alır"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+def start_air_quality_stub(delay=0.0):
+    """OpenWeatherMap air_pollution uç noktasını taklit eden yerel sunucu
+
+    Her karo için istek sayısı tutulur ve PM2.5 değeri bu sayıya eşittir;
+    böylece yenilenen kayıt ayırt edilebilir. throttle[karo] kadar istek
+    Retry-After başlıklı 429 ile yanıtlanır.
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    state = {'requests': {}, 'throttle': {}, 'retry_after': 5, 'lock': threading.Lock()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            tile = (query['lat'][0], query['lon'][0])
+            with state['lock']:
+                count = state['requests'][tile] = state['requests'].get(tile, 0) + 1
+                throttled = state['throttle'].get(tile, 0) > 0
+                if throttled:
+                    state['throttle'][tile] -= 1
+            if throttled:
+                self.send_response(429)
+                self.send_header('Retry-After', str(state['retry_after']))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            time.sleep(delay)
+            body = json.dumps({'list': [{'components': {
+                'pm2_5': count, 'pm10': 20.0, 'o3': 40.0, 'no2': 10.0
+            }}]}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def benchmark_air_quality_client(runs=50):
+    """Hava kalitesi istemcisini yerel sahte sunucuya karşı doğrula ve ölç
+
+    TTL isabeti, eski veriyle arka planda yenileme, eşzamanlı kayıpların
+    tek isteğe indirgenmesi ve 429 geri çekilmesi sahte saatle denetlenir.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from air_quality_client import AirQualityClient
+
+    server, state = start_air_quality_stub(delay=0.2)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    clock = FakeClock()
+    client = AirQualityClient('test', base_url, ttl=600, stale_ttl=3600, clock=clock, sleep=clock.sleep)
+    try:
+        # Eşzamanlı kayıplar: aynı karoya 16 istek tek sunucu isteği üretir
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            values = list(executor.map(lambda i: client.get(41.0082 + i * 1e-4, 28.9784), range(16)))
+        tile = ('41.01', '28.98')
+        if state['requests'] != {tile: 1} or any(value['PM2.5'] != 1 for value in values):
+            raise AssertionError(f"Eşzamanlı kayıplar birleşmedi: {state['requests']}")
+
+        # TTL isabeti: ttl içinde sunucuya gidilmez
+        clock.now += 599
+        if client.get(41.01, 28.98)['PM2.5'] != 1 or state['requests'][tile] != 1:
+            raise AssertionError("TTL içindeki istek sunucuya gitti")
+
+        # Eski veri hemen döner, yenileme arka planda yapılır
+        clock.now += 2
+        if client.get(41.01, 28.98)['PM2.5'] != 1:
+            raise AssertionError("Eski kayıt yenileme beklenmeden dönmedi")
+        deadline = time.perf_counter() + 5
+        while client.get(41.01, 28.98)['PM2.5'] != 2:
+            if time.perf_counter() > deadline:
+                raise AssertionError("Arka plan yenilemesi tamamlanmadı")
+            time.sleep(0.01)
+        if client.stats['stale'] < 1 or state['requests'][tile] != 2:
+            raise AssertionError(f"Arka plan yenilemesi beklenmedik: {client.stats}")
+
+        # 429: Retry-After kadar (sahte saatte) beklenip yeniden denenir
+        throttled_tile = ('39.93', '32.86')
+        state['throttle'][throttled_tile] = 1
+        before = clock.now
+        if client.get(39.93, 32.86)['PM2.5'] != 2:
+            raise AssertionError("429 sonrası yeniden deneme başarısız")
+        if clock.now - before < state['retry_after'] or client.stats['throttled'] != 1:
+            raise AssertionError(f"429 geri çekilmesi uygulanmadı: {clock.now - before:.1f} sn")
+
+        results = {
+            'önbellek isabeti': time_call(lambda: client.get(41.01, 28.98), runs),
+            'önbellek kaybı (yerel sunucu)': time_call(
+                lambda: (client._cache.clear(), client.get(41.01, 28.98)), max(1, min(runs, 10)))
+        }
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+    print_results("Hava kalitesi istemcisi (yerel sahte sunucu)", results)
+    print(f"Sunucu istekleri: {sum(state['requests'].values())}, istemci: {client.stats}")
+    return results
+
+
+BENCHMARKS = {
+    'inference': benchmark_inference,
+    'flat_forest': benchmark_flat_forest,
+    'model_loading': benchmark_model_loading,
+    'drug_interactions': benchmark_drug_interactions,
+    'hospital_search': benchmark_hospital_search,
+    'environmental_risks': benchmark_environmental_risks,
+    'ocr_pipeline': benchmark_ocr_pipeline,
+    'lab_results': benchmark_lab_results,
+    'air_quality': benchmark_air_quality_client
+}
+
+
+def main():
+    if sys.argv[1:2] == ['_probe_loading']:
+        probe_model_loading(sys.argv[2])
+        return
+
+    parser = argparse.ArgumentParser(description="PulsAI performans ölçümleri")
+    parser.add_argument('benchmark', nargs='?', default='all',
+                        choices=['all'] + list(BENCHMARKS))
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+
+    names = list(BENCHMARKS) if args.benchmark == 'all' else [args.benchmark]
+    for name in names:
+        BENCHMARKS[name](runs=args.runs)
+
+
+if __name__ == "__main__":
+    main()
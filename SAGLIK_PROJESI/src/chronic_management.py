@@ -3,9 +3,13 @@ import pandas as pd
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
 import plotly.express as px
+from vitals_store import get_vitals_store
+from vitals_stats import WINDOWS, RollingVitalStats, get_vitals_monitor
 
 class ChronicDiseaseManagement:
-    def __init__(self):
+    def __init__(self, vitals_store=None):
+        # Ölçümler oturumdan bağımsız, hasta/tür başına kalıcı zaman serilerinde tutulur
+        self.vitals_store = vitals_store or get_vitals_store()
         self.vital_ranges = {
             'kan_sekeri': {'min': 70, 'max': 140, 'unit': 'mg/dL'},
             'tansiyon_sistolik': {'min': 90, 'max': 120, 'unit': 'mmHg'},
@@ -48,59 +52,50 @@ class ChronicDiseaseManagement:
                 ]
             }
         }
+        
+        # Kayan istatistikler süreç genelinde tutulur ve her ölçümde O(1) güncellenir
+        self.vitals_monitor = get_vitals_monitor(self.vitals_store, self.vital_ranges)
 
     def track_vitals(self, patient_id, vital_type, value, timestamp=None):
-        """Yaşamsal değerleri kaydet"""
+        """Yaşamsal değerleri kaydet
+
+        Normal aralık dışı veya k-sigma sapma gösteren ölçümler için uyarı
+        listesi döner.
+        """
         if timestamp is None:
             timestamp = datetime.now()
             
-        if 'vital_signs' not in st.session_state:
-            st.session_state.vital_signs = {}
-            
-        if patient_id not in st.session_state.vital_signs:
-            st.session_state.vital_signs[patient_id] = {}
-            
-        if vital_type not in st.session_state.vital_signs[patient_id]:
-            st.session_state.vital_signs[patient_id][vital_type] = []
-            
-        st.session_state.vital_signs[patient_id][vital_type].append({
-            'timestamp': timestamp,
-            'value': value
-        })
+        alerts = self.vitals_monitor.observe(patient_id, vital_type, value, timestamp)
+        self.vitals_store.append(patient_id, vital_type, value, timestamp)
+        return alerts
 
     def analyze_trends(self, patient_id, vital_type, time_range='7d'):
         """Yaşamsal değerlerin trendlerini analiz et"""
-        if 'vital_signs' not in st.session_state or \
-           patient_id not in st.session_state.vital_signs or \
-           vital_type not in st.session_state.vital_signs[patient_id]:
+        # Zaman aralığına göre filtrele
+        cutoff_date = None
+        if time_range in WINDOWS:
+            cutoff_date = datetime.now() - WINDOWS[time_range]
+            
+        # İkili arama ile yalnızca pencere içindeki ölçümler okunur
+        series = self.vitals_store.range(patient_id, vital_type, start=cutoff_date)
+        if series is None:
             return None, None
             
-        vitals = st.session_state.vital_signs[patient_id][vital_type]
-        df = pd.DataFrame(vitals)
-        
-        # Zaman aralığına göre filtrele
-        time_delta = {
-            '7d': timedelta(days=7),
-            '30d': timedelta(days=30),
-            '90d': timedelta(days=90)
-        }
-        
-        if time_range in time_delta:
-            cutoff_date = datetime.now() - time_delta[time_range]
-            df = df[df['timestamp'] >= cutoff_date]
+        timestamps, values = series
+        df = pd.DataFrame({'timestamp': pd.to_datetime(timestamps), 'value': values})
             
         if len(df) < 2:
             return None, None
             
-        # Trend analizi
-        values = df['value'].values
-        trend = 'stable'
-        if values[-1] > values[0] * 1.1:
-            trend = 'increasing'
-        elif values[-1] < values[0] * 0.9:
-            trend = 'decreasing'
+        # Trend analizi: pencere boyunca regresyon eğimi
+        if time_range in WINDOWS:
+            stats = self.vitals_monitor.stats(patient_id, vital_type, time_range)
+        else:
+            stats = RollingVitalStats(window=timedelta.max)
+            for timestamp, value in zip(timestamps, values):
+                stats.update(value, timestamp)
             
-        return df, trend
+        return df, stats.trend()
 
     def generate_vital_chart(self, df, vital_type):
         """Yaşamsal değerler için grafik oluştur"""
@@ -158,16 +153,16 @@ class ChronicDiseaseManagement:
         report = "KRONIK HASTALIK YÖNETİMİ RAPORU\n"
         report += f"Tarih: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n"
         
-        if 'vital_signs' in st.session_state and patient_id in st.session_state.vital_signs:
-            for vital_type in st.session_state.vital_signs[patient_id]:
-                df, trend = self.analyze_trends(patient_id, vital_type, time_range)
-                if df is not None:
-                    latest_value = df['value'].iloc[-1]
-                    avg_value = df['value'].mean()
-                    
-                    report += f"{vital_type.replace('_', ' ').title()}:\n"
-                    report += f"Son ölçüm: {latest_value} {self.vital_ranges[vital_type]['unit']}\n"
-                    report += f"Ortalama: {avg_value:.1f} {self.vital_ranges[vital_type]['unit']}\n"
-                    report += f"Trend: {trend}\n\n"
+        for vital_type in self.vitals_store.vital_types(patient_id):
+            # Pencere istatistikleri hazır tutulur; ölçümler yeniden okunmaz
+            stats = self.vitals_monitor.stats(patient_id, vital_type, time_range)
+            if stats is not None and stats.count >= 2:
+                unit = self.vital_ranges[vital_type]['unit']
+                
+                report += f"{vital_type.replace('_', ' ').title()}:\n"
+                report += f"Son ölçüm: {stats.latest:g} {unit}\n"
+                report += f"Ortalama: {stats.mean:.1f} {unit} (±{stats.std:.1f})\n"
+                report += f"Min / Maks: {stats.minimum:g} / {stats.maximum:g} {unit}\n"
+                report += f"Trend: {stats.trend()}\n\n"
         
         return report 
\ No newline at end of file
@@ -5,17 +5,24 @@ from datetime import datetime, timedelta
 import plotly.express as px
 import plotly.graph_objects as go
 from PIL import Image
-import pytesseract
-import cv2
 import json
 import re
+from image_pipeline import get_image_pipeline
+from appointment_scheduler import DEFAULT_RESOURCE, get_scheduler
+from lab_extraction import (LabReferenceTable, LabResultExtractor, classify_lab_results,
+                            normalize_name, summarize_lab_results)
 
 class ClinicalWorkflow:
     def __init__(self):
-        self.appointment_slots = self.generate_appointment_slots()
+        # Randevular kaynak ve gün başına bit maskeli kalıcı takvimde tutulur
+        self.scheduler = get_scheduler()
         self.medical_codes = self.load_medical_codes()
         self.report_templates = self.load_report_templates()
         self.ai_findings = {}
+        # OCR süreç havuzunda ve önbellekli yapılır (süreç genelinde paylaşılır)
+        self.image_pipeline = get_image_pipeline()
+        self.lab_extractor = LabResultExtractor()
+        self.lab_reference = LabReferenceTable()
         
     def load_medical_codes(self):
         """ICD-10 ve diğer tıbbi kodları yükle"""
@@ -39,70 +46,64 @@ class ClinicalWorkflow:
             }
         }
     
-    def generate_appointment_slots(self):
-        """Randevu slotları oluştur"""
+    @property
+    def appointment_slots(self):
+        """Önümüzdeki haftanın slotları"""
+        return self.generate_appointment_slots()
+    
+    def generate_appointment_slots(self, start_date=None, n_days=7, resource=DEFAULT_RESOURCE):
+        """Randevu slotlarını listele (09:00-17:00, 30 dakikalık, hafta içi)
+
+        Slotlar kalıcı takvimde gün gün ve yalnızca istendiğinde oluşturulur.
+        """
         slots = []
-        start_date = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
-        
-        for day in range(7):  # Bir haftalık randevu
-            current_date = start_date + timedelta(days=day)
-            
-            # Hafta sonu kontrolü
-            if current_date.weekday() >= 5:  # 5: Cumartesi, 6: Pazar
-                continue
-                
-            # 09:00-17:00 arası 30'ar dakikalık slotlar
-            current_time = current_date
-            while current_time.hour < 17:
+        for day in self.scheduler.days(start_date, n_days):
+            bookings = self.scheduler.bookings(day, resource)
+            for slot in range(self.scheduler.slots_per_day):
+                slot_time = self.scheduler.slot_time(day, slot)
+                patient_id, reason = bookings.get(slot_time, (None, None))
                 slots.append({
-                    'datetime': current_time,
-                    'available': True,
-                    'patient_id': None,
-                    'reason': None
-                })
-                current_time += timedelta(minutes=30)
-        
-        return slots
-    
-    def schedule_appointment(self, patient_id, datetime_slot, reason):
-        """Randevu planla"""
-        for slot in self.appointment_slots:
-            if slot['datetime'] == datetime_slot and slot['available']:
-                slot.update({
-                    'available': False,
+                    'datetime': slot_time,
+                    'available': patient_id is None,
                     'patient_id': patient_id,
                     'reason': reason
                 })
-                return True
-        return False
+        return slots
     
-    def get_available_slots(self, date=None):
-        """Müsait randevu slotlarını getir"""
-        available_slots = []
-        for slot in self.appointment_slots:
-            if slot['available']:
-                if date is None or slot['datetime'].date() == date:
-                    available_slots.append(slot)
-        return available_slots
+    def schedule_appointment(self, patient_id, datetime_slot, reason, resource=DEFAULT_RESOURCE):
+        """Randevu planla (slot doluysa veya geçersizse False)"""
+        return self.scheduler.book(patient_id, datetime_slot, reason, resource)
+    
+    def get_available_slots(self, date=None, resource=DEFAULT_RESOURCE):
+        """Müsait randevu slotlarını getir (tarih verilmezse önümüzdeki hafta)"""
+        days = [date] if date is not None else self.scheduler.days()
+        return [
+            {'datetime': slot_time, 'available': True, 'patient_id': None, 'reason': None}
+            for day in days
+            for slot_time in self.scheduler.free_slots(day, resource)
+        ]
     
     def analyze_medical_image(self, image):
-        """Tıbbi görüntüleri analiz et"""
+        """Tıbbi görüntüleri analiz et (tek görüntü, çok sayfalı TIFF veya PDF)"""
         try:
-            # OpenCV ile görüntüyü işle
-            img = cv2.imdecode(np.frombuffer(image.read(), np.uint8), 1)
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            data = image.read()
             
-            # Görüntü iyileştirme
-            enhanced = cv2.equalizeHist(gray)
+            # Küçültme, eğiklik düzeltme, karolara bölme ve paralel OCR
+            # İlk sayfanın iyileştirilmiş hali OCR önişlemesinden alınır
+            result = self.image_pipeline.process(data, with_first_page=True)
+            text = result['text']
+            enhanced = result['first_page']
             
-            # Tesseract ile metin çıkarımı
-            text = pytesseract.image_to_string(enhanced)
+            # Metindeki laboratuvar sonuçları
+            lab_results = self.lab_extractor.extract(text)
             
             # AI analizi (örnek)
             findings = self.analyze_image_findings(enhanced)
             
             return {
                 'text': text,
+                'lab_results': lab_results,
+                'lab_analysis': self.analyze_lab_results(lab_results),
                 'findings': findings,
                 'abnormalities': self.detect_abnormalities(findings)
             }
@@ -142,39 +143,32 @@ class ClinicalWorkflow:
             return template.format(**data)
         return None
     
-    def analyze_lab_results(self, results):
-        """Laboratuvar sonuçlarını analiz et"""
-        analysis = {
-            'normal': [],
-            'high': [],
-            'low': [],
-            'critical': []
-        }
-        
-        reference_ranges = {
-            'hemoglobin': {'min': 12, 'max': 16},
-            'wbc': {'min': 4000, 'max': 11000},
-            'platelet': {'min': 150000, 'max': 450000},
-            'glucose': {'min': 70, 'max': 100}
-        }
-        
-        for test, value in results.items():
-            if test in reference_ranges:
-                ref = reference_ranges[test]
-                if value < ref['min']:
-                    if value < ref['min'] * 0.7:  # %30'dan fazla düşükse kritik
-                        analysis['critical'].append(f"{test}: {value} (Kritik düşük)")
-                    else:
-                        analysis['low'].append(f"{test}: {value} (Düşük)")
-                elif value > ref['max']:
-                    if value > ref['max'] * 1.3:  # %30'dan fazla yüksekse kritik
-                        analysis['critical'].append(f"{test}: {value} (Kritik yüksek)")
-                    else:
-                        analysis['high'].append(f"{test}: {value} (Yüksek)")
-                else:
-                    analysis['normal'].append(f"{test}: {value} (Normal)")
+    def analyze_lab_results(self, results, age=None, sex=None):
+        """Laboratuvar sonuçlarını analiz et
+
+        results: {test: değer} sözlüğü veya OCR'dan çıkarılmış sonuç tablosu
+        (test, value; isteğe bağlı age, sex sütunları). Referans aralıkları
+        yaş ve cinsiyete göre seçilir.
+        """
+        if isinstance(results, pd.DataFrame):
+            return summarize_lab_results(self.classify_lab_batch(results))
         
-        return analysis
+        names, values = list(results), list(results.values())
+        frame = pd.DataFrame({
+            'test': [self.lab_extractor.alias_map.get(normalize_name(name), name) for name in names],
+            'value': pd.to_numeric(pd.Series(values, dtype=object), errors='coerce'),
+            'age': age,
+            'sex': sex
+        })
+        return summarize_lab_results(self.classify_lab_batch(frame), names, values)
+    
+    def classify_lab_batch(self, results):
+        """Çok sayıda sonucu (ör. bir günlük klinik partisi) tek geçişte sınıflandır"""
+        return classify_lab_results(results, self.lab_reference)
+    
+    def extract_lab_results(self, texts, documents=None):
+        """OCR metinlerinden laboratuvar sonuç tablosu çıkar"""
+        return self.lab_extractor.extract_many(texts, documents)
     
     def create_workflow_dashboard(self, appointments, lab_results, image_analyses):
         """İş akışı gösterge paneli oluştur"""
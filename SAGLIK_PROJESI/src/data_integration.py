@@ -1,18 +1,60 @@
 import pandas as pd
+from wearable_ingestion import WearableIngestor, WearableStore
 
 class DataIntegration:
-    def __init__(self):
-        self.wearable_data = pd.DataFrame()
+    def __init__(self, wearable_store=None):
+        # Cihaz verisi bellekte değil, hasta/gün bölümlü diskteki depoda birikir
+        self.wearable_store = wearable_store or WearableStore()
+        self.wearable_ingestor = WearableIngestor(self.wearable_store)
         self.genetic_data = pd.DataFrame()
+        # (hasta, başlangıç, bitiş) -> okunan veri; içe almada boşaltılır
+        self._wearable_cache = {}
+
+    @property
+    def wearable_data(self):
+        """Depodaki tüm giyilebilir cihaz verisi"""
+        return self.get_wearable_data()
+
+    def get_wearable_data(self, patient_id=None, start=None, end=None):
+        """Hasta ve tarih aralığına göre süzülmüş cihaz verisi (önbellekli)"""
+        key = (patient_id, start, end)
+        data = self._wearable_cache.get(key)
+        if data is None:
+            if len(self._wearable_cache) >= 32:
+                self._wearable_cache.clear()
+            data = self._wearable_cache[key] = self.wearable_store.read(patient_id, start, end)
+        # Çağıranın değişiklikleri önbelleğe yansımasın
+        return data.copy(deep=False)
 
     def integrate_wearable_data(self, data):
-        """Wearable cihazlardan veri entegrasyonu"""
-        self.wearable_data = pd.DataFrame(data)
+        """Wearable cihazlardan veri entegrasyonu
+
+        data bir dosya yolu (JSON Lines/CSV), kayıt listesi veya DataFrame
+        olabilir; veriler doğrulanıp mevcut kayıtlara eklenir. İçe alma
+        istatistikleri döner.
+        """
+        try:
+            if isinstance(data, str):
+                return self.wearable_ingestor.ingest_file(data)
+            return self.wearable_ingestor.ingest_records(data)
+        finally:
+            self._wearable_cache.clear()
 
     def integrate_genetic_data(self, data):
         """Genetik test sonuçları entegrasyonu"""
-        self.genetic_data = pd.DataFrame(data)
+        genetic_data = pd.concat([self.genetic_data, pd.DataFrame(data)], ignore_index=True)
+        if 'patient_id' in genetic_data.columns:
+            # Aynı hasta için en son gelen sonuç geçerlidir
+            genetic_data['patient_id'] = genetic_data['patient_id'].astype(str)
+            genetic_data = genetic_data.drop_duplicates('patient_id', keep='last')
+        self.genetic_data = genetic_data.reset_index(drop=True)
+
+    def get_combined_data(self, patient_id=None, start=None, end=None):
+        """Kombine veri setini döndür
 
-    def get_combined_data(self):
-        """Kombine veri setini döndür"""
-        return pd.concat([self.wearable_data, self.genetic_data], axis=1) 
\ No newline at end of file
+        Cihaz ölçümleri genetik verilerle patient_id üzerinden birleştirilir.
+        """
+        wearable_data = self.get_wearable_data(patient_id, start, end)
+        if self.genetic_data.empty or 'patient_id' not in self.genetic_data.columns:
+            return wearable_data
+        return wearable_data.merge(self.genetic_data, on='patient_id', how='left')
\ No newline at end of file
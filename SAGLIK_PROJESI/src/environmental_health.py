@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 import requests
 import plotly.express as px
 import plotly.graph_objects as go
+from air_quality_client import get_air_quality_client
+from environmental_risk import EnvironmentalRiskEngine
 
 class EnvironmentalHealth:
     def __init__(self):
@@ -49,6 +51,11 @@ class EnvironmentalHealth:
             'ambulans': 5.0,  # kg CO2/km
             'tıbbi_atık': 0.5  # kg CO2/kg atık
         }
+        
+        # Eşikler ve koşul listeleri dizilere çevrilerek toplu puanlanır
+        self.risk_engine = EnvironmentalRiskEngine(
+            self.air_quality_thresholds, self.climate_related_conditions
+        )
 
     def get_air_quality_data(self, location):
         """Hava kalitesi verilerini al"""
@@ -56,87 +63,33 @@ class EnvironmentalHealth:
             # API key'i güvenli bir şekilde saklayın
             api_key = st.secrets["air_quality_api_key"]
             
-            # OpenWeatherMap API'den hava kalitesi verilerini al
-            url = f"http://api.openweathermap.org/data/2.5/air_pollution"
-            params = {
-                "lat": location['lat'],
-                "lon": location['lon'],
-                "appid": api_key
-            }
-            
-            response = requests.get(url, params=params)
-            data = response.json()
-            
-            if response.status_code == 200:
-                return {
-                    'PM2.5': data['list'][0]['components']['pm2_5'],
-                    'PM10': data['list'][0]['components']['pm10'],
-                    'O3': data['list'][0]['components']['o3'],
-                    'NO2': data['list'][0]['components']['no2']
-                }
-            else:
-                st.error("Hava kalitesi verileri alınamadı.")
-                return None
+            # OpenWeatherMap API'den hava kalitesi verilerini al (önbellekli, paylaşılan istemci)
+            client = get_air_quality_client(api_key)
+            return client.get(location['lat'], location['lon'])
                 
+        except requests.HTTPError:
+            st.error("Hava kalitesi verileri alınamadı.")
+            return None
         except Exception as e:
             st.error(f"Hava kalitesi verisi alma hatası: {str(e)}")
             return None
 
     def analyze_environmental_risks(self, air_quality, weather_data, patient_conditions):
         """Çevresel risk analizi yap"""
-        risks = []
-        
-        # Hava kalitesi riskleri
-        for pollutant, value in air_quality.items():
-            thresholds = self.air_quality_thresholds[pollutant]
-            if value > thresholds['unhealthy']:
-                risks.append({
-                    'type': 'air_quality',
-                    'severity': 'high',
-                    'description': f"Yüksek {pollutant} seviyesi: {value}"
-                })
-            elif value > thresholds['moderate']:
-                risks.append({
-                    'type': 'air_quality',
-                    'severity': 'medium',
-                    'description': f"Orta {pollutant} seviyesi: {value}"
-                })
-        
-        # Hava durumu riskleri
-        temp = weather_data.get('temperature', 20)
-        humidity = weather_data.get('humidity', 50)
-        
-        if temp > 35:
-            risks.extend([
-                {'type': 'weather', 'severity': 'high', 'description': risk}
-                for risk in self.climate_related_conditions['sıcak_hava']
-            ])
-        elif temp < 0:
-            risks.extend([
-                {'type': 'weather', 'severity': 'high', 'description': risk}
-                for risk in self.climate_related_conditions['soğuk_hava']
-            ])
-        
-        if humidity > 70:
-            risks.extend([
-                {'type': 'weather', 'severity': 'medium', 'description': risk}
-                for risk in self.climate_related_conditions['yüksek_nem']
-            ])
-        
-        # Hasta koşullarına göre özel riskler
-        for condition in patient_conditions:
-            if 'astım' in condition.lower():
-                risks.extend([
-                    {'type': 'condition', 'severity': 'high', 'description': risk}
-                    for risk in self.climate_related_conditions['hava_kirliliği']
-                ])
-            if 'alerji' in condition.lower():
-                risks.extend([
-                    {'type': 'condition', 'severity': 'medium', 'description': risk}
-                    for risk in self.climate_related_conditions['polen']
-                ])
-        
-        return risks
+        return self.risk_engine.score([air_quality], [weather_data], [patient_conditions])[0]
+
+    def analyze_environmental_risks_batch(self, air_quality, weather_data=None, patient_conditions=None,
+                                          as_frame=False):
+        """Çok sayıda hasta için çevresel risk analizi
+
+        air_quality hasta başına bir satır (kirletici sütunları) içeren
+        DataFrame veya dict listesidir; weather_data ve patient_conditions
+        aynı sırayla hizalanır. Hasta başına risk listeleri, as_frame=True
+        ile tek bir uzun tablo döner.
+        """
+        if as_frame:
+            return self.risk_engine.score_frame(air_quality, weather_data, patient_conditions)
+        return self.risk_engine.score(air_quality, weather_data, patient_conditions)
 
     def calculate_carbon_footprint(self, medical_data):
         """Karbon ayak izi hesapla"""
@@ -0,0 +1,222 @@
+import numpy as np
+import pandas as pd
+
+# Kirletici seviyeleri
+LEVEL_NORMAL, LEVEL_MODERATE, LEVEL_UNHEALTHY = 0, 1, 2
+
+# Hava durumu eşikleri ve eksik değerler için varsayılanlar
+HOT_TEMPERATURE = 35
+COLD_TEMPERATURE = 0
+HIGH_HUMIDITY = 70
+DEFAULT_WEATHER = {'temperature': 20, 'humidity': 50}
+
+
+def _as_table(records, columns=None):
+    """DataFrame veya dict listesini (sütunlar, float matris, ham değerler) üçlüsüne çevir"""
+    if isinstance(records, pd.DataFrame):
+        columns = list(records.columns) if columns is None else columns
+        table = records.reindex(columns=columns)
+        return columns, table.to_numpy(dtype=np.float64, na_value=np.nan), table.to_numpy(dtype=object)
+
+    if columns is None:
+        # Sütun sırası kayıtlarda ilk görülme sırasıdır
+        columns = list(dict.fromkeys(key for record in records for key in record))
+    raw = np.empty((len(records), len(columns)), dtype=object)
+    for i, record in enumerate(records):
+        raw[i] = [record.get(column) for column in columns]
+    values = pd.DataFrame(raw, columns=columns).apply(pd.to_numeric, errors='coerce')
+    return columns, values.to_numpy(dtype=np.float64, na_value=np.nan), raw
+
+
+class EnvironmentalRiskEngine:
+    """Çok sayıda hasta için vektörel çevresel risk puanlama
+
+    Kirletici eşikleri dizilere çevrilir; N hasta x kirletici matrisi tek
+    NumPy adımında seviyelere ayrılır, hava durumu ve hasta koşulları da
+    dizi maskeleriyle değerlendirilir. Üretilen risk listeleri
+    EnvironmentalHealth.analyze_environmental_risks ile aynıdır.
+    """
+
+    def __init__(self, air_quality_thresholds, climate_related_conditions):
+        self.air_quality_thresholds = air_quality_thresholds
+        self.climate_related_conditions = climate_related_conditions
+
+    def thresholds(self, pollutants):
+        """Kirleticiler için (orta, sağlıksız) eşik dizileri"""
+        # Bilinmeyen kirletici tek hasta fonksiyonundaki gibi KeyError verir
+        moderate = np.array([self.air_quality_thresholds[p]['moderate'] for p in pollutants], dtype=np.float64)
+        unhealthy = np.array([self.air_quality_thresholds[p]['unhealthy'] for p in pollutants], dtype=np.float64)
+        return moderate, unhealthy
+
+    def pollutant_levels(self, values, pollutants):
+        """N x kirletici değer matrisini seviye matrisine çevir (eksik değer normal sayılır)"""
+        moderate, unhealthy = self.thresholds(pollutants)
+        return np.select(
+            [values > unhealthy, values > moderate],
+            [LEVEL_UNHEALTHY, LEVEL_MODERATE],
+            LEVEL_NORMAL
+        ).astype(np.int8)
+
+    def weather_flags(self, weather, n_patients):
+        """Sıcak, soğuk ve nemli hava maskeleri"""
+        if weather is None:
+            weather = [{}] * n_patients
+        _, values, _ = _as_table(weather, list(DEFAULT_WEATHER))
+        defaults = np.array(list(DEFAULT_WEATHER.values()), dtype=np.float64)
+        values = np.where(np.isnan(values), defaults, values)
+        temperature, humidity = values[:, 0], values[:, 1]
+        hot = temperature > HOT_TEMPERATURE
+        cold = ~hot & (temperature < COLD_TEMPERATURE)
+        return hot, cold, humidity > HIGH_HUMIDITY
+
+    def condition_flags(self, patient_conditions):
+        """Tüm hastaların koşullarını tek seride düzleştirip astım/alerji maskeleri çıkar"""
+        lengths = np.array([len(conditions) for conditions in patient_conditions], dtype=np.intp)
+        flat = [condition for conditions in patient_conditions for condition in conditions]
+        # Koşul adları az sayıda farklı değerden oluşur; metin işlemi yalnızca bunlara uygulanır
+        codes, uniques = pd.factorize(np.array(flat, dtype=object))
+        lowered = [condition.lower() for condition in uniques]
+        asthma = np.array(['astım' in condition for condition in lowered], dtype=bool)[codes]
+        allergy = np.array(['alerji' in condition for condition in lowered], dtype=bool)[codes]
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        return asthma, allergy, offsets
+
+    def _risks(self, risk_type, severity, condition_key):
+        return [{'type': risk_type, 'severity': severity, 'description': risk}
+                for risk in self.climate_related_conditions[condition_key]]
+
+    def score(self, air_quality, weather=None, patient_conditions=None):
+        """Hasta başına risk listelerini döndür
+
+        air_quality: kirletici sütunlu DataFrame veya hasta başına dict
+        listesi. weather: temperature/humidity sütunlu DataFrame veya dict
+        listesi. patient_conditions: hasta başına koşul listeleri.
+        """
+        pollutants, values, raw = _as_table(air_quality)
+        n_patients = len(values)
+        levels = self.pollutant_levels(values, pollutants)
+        hot, cold, humid = self.weather_flags(weather, n_patients)
+        if patient_conditions is None:
+            patient_conditions = [[]] * n_patients
+        asthma, allergy, offsets = self.condition_flags(patient_conditions)
+
+        weather_risks = {
+            'hot': self._risks('weather', 'high', 'sıcak_hava'),
+            'cold': self._risks('weather', 'high', 'soğuk_hava'),
+            'humid': self._risks('weather', 'medium', 'yüksek_nem'),
+            'asthma': self._risks('condition', 'high', 'hava_kirliliği'),
+            'allergy': self._risks('condition', 'medium', 'polen')
+        }
+
+        # Sayısal değerlendirme bitti; yalnızca risk kayıtları oluşturuluyor
+        templates = {
+            LEVEL_UNHEALTHY: ('high', 'Yüksek'),
+            LEVEL_MODERATE: ('medium', 'Orta')
+        }
+        results = [[] for _ in range(n_patients)]
+        raw_columns = [raw[:, col].tolist() for col in range(len(pollutants))]
+        flagged_rows, flagged_cols = np.nonzero(levels)
+        for row, col, level in zip(flagged_rows.tolist(), flagged_cols.tolist(),
+                                   levels[flagged_rows, flagged_cols].tolist()):
+            severity, label = templates[level]
+            results[row].append({
+                'type': 'air_quality',
+                'severity': severity,
+                'description': f"{label} {pollutants[col]} seviyesi: {raw_columns[col][row]}"
+            })
+
+        # NumPy skalerleri yerine Python listeleri üzerinde dolaşmak çok daha hızlıdır
+        asthma, allergy, offsets = asthma.tolist(), allergy.tolist(), offsets.tolist()
+        for i, (risks, is_hot, is_cold, is_humid) in enumerate(
+                zip(results, hot.tolist(), cold.tolist(), humid.tolist())):
+            if is_hot:
+                risks.extend([dict(risk) for risk in weather_risks['hot']])
+            elif is_cold:
+                risks.extend([dict(risk) for risk in weather_risks['cold']])
+            if is_humid:
+                risks.extend([dict(risk) for risk in weather_risks['humid']])
+            for j in range(offsets[i], offsets[i + 1]):
+                if asthma[j]:
+                    risks.extend([dict(risk) for risk in weather_risks['asthma']])
+                if allergy[j]:
+                    risks.extend([dict(risk) for risk in weather_risks['allergy']])
+        return results
+
+    def score_frame(self, air_quality, weather=None, patient_conditions=None):
+        """Riskleri tek bir uzun tablo olarak döndür (patient, type, severity, description)
+
+        score ile aynı riskleri aynı sırayla üretir, ancak hasta başına
+        sözlük listeleri oluşturmadan tamamen dizi işlemleriyle çalışır;
+        toplu uyarı işleri için uygundur. patient, girdideki satır sırasıdır.
+        """
+        pollutants, values, raw = _as_table(air_quality)
+        n_patients = len(values)
+        levels = self.pollutant_levels(values, pollutants)
+        hot, cold, humid = self.weather_flags(weather, n_patients)
+        if patient_conditions is None:
+            patient_conditions = [[]] * n_patients
+        asthma, allergy, offsets = self.condition_flags(patient_conditions)
+        owners = np.repeat(np.arange(n_patients), np.diff(offsets))
+
+        # Her parça: hasta, sıralama anahtarları (grup, alt sıra), tür ve açıklama kodları.
+        # Metinler yalnızca benzersiz değerler için bir kez üretilir (kategorik sütunlar).
+        types = ['air_quality', 'weather', 'condition']
+        severities = ['high', 'medium']
+        descriptions = []
+        pieces = []
+
+        rows, cols = np.nonzero(levels)
+        row_levels = levels[rows, cols]
+        for col, pollutant in enumerate(pollutants):
+            for level, severity, label in [(LEVEL_UNHEALTHY, 0, 'Yüksek'), (LEVEL_MODERATE, 1, 'Orta')]:
+                selected = np.flatnonzero((cols == col) & (row_levels == level))
+                if not len(selected):
+                    continue
+                codes, uniques = pd.factorize(raw[rows[selected], col])
+                offset = len(descriptions)
+                descriptions.extend(f"{label} {pollutant} seviyesi: {value}" for value in uniques)
+                count = len(selected)
+                pieces.append((rows[selected], np.zeros(count, dtype=np.intp),
+                               np.full(count, col, dtype=np.intp), np.zeros(count, dtype=np.intp),
+                               np.full(count, severity, dtype=np.intp), codes + offset))
+
+        # Aynı gruptaki riskler alt sıra anahtarıyla (başlangıç + liste içi konum) sıralanır
+        stride = max(len(risks) for risks in self.climate_related_conditions.values())
+
+        def add(patients, group, base, risk_type, severity, condition_key):
+            offset = len(descriptions)
+            descriptions.extend(self.climate_related_conditions[condition_key])
+            k, count = len(self.climate_related_conditions[condition_key]), len(base)
+            positions = np.tile(np.arange(k), count)
+            pieces.append((np.repeat(patients, k), np.full(count * k, group, dtype=np.intp),
+                           np.repeat(base, k) + positions,
+                           np.full(count * k, types.index(risk_type), dtype=np.intp),
+                           np.full(count * k, severities.index(severity), dtype=np.intp),
+                           positions + offset))
+
+        for mask, group, condition_key, severity in [(hot, 1, 'sıcak_hava', 'high'),
+                                                     (cold, 1, 'soğuk_hava', 'high'),
+                                                     (humid, 2, 'yüksek_nem', 'medium')]:
+            patients = np.flatnonzero(mask)
+            add(patients, group, np.zeros(len(patients), dtype=np.intp), 'weather', severity, condition_key)
+
+        # Koşul riskleri koşul sırasıyla; aynı koşulda önce astım sonra alerji riskleri
+        condition_index = np.flatnonzero(asthma)
+        add(owners[condition_index], 3, condition_index * 2 * stride,
+            'condition', 'high', 'hava_kirliliği')
+        condition_index = np.flatnonzero(allergy)
+        add(owners[condition_index], 3, condition_index * 2 * stride + stride,
+            'condition', 'medium', 'polen')
+
+        patient, group, sub, type_codes, severity_codes, description_codes = (
+            np.concatenate(parts) for parts in zip(*pieces)
+        )
+        order = np.lexsort((sub, group, patient))
+        # Aynı metin birden çok kez eklenmiş olabilir; kategoriler benzersiz olmalı
+        remap, categories = pd.factorize(np.array(descriptions, dtype=object))
+        return pd.DataFrame({
+            'patient': patient[order],
+            'type': pd.Categorical.from_codes(type_codes[order], types),
+            'severity': pd.Categorical.from_codes(severity_codes[order], severities),
+            'description': pd.Categorical.from_codes(remap[description_codes[order]], categories)
+        })
\ No newline at end of file
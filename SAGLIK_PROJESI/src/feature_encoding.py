@@ -0,0 +1,97 @@
+import numpy as np
+
+
+def feature_columns(columns):
+    """Model özellik sütunlarının sırasını döndür"""
+    # Belirti sütunlarını seç
+    symptom_cols = [col for col in columns if col.startswith('symptom_')]
+
+    # Kronik hastalık sütunlarını seç
+    chronic_cols = [col for col in columns if col.startswith('chronic_')]
+
+    # Temel özellikler
+    return symptom_cols + ['age', 'gender_encoded'] + chronic_cols
+
+
+class FeatureEncoder:
+    """Belirti/kronik hastalık sözlüğünden özellik matrisleri üretir
+
+    Sözlük (isim -> sütun) bir kez hesaplanır; 1 veya N hasta tek bir NumPy
+    atamasıyla yoğun ya da seyrek (CSR) matrise çevrilir. Sütun düzeni
+    feature_columns ile aynıdır.
+    """
+
+    def __init__(self, symptom_names, chronic_names):
+        self.symptom_names = list(symptom_names)
+        self.chronic_names = list(chronic_names)
+
+        n_symptoms = len(self.symptom_names)
+        self.age_col = n_symptoms
+        self.gender_col = n_symptoms + 1
+        self.symptom_index = {name: i for i, name in enumerate(self.symptom_names)}
+        self.chronic_index = {name: n_symptoms + 2 + i
+                              for i, name in enumerate(self.chronic_names)}
+        self.n_features = n_symptoms + 2 + len(self.chronic_names)
+
+    @classmethod
+    def from_columns(cls, columns):
+        """İşlenmiş veri setinin sütunlarından kodlayıcı oluştur"""
+        ordered = feature_columns(columns)
+        symptom_names = [col.replace('symptom_', '', 1) for col in ordered
+                         if col.startswith('symptom_')]
+        chronic_names = [col.replace('chronic_', '', 1) for col in ordered
+                         if col.startswith('chronic_')]
+        return cls(symptom_names, chronic_names)
+
+    @property
+    def columns(self):
+        """Özellik matrisinin sütun adları"""
+        return ([f'symptom_{name}' for name in self.symptom_names] +
+                ['age', 'gender_encoded'] +
+                [f'chronic_{name}' for name in self.chronic_names])
+
+    def _one_hot_positions(self, lists, index):
+        """İsim listelerini (satır, sütun) indekslerine çevir; bilinmeyenler atlanır"""
+        rows, cols = [], []
+        for row, names in enumerate(lists):
+            for name in names:
+                col = index.get(name)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        return rows, cols
+
+    def encode(self, symptom_lists, ages, genders, chronic_lists, sparse=False):
+        """N hasta için özellik matrisini oluştur"""
+        n_rows = len(ages)
+        symptom_rows, symptom_cols = self._one_hot_positions(symptom_lists, self.symptom_index)
+        chronic_rows, chronic_cols = self._one_hot_positions(chronic_lists, self.chronic_index)
+
+        rows = np.array(symptom_rows + chronic_rows, dtype=np.intp)
+        cols = np.array(symptom_cols + chronic_cols, dtype=np.intp)
+        ages = np.asarray(ages, dtype=float)
+        genders = (np.asarray(genders, dtype=object) == "Erkek").astype(float)
+
+        if sparse:
+            from scipy.sparse import csr_matrix
+            all_rows = np.concatenate([rows, np.arange(n_rows), np.arange(n_rows)])
+            all_cols = np.concatenate([cols, np.full(n_rows, self.age_col),
+                                       np.full(n_rows, self.gender_col)])
+            data = np.concatenate([np.ones(len(rows)), ages, genders])
+            matrix = csr_matrix((data, (all_rows, all_cols)),
+                                shape=(n_rows, self.n_features))
+            # Tekrarlanan isimler toplanmasın, 1 olarak kalsın
+            matrix.sum_duplicates()
+            matrix.data[np.isin(matrix.indices, [self.age_col, self.gender_col], invert=True)] = 1
+            matrix.eliminate_zeros()
+            return matrix
+
+        X = np.zeros((n_rows, self.n_features))
+        X[rows, cols] = 1
+        X[:, self.age_col] = ages
+        X[:, self.gender_col] = genders
+        return X
+
+    def encode_one(self, selected_symptoms, age, gender, chronic_conditions):
+        """Tek bir hastanın girdilerini özellik vektörüne çevir"""
+        return self.encode([selected_symptoms], [age], [gender], [chronic_conditions])[0]
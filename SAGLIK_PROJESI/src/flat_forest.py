@@ -0,0 +1,192 @@
+import glob
+import json
+import os
+import shutil
+import time
+import numpy as np
+
+# Yaprak düğümlerde sklearn'ün kullandığı özellik/çocuk işaretleri
+TREE_LEAF = -1
+
+ARRAY_NAMES = ['feature', 'threshold', 'left', 'right', 'value', 'roots', 'classes']
+
+
+class FlatForest:
+    """Eğitilmiş bir RandomForestClassifier'ın düzleştirilmiş hali
+
+    Tüm ağaçların düğümleri ardışık NumPy dizilerinde tutulur (özellik,
+    eşik, sol/sağ çocuk, yaprak olasılıkları). Tahmin sırasında tüm ağaçlar
+    ve tüm satırlar birlikte, derinlik başına tek bir vektörel adımla
+    dolaşılır. Yapraklar kendilerini işaret ettiği için en derin ağaca kadar
+    ilerlemek güvenlidir.
+    """
+
+    # Satır parçası başına (satır x ağaç x sınıf) eleman sınırı
+    max_chunk_elements = 4_000_000
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes = classes
+        self.max_depth = int(max_depth)
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """sklearn ormanını ardışık dizilere dönüştür"""
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        node_counts = np.array([tree.node_count for tree in trees])
+        roots = np.concatenate([[0], np.cumsum(node_counts)[:-1]]).astype(np.intp)
+
+        features, thresholds, lefts, rights, values = [], [], [], [], []
+        for tree, offset in zip(trees, roots):
+            node_ids = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left == TREE_LEAF
+
+            # Yapraklar kendi kendilerine döner; böylece dolaşım sabit adımda biter
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+
+            # Ağaç başına olasılıklar (sklearn'deki gibi satır toplamına normalize)
+            leaf_values = tree.value[:, 0, :].astype(np.float64)
+            totals = leaf_values.sum(axis=1, keepdims=True)
+            totals[totals == 0] = 1
+            values.append(leaf_values / totals)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values),
+            roots=roots,
+            classes=np.asarray(forest.classes_),
+            max_depth=max(tree.max_depth for tree in trees)
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def classes_(self):
+        # sklearn tahmincileriyle aynı arayüz
+        return self.classes
+
+    def apply(self, X):
+        """Her satır ve ağaç için ulaşılan yaprak düğümünü döndür"""
+        n_rows = X.shape[0]
+        node = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+        rows = np.arange(n_rows)[:, None]
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict_proba(self, X):
+        """sklearn predict_proba ile aynı olasılıkları hesapla"""
+        if hasattr(X, 'toarray'):
+            X = X.toarray()
+        # sklearn ağaçları girdiyi float32'ye çevirir; eşik karşılaştırmaları aynı kalsın
+        X = np.asarray(X, dtype=np.float32)
+
+        n_classes = self.value.shape[1]
+        chunk_rows = max(1, self.max_chunk_elements // (self.n_trees * n_classes))
+        proba = np.empty((X.shape[0], n_classes))
+        for start in range(0, X.shape[0], chunk_rows):
+            leaves = self.apply(X[start:start + chunk_rows])
+            proba[start:start + chunk_rows] = self.value[leaves].mean(axis=1)
+        return proba
+
+    def predict(self, X):
+        """En olası sınıf etiketlerini döndür"""
+        return self.classes.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def save(self, path):
+        """Dizileri ayrı .npy dosyaları olarak sürümlü bir dizine kaydet
+
+        Diziler <path>.v<zaman> dizinine yazılır ve path bu dizine işaret
+        eden sembolik bağ olarak os.replace ile atomik biçimde değiştirilir;
+        tembel yükleyen bir işçi model dizinini hiçbir an eksik görmez.
+        Önceki sürüm, onu o an açmakta olan süreçler için bir kayıt daha
+        tutulur. Sembolik bağ desteklenmiyorsa (ör. yetkisiz Windows) eski
+        dizin kenara alınıp yenisi yerine konur.
+        """
+        path = os.path.normpath(path)
+        version_path = f"{path}.v{time.time_ns()}"
+        tmp_path = f"{version_path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(tmp_path, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'max_depth': self.max_depth}, f)
+        os.rename(tmp_path, version_path)
+
+        link_path = f"{path}.link.tmp"
+        try:
+            if os.path.lexists(link_path):
+                os.remove(link_path)
+            os.symlink(os.path.basename(version_path), link_path, target_is_directory=True)
+        except (OSError, NotImplementedError):
+            self._swap_directory(version_path, path)
+            return
+
+        if os.path.isdir(path) and not os.path.islink(path):
+            # Sembolik bağdan önceki düz dizin düzeni: bir kereye mahsus kenara alınır
+            self._swap_directory(link_path, path)
+        else:
+            # Yeni sürüme geç; imzası değiştiği için önbellekler yeniden yükler
+            os.replace(link_path, path)
+        self._remove_old_versions(path, keep=2)
+
+    @staticmethod
+    def _swap_directory(new_path, path):
+        old_path = f"{path}.old"
+        shutil.rmtree(old_path, ignore_errors=True)
+        if os.path.lexists(path):
+            os.rename(path, old_path)
+        os.rename(new_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    @staticmethod
+    def _remove_old_versions(path, keep):
+        versions = sorted(version for version in glob.glob(f"{glob.escape(path)}.v*")
+                          if not version.endswith('.tmp'))
+        current = os.path.realpath(path)
+        for version in versions[:-keep]:
+            if os.path.realpath(version) != current:
+                shutil.rmtree(version, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """Kaydedilmiş düzleştirilmiş ormanı yükle
+
+        Varsayılan olarak diziler bellek eşlemeli açılır: veri kopyalanmaz,
+        sayfalar ilk erişimde diskten okunur ve aynı dosyayı açan süreçler
+        arasında paylaşılır.
+        """
+        # Bağ bir kez çözülür, böylece tüm diziler aynı sürümden okunur. Okurken
+        # sürüm eskiyip silindiyse bağ yeniden çözülür.
+        for attempt in range(3):
+            version_path = os.path.realpath(path)
+            try:
+                return cls._load_version(version_path, mmap_mode)
+            except FileNotFoundError:
+                if attempt == 2 or os.path.realpath(path) == version_path:
+                    raise
+
+    @classmethod
+    def _load_version(cls, path, mmap_mode):
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        # np.asarray memmap'i kopyalamadan düz ndarray görünümüne çevirir
+        arrays = {name: np.asarray(np.load(os.path.join(path, f'{name}.npy'),
+                                           mmap_mode=mmap_mode, allow_pickle=False))
+                  for name in ARRAY_NAMES}
+        return cls(max_depth=meta['max_depth'], **arrays)
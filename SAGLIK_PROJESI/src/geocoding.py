@@ -0,0 +1,324 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import pandas as pd
+from model_registry import get_registry
+
+# Sorgunun sonundaki ülke adı eşleşmeyi etkilemesin
+COUNTRY_TOKENS = {'turkiye', 'turkey'}
+
+
+def normalize_place(text):
+    """Yer adını karşılaştırma anahtarına çevir (Türkçe harf ve noktalama duyarsız)"""
+    text = str(text).replace('İ', 'i').replace('I', 'ı').lower()
+    text = ''.join(ch for ch in unicodedata.normalize('NFKD', text)
+                   if not unicodedata.combining(ch))
+    text = text.replace('ı', 'i')
+    tokens = [token for token in re.split(r'[^a-z0-9]+', text)
+              if token and token not in COUNTRY_TOKENS]
+    return ' '.join(tokens)
+
+
+class GeoPoint:
+    """Geocode sonucu (geopy Location ile aynı latitude/longitude/address alanları)"""
+
+    def __init__(self, latitude, longitude, address):
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.address = address
+
+    def __repr__(self):
+        return f"GeoPoint({self.latitude}, {self.longitude}, {self.address!r})"
+
+
+def load_gazetteer(path):
+    """İl/ilçe tablosunu oku ve normalize ad -> GeoPoint indeksini kur
+
+    İlçeler "ilçe il" ve "il ilçe" anahtarlarıyla, ayrıca başka bir yer
+    adıyla çakışmıyorsa tek başına indekslenir.
+    """
+    df = pd.read_csv(path)
+    index = {}
+    aliases = {}
+    for name, province, place_type, lat, lon in df[['name', 'province', 'type', 'lat', 'lon']].itertuples(index=False):
+        if place_type == 'il':
+            index[normalize_place(name)] = GeoPoint(lat, lon, f"{name}, Türkiye")
+            continue
+        point = GeoPoint(lat, lon, f"{name}, {province}, Türkiye")
+        index[normalize_place(f"{name} {province}")] = point
+        index[normalize_place(f"{province} {name}")] = point
+        aliases.setdefault(normalize_place(name), point)
+    for key, point in aliases.items():
+        index.setdefault(key, point)
+    return index
+
+
+class GazetteerGeocoder:
+    """Yerel il/ilçe tablosundan ağ bağlantısı olmadan geocode
+
+    Varsayılan olarak yalnızca sorgunun tamamı bir yer adıyla eşleşirse
+    sonuç döner. partial=True iken sorgudaki en uzun eşleşen kelime grubu
+    kullanılır (ör. sokak adresi için ilçe/il merkezi); bu yaklaşık sonuç
+    önbelleğe yazılmaz.
+    """
+
+    def __init__(self, path='data/turkey_gazetteer.csv', partial=False):
+        self.path = path
+        self.partial = partial
+        self.cacheable = not partial
+
+    @property
+    def index(self):
+        return get_registry().get(self.path, loader=load_gazetteer)
+
+    def geocode(self, query):
+        key = normalize_place(query)
+        index = self.index
+        if key in index or not self.partial:
+            return index.get(key)
+
+        tokens = key.split()
+        for size in range(len(tokens) - 1, 0, -1):
+            # Adreslerde özgül yer adı önce yazılır (ilçe, il); soldan başla
+            for start in range(len(tokens) - size + 1):
+                point = index.get(' '.join(tokens[start:start + size]))
+                if point is not None:
+                    return point
+        return None
+
+
+class GeocoderOffline(ConnectionError):
+    """Arka uç yakın zamanda bağlantı hatası verdiği için denenmedi"""
+
+
+class NominatimGeocoder:
+    """OpenStreetMap Nominatim istemcisi (kullanım politikası gereği en fazla 1 istek/sn)
+
+    Bağlantı hatası veya zaman aşımından sonra devre kesici açılır:
+    retry_after saniye boyunca istek atılmadan GeocoderOffline yükseltilir,
+    böylece ağ yokken her arama zaman aşımını beklemez.
+    """
+
+    cacheable = True
+
+    def __init__(self, user_agent="health_assistant", min_interval=1.0, timeout=5, retry_after=60.0):
+        from geopy.geocoders import Nominatim
+
+        self.geolocator = Nominatim(user_agent=user_agent, timeout=timeout)
+        self.min_interval = min_interval
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._last_request = 0.0
+        self._offline_until = 0.0
+
+    def geocode(self, query):
+        from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+
+        with self._lock:
+            if time.monotonic() < self._offline_until:
+                raise GeocoderOffline("Nominatim'e erişilemiyor; bir süre denenmeyecek")
+            wait = self._last_request + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                location = self.geolocator.geocode(query)
+            except (GeocoderTimedOut, GeocoderUnavailable, OSError):
+                self._offline_until = time.monotonic() + self.retry_after
+                raise
+            finally:
+                self._last_request = time.monotonic()
+        if location is None:
+            return None
+        return GeoPoint(location.latitude, location.longitude, location.address)
+
+
+class GeocodeCache:
+    """SQLite üzerinde kalıcı, boyutu sınırlı LRU geocode önbelleği"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS geocode_cache (
+            query TEXT PRIMARY KEY,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            address TEXT,
+            last_used REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_geocode_cache_last_used
+            ON geocode_cache (last_used);
+    """
+
+    def __init__(self, db_path='data/geocode_cache.db', max_entries=10000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # Her iş parçacığı kendi bağlantısını kullanır
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT latitude, longitude, address FROM geocode_cache WHERE query = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute('UPDATE geocode_cache SET last_used = ? WHERE query = ?',
+                         (time.time(), key))
+        return GeoPoint(*row)
+
+    def put(self, key, point):
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO geocode_cache (query, latitude, longitude, address, last_used) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, point.latitude, point.longitude, point.address, time.time())
+            )
+            # En uzun süredir kullanılmayan kayıtları sınırın altına indir
+            conn.execute(
+                'DELETE FROM geocode_cache WHERE query IN ('
+                'SELECT query FROM geocode_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM geocode_cache').fetchone()[0]
+
+
+class _PendingLookup:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class CachedGeocoder:
+    """Önbellekli ve arka uçları sırayla deneyen geocoder
+
+    Sorgu normalize edilip önce kalıcı önbellekte aranır. Bulunamazsa
+    arka uçlar sırayla denenir; hata veren (ör. ağ yok) arka uç atlanır.
+    Önceki bir arka uç hata verdiği için yaklaşık (önbelleğe yazılmayan)
+    arka uçtan gelen sonuç bellekte fallback_ttl saniye tutulur; ağ
+    yokken tekrarlanan aramalar da arka uçlara gitmez. Aynı yer için
+    eşzamanlı gelen istekler tek bir aramada birleştirilir.
+    """
+
+    def __init__(self, backends, cache=None, fallback_ttl=600.0):
+        self.backends = backends
+        self.cache = cache
+        self.fallback_ttl = fallback_ttl
+        # normalize sorgu -> (yaklaşık sonuç, geçerlilik sonu)
+        self._fallbacks = {}
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self.stats = {'hits': 0, 'lookups': 0, 'merged': 0}
+
+    def geocode(self, query):
+        key = normalize_place(query)
+        if not key:
+            return None
+        if self.cache is not None:
+            point = self.cache.get(key)
+            if point is not None:
+                self.stats['hits'] += 1
+                return point
+        with self._pending_lock:
+            fallback = self._fallbacks.get(key)
+            if fallback is not None and fallback[1] > time.monotonic():
+                self.stats['hits'] += 1
+                return fallback[0]
+
+        with self._pending_lock:
+            pending = self._pending.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._pending[key] = _PendingLookup()
+            else:
+                self.stats['merged'] += 1
+
+        if not leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+
+        try:
+            pending.result = self._lookup(key, query)
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._pending_lock:
+                del self._pending[key]
+            pending.done.set()
+        return pending.result
+
+    def _lookup(self, key, query):
+        self.stats['lookups'] += 1
+        last_error = None
+        for backend in self.backends:
+            try:
+                point = backend.geocode(query)
+            except Exception as e:
+                last_error = e
+                continue
+            if point is not None:
+                if self.cache is not None and backend.cacheable:
+                    self.cache.put(key, point)
+                elif last_error is not None:
+                    with self._pending_lock:
+                        if len(self._fallbacks) >= 1000:
+                            self._fallbacks.clear()
+                        self._fallbacks[key] = (point, time.monotonic() + self.fallback_ttl)
+                return point
+        if last_error is not None:
+            raise last_error
+        return None
+
+
+def create_geocoder(offline=None):
+    """Yapılandırmaya göre geocoder oluştur
+
+    Sıra: yerel il/ilçe tablosu (tam eşleşme), Nominatim, yerel tabloda
+    kısmi eşleşme. GEOCODER_OFFLINE=1 ile Nominatim hiç kullanılmaz.
+    """
+    if offline is None:
+        offline = os.environ.get('GEOCODER_OFFLINE', '0') == '1'
+    gazetteer_path = os.environ.get('GEOCODER_GAZETTEER', 'data/turkey_gazetteer.csv')
+
+    backends = [GazetteerGeocoder(gazetteer_path)]
+    if not offline:
+        backends.append(NominatimGeocoder())
+    backends.append(GazetteerGeocoder(gazetteer_path, partial=True))
+    cache = GeocodeCache(os.environ.get('GEOCODER_CACHE_PATH', 'data/geocode_cache.db'))
+    return CachedGeocoder(backends, cache)
+
+
+_geocoder = None
+_geocoder_lock = threading.Lock()
+
+
+def get_geocoder():
+    """Süreç genelinde tek bir geocoder döndür
+
+    Streamlit her etkileşimde PatientSafety'yi yeniden oluşturur; eşzamanlı
+    istek birleştirmenin çalışması için geocoder paylaşılmalıdır.
+    """
+    global _geocoder
+    with _geocoder_lock:
+        if _geocoder is None:
+            _geocoder = create_geocoder()
+        return _geocoder
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+from geopy.distance import geodesic
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Küresel (haversine) mesafe ile WGS-84 geodesic mesafe arasındaki göreli fark
+# %0.6'yı aşmaz; ön elemede bu pay bırakılır, kesin sıralama geodesic ile yapılır
+HAVERSINE_ERROR = 0.006
+# Geodesic mesafesi d olan noktanın haversine mesafesi en fazla d * HAVERSINE_MARGIN olur
+HAVERSINE_MARGIN = 1 / (1 - HAVERSINE_ERROR)
+# k-NN elemesinde pay iki kez gerekir: k. adayın geodesic mesafesi haversine'den
+# (1 + hata) kat uzun, elenen adayınki (1 - hata) kat kısa olabilir
+KNN_MARGIN = (1 + HAVERSINE_ERROR) / (1 - HAVERSINE_ERROR)
+
+# Bir enlem derecesinin en kısa uzunluğu (ekvatorda)
+KM_PER_LAT_DEGREE = 110.5
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Bir nokta ile koordinat dizileri arasındaki küresel mesafe (km)"""
+    lat, lon = np.radians(lat), np.radians(lon)
+    dlat = lats - lat
+    dlon = lons - lon
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class HospitalIndex:
+    """Hastane konumları için enleme göre sıralı uzamsal indeks
+
+    Yarıçap sorgusunda önce ikili arama ile enlem bandı seçilir, bant
+    içindeki adaylar vektörel haversine ile elenir; yalnızca yarıçap içinde
+    kalan adaylar için kesin geodesic mesafe hesaplanır.
+    """
+
+    def __init__(self, hospitals):
+        order = np.argsort(hospitals['lat'].to_numpy(dtype=float), kind='stable')
+        self.hospitals = hospitals.iloc[order].reset_index(drop=True)
+        self.lat = self.hospitals['lat'].to_numpy(dtype=float)
+        self.lon = self.hospitals['lon'].to_numpy(dtype=float)
+        self.lat_rad = np.radians(self.lat)
+        self.lon_rad = np.radians(self.lon)
+        self.emergency = self.hospitals['emergency'].astype(bool).to_numpy()
+
+    def __len__(self):
+        return len(self.hospitals)
+
+    def _lat_band(self, lat, radius_km):
+        """Yarıçapın kapsadığı enlem bandındaki hastane indeksleri"""
+        delta = radius_km * HAVERSINE_MARGIN / KM_PER_LAT_DEGREE
+        start = np.searchsorted(self.lat, lat - delta, side='left')
+        end = np.searchsorted(self.lat, lat + delta, side='right')
+        return np.arange(start, end)
+
+    def query(self, lat, lon, radius_km=None, k=None, emergency_only=False):
+        """Yarıçap ve/veya en yakın k hastane sorgusu
+
+        Sonuçlar geodesic mesafeye göre sıralı döner; biçim
+        PatientSafety.find_nearest_hospitals ile aynıdır.
+        """
+        if radius_km is not None:
+            candidates = self._lat_band(lat, radius_km)
+        else:
+            candidates = np.arange(len(self))
+        if emergency_only:
+            candidates = candidates[self.emergency[candidates]]
+
+        approx = haversine_km(lat, lon, self.lat_rad[candidates], self.lon_rad[candidates])
+        if radius_km is not None:
+            keep = approx <= radius_km * HAVERSINE_MARGIN
+            candidates, approx = candidates[keep], approx[keep]
+        if k is not None and len(candidates) > k:
+            # k. en yakın adaydan pay kadar uzaktakiler kesin olarak k dışında kalır
+            kth = np.partition(approx, k - 1)[k - 1]
+            keep = approx <= kth * KNN_MARGIN + 1e-9
+            candidates = candidates[keep]
+
+        exact = []
+        for i in candidates:
+            distance = geodesic((lat, lon), (self.lat[i], self.lon[i])).km
+            if radius_km is None or distance <= radius_km:
+                exact.append((distance, i))
+        exact.sort()
+        if k is not None:
+            exact = exact[:k]
+
+        results = []
+        for distance, i in exact:
+            hospital = self.hospitals.iloc[i]
+            results.append({
+                'name': hospital['name'],
+                'distance': round(distance, 2),
+                'coords': (hospital['lat'], hospital['lon']),
+                'emergency': hospital['emergency']
+            })
+        return results
+
+
+def load_hospital_table(path):
+    """Hastane tablosunu oku ve uzamsal indeksini kur"""
+    df = pd.read_csv(path)
+    return df, HospitalIndex(df)
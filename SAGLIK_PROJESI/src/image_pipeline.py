@@ -0,0 +1,390 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import cv2
+import numpy as np
+from PIL import Image, ImageSequence
+
+# Önişleme değiştiğinde eski önbellek kayıtları kullanılmasın diye anahtara eklenir
+PIPELINE_VERSION = 1
+
+PDF_MAGIC = b'%PDF'
+TIFF_MAGICS = (b'II*\x00', b'MM\x00*')
+
+
+def content_hash(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def iter_pages(data, dpi=200):
+    """Belgenin sayfalarını tek tek gri tonlamalı dizi olarak üret
+
+    PDF'ler (pdf2image gerekir) ve çok sayfalı TIFF'ler sayfa sayfa
+    çözülür; bellekte aynı anda yalnızca bir sayfa tutulur. Diğer
+    biçimler tek sayfalık görüntü olarak OpenCV ile çözülür.
+    """
+    if data.startswith(PDF_MAGIC):
+        try:
+            from pdf2image import convert_from_bytes, pdfinfo_from_bytes
+        except ImportError:
+            raise ImportError("PDF desteği için pdf2image (ve poppler) kurulmalıdır")
+        n_pages = pdfinfo_from_bytes(data)['Pages']
+        for page in range(1, n_pages + 1):
+            image = convert_from_bytes(data, dpi=dpi, first_page=page, last_page=page, grayscale=True)[0]
+            yield np.asarray(image.convert('L'))
+    elif data.startswith(TIFF_MAGICS):
+        with Image.open(io.BytesIO(data)) as tiff:
+            for frame in ImageSequence.Iterator(tiff):
+                yield np.asarray(frame.convert('L'))
+    else:
+        image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise ValueError("Görüntü çözülemedi")
+        yield image
+
+
+def downsample(gray, max_side=2400):
+    """Uzun kenarı max_side pikseli aşan sayfaları küçült (OCR için ~300 dpi yeterli)"""
+    scale = max_side / max(gray.shape)
+    if scale >= 1:
+        return gray
+    return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def binarize(gray):
+    """Metin pikselleri 255 olan ikili görüntü (tarama gürültüsü yumuşatılıp Otsu eşiği)"""
+    blurred = cv2.GaussianBlur(gray, (3, 3), 0)
+    return cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+
+
+def estimate_skew(binary, max_angle=15.0, step=0.5):
+    """Metin satırlarının eğim açısını (derece) yatay izdüşüm varyansıyla bul
+
+    Küçültülmüş görüntü aday açılarla döndürülür; satırlar yataya
+    oturduğunda satır toplamlarının varyansı en yüksek olur.
+    """
+    small = downsample(binary, 800)
+    height, width = small.shape
+    center = (width / 2, height / 2)
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-max_angle, max_angle + step / 2, step):
+        matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
+        rotated = cv2.warpAffine(small, matrix, (width, height), flags=cv2.INTER_NEAREST)
+        score = float(np.var(rotated.sum(axis=1, dtype=np.float64)))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+
+def deskew(gray, min_angle=0.25):
+    """Eğik taranmış sayfayı düzelt; düzeltilen görüntü ve açı döner"""
+    angle = estimate_skew(binarize(gray))
+    if abs(angle) < min_angle:
+        return gray, 0.0
+    height, width = gray.shape
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    rotated = cv2.warpAffine(gray, matrix, (width, height), flags=cv2.INTER_LINEAR,
+                             borderMode=cv2.BORDER_CONSTANT, borderValue=255)
+    return rotated, angle
+
+
+def text_lines(binary, min_ink=3):
+    """Mürekkep içeren ardışık satır aralıklarını (başlangıç, bitiş) olarak döndür"""
+    has_ink = np.count_nonzero(binary, axis=1) >= min_ink
+    edges = np.diff(np.concatenate([[0], has_ink.astype(np.int8), [0]]))
+    return list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+
+
+def text_regions(gray, max_height=400, padding=8):
+    """Metin karolarının (x, y, w, h) kutularını yukarıdan aşağı sırayla döndür
+
+    Karolar, satır aralarındaki boşluklardan kesilen ve en fazla
+    max_height piksel yüksekliğinde yatay metin bantlarıdır; boş alanlar
+    atlanır. Bir satır hiçbir zaman iki karoya bölünmez, böylece tablo
+    satırındaki test adı ve değeri aynı karoda kalır. Karolar paralel
+    OCR'lanabilecek kadar küçük, OCR çağrı maliyetini dengeleyecek kadar
+    büyüktür.
+    """
+    height, width = gray.shape
+    # Tek piksellik tarama gürültüsü satır sayılmasın diye açma uygulanır
+    binary = cv2.morphologyEx(binarize(gray), cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))
+
+    bands = []
+    for top, bottom in text_lines(binary):
+        # Tek başına çok uzun bloklar (ör. görseller) sınırdan kesilir
+        while bottom - top > max_height:
+            bands.append([top, top + max_height])
+            top += max_height
+        if bands and bottom - bands[-1][0] <= max_height:
+            bands[-1][1] = bottom
+        else:
+            bands.append([top, bottom])
+
+    boxes = []
+    for top, bottom in bands:
+        columns = np.flatnonzero(binary[top:bottom].any(axis=0))
+        x0, x1 = max(0, int(columns[0]) - padding), min(width, int(columns[-1]) + 1 + padding)
+        y0, y1 = max(0, top - padding), min(height, bottom + padding)
+        boxes.append((x0, y0, x1 - x0, y1 - y0))
+    return boxes
+
+
+class OCRError(RuntimeError):
+    """Karo OCR hatası; süreçler arasında sorunsuz taşınabilir"""
+
+
+def ocr_tile(tile, lang, config):
+    """Tek karonun metnini çıkar (süreç havuzunda çalışır)
+
+    pytesseract'ın bazı istisnaları (ör. TesseractNotFoundError) ana
+    süreçte yeniden oluşturulamaz ve havuzu bozar; bu nedenle hatalar
+    yalnızca mesaj taşıyan OCRError'a çevrilir.
+    """
+    try:
+        import pytesseract
+
+        return pytesseract.image_to_string(tile, lang=lang, config=config).strip()
+    except Exception as e:
+        raise OCRError(f"{type(e).__name__}: {e}") from None
+
+
+class OCRCache:
+    """İçerik özeti anahtarlı kalıcı SQLite OCR önbelleği"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS ocr_results (
+            key TEXT PRIMARY KEY,
+            text TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS page_images (
+            key TEXT PRIMARY KEY,
+            image BLOB NOT NULL
+        );
+    """
+
+    def __init__(self, db_path='data/ocr_cache.db'):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # Her iş parçacığı kendi bağlantısını kullanır
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute('SELECT text FROM ocr_results WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def put(self, key, text):
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO ocr_results (key, text) VALUES (?, ?)', (key, text))
+
+    def get_image(self, key):
+        """Önbellekteki gri tonlamalı sayfa görüntüsü (PNG olarak saklanır)"""
+        row = self._connect().execute('SELECT image FROM page_images WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return cv2.imdecode(np.frombuffer(row[0], np.uint8), cv2.IMREAD_GRAYSCALE)
+
+    def put_image(self, key, image):
+        data = cv2.imencode('.png', image)[1].tobytes()
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO page_images (key, image) VALUES (?, ?)', (key, data))
+
+
+class ImagePipeline:
+    """Tıbbi belge görüntüleri için karolu, paralel OCR hattı
+
+    Her sayfa küçültülür, eğikliği düzeltilir, metin bloklarına bölünür
+    ve kontrastı eşitlenir. Karolar süreç havuzunda paralel OCR'lanır;
+    sayfa N'nin karoları işlenirken sayfa N+1 önişlenir. Sonuçlar hem
+    belge hem sayfa içerik özetiyle önbelleğe alınır, aynı tarama tekrar
+    yüklendiğinde OCR yapılmaz.
+    """
+
+    def __init__(self, lang='eng', max_workers=None, cache=None, max_side=2400,
+                 pages_in_flight=2, config='--psm 6'):
+        self.lang = lang
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self.cache = cache
+        self.max_side = max_side
+        self.pages_in_flight = pages_in_flight
+        self.config = config
+        self._executor = None
+        self._lock = threading.Lock()
+        self.stats = {'pages': 0, 'tiles': 0, 'cache_hits': 0}
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Çok iş parçacıklı sunucu (Streamlit) içinden fork kilitlenebilir
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def _discard_executor(self, executor):
+        """Bozulan havuzu bırak; sonraki kullanımda yenisi oluşturulur"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit_tiles(self, tiles, retry=True):
+        executor = self.executor
+        try:
+            return executor, [executor.submit(ocr_tile, tile, self.lang, self.config) for tile in tiles]
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            if not retry:
+                raise
+            return self._submit_tiles(tiles, retry=False)
+
+    def _key(self, *parts):
+        return content_hash(PIPELINE_VERSION, self.lang, self.config, self.max_side, *parts)
+
+    def preprocess(self, gray):
+        """OCR öncesi sayfa hazırlığı: küçültme ve eğiklik düzeltme"""
+        return deskew(downsample(gray, self.max_side))[0]
+
+    def _submit_page(self, gray):
+        key = self._key(gray.shape, gray.tobytes())
+        text = self.cache.get(key) if self.cache is not None else None
+        if text is not None:
+            self.stats['cache_hits'] += 1
+            return key, text, None, None
+        page = self.preprocess(gray)
+        # Bölgeler eşitlenmemiş sayfada aranır; eşitleme arka plan gürültüsünü büyütür
+        boxes = text_regions(page) or [(0, 0, page.shape[1], page.shape[0])]
+        page = cv2.equalizeHist(page)
+        self.stats['tiles'] += len(boxes)
+        tiles = [np.ascontiguousarray(page[y:y + h, x:x + w]) for x, y, w, h in boxes]
+        return key, None, (tiles, *self._submit_tiles(tiles)), page
+
+    def _collect(self, key, text, submitted, page):
+        if text is None:
+            tiles, executor, futures = submitted
+            try:
+                results = [future.result() for future in futures]
+            except BrokenProcessPool:
+                # Bir işçi öldü (ör. bellek yetersizliği); havuz yenilenip karolar bir kez daha denenir
+                self._discard_executor(executor)
+                results = [future.result() for future in self._submit_tiles(tiles, retry=False)[1]]
+            text = '\n'.join(result for result in results if result)
+            if self.cache is not None:
+                self.cache.put(key, text)
+        self.stats['pages'] += 1
+        return text, page
+
+    def _iter_results(self, data):
+        """(metin, eşitlenmiş sayfa) çiftleri; sayfa önbellekten geldiyse sayfa None"""
+        pending = deque()
+        for gray in iter_pages(data):
+            pending.append(self._submit_page(gray))
+            if len(pending) > self.pages_in_flight:
+                yield self._collect(*pending.popleft())
+        while pending:
+            yield self._collect(*pending.popleft())
+
+    def iter_pages(self, data):
+        """Belge sayfalarının metnini sayfa sırasıyla, hazır oldukça üret"""
+        for text, _ in self._iter_results(data):
+            yield text
+
+    def process(self, data, with_first_page=False):
+        """Belgenin (görüntü, çok sayfalı TIFF veya PDF baytları) tüm metnini döndür
+
+        with_first_page ise OCR için önişlenmiş ilk sayfa da 'first_page'
+        anahtarıyla döner. Sayfa OCR sırasında hazırlanan görüntüden alınır
+        ve önbelleğe yazılır; belge önbellekten geldiğinde de yeniden
+        çözülüp düzeltilmez.
+        """
+        document_key = self._key('document', content_hash(data))
+        first_page_key = self._key('first_page', document_key)
+        if self.cache is not None:
+            cached = self.cache.get(document_key)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                result = {'text': cached, 'cached': True}
+                if with_first_page:
+                    result['first_page'] = self._first_page(data, first_page_key)
+                return result
+
+        texts, first_page = [], None
+        for text, page in self._iter_results(data):
+            if not texts:
+                first_page = page
+            texts.append(text)
+        text = '\n\n'.join(texts)
+        if self.cache is not None:
+            self.cache.put(document_key, text)
+            if first_page is not None:
+                self.cache.put_image(first_page_key, first_page)
+        result = {'text': text, 'cached': False}
+        if with_first_page:
+            result['first_page'] = (first_page if first_page is not None
+                                    else self._first_page(data, first_page_key))
+        return result
+
+    def _first_page(self, data, key):
+        page = self.cache.get_image(key) if self.cache is not None else None
+        if page is None:
+            page = self.first_page(data)
+            if self.cache is not None:
+                self.cache.put_image(key, page)
+        return page
+
+    def first_page(self, data):
+        """İlk sayfanın önişlenmiş ve kontrastı eşitlenmiş hali (görüntü bulguları için)"""
+        return cv2.equalizeHist(self.preprocess(next(iter_pages(data))))
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+def create_image_pipeline():
+    """Yapılandırmaya göre OCR hattını oluştur
+
+    OCR_LANG (varsayılan 'eng', ör. 'tur+eng'), OCR_WORKERS ve OCR_CACHE_PATH ortam
+    değişkenleriyle ayarlanır.
+    """
+    workers = os.environ.get('OCR_WORKERS')
+    return ImagePipeline(
+        lang=os.environ.get('OCR_LANG', 'eng'),
+        max_workers=int(workers) if workers else None,
+        cache=OCRCache(os.environ.get('OCR_CACHE_PATH', 'data/ocr_cache.db'))
+    )
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_image_pipeline():
+    """Süreç genelinde tek bir OCR hattı (ve süreç havuzu) döndür"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = create_image_pipeline()
+        return _pipeline
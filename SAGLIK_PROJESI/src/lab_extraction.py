@@ -0,0 +1,317 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Standart test adı -> raporlarda geçen adlar (Türkçe, İngilizce ve kısaltmalar).
+# Büyük harf içeren kısaltmalar büyük/küçük harf duyarlı aranır ('ALT', 'alt sınır' ile karışmasın)
+TEST_ALIASES = {
+    'hemoglobin': ['hemoglobin', 'HGB', 'Hb'],
+    'wbc': ['WBC', 'lökosit', 'lokosit', 'beyaz küre', 'white blood cell'],
+    'platelet': ['platelet', 'trombosit', 'PLT'],
+    'glucose': ['glucose', 'glukoz', 'glikoz', 'açlık kan şekeri', 'kan şekeri'],
+    'creatinine': ['creatinine', 'kreatinin'],
+    'alt': ['ALT', 'SGPT', 'alanin aminotransferaz'],
+    'ast': ['AST', 'SGOT', 'aspartat aminotransferaz'],
+    'tsh': ['TSH'],
+    'hba1c': ['HbA1c', 'HBA1C', 'hemoglobin a1c'],
+    'ldl': ['LDL', 'ldl kolesterol'],
+    'cholesterol': ['total kolesterol', 'kolesterol', 'cholesterol'],
+    'sodium': ['sodyum', 'sodium'],
+    'potassium': ['potasyum', 'potassium']
+}
+
+# (test, cinsiyet, yaş alt sınırı, yaş üst sınırı (hariç), min, max, birim)
+# 'any' ve 0-200 yaş satırı, hasta bilgisi yokken kullanılan varsayılan aralıktır
+REFERENCE_RANGES = pd.DataFrame([
+    ('hemoglobin', 'any', 0, 200, 12, 16, 'g/dl'),
+    ('hemoglobin', 'any', 0, 12, 11.5, 15.5, 'g/dl'),
+    ('hemoglobin', 'male', 12, 200, 13.5, 17.5, 'g/dl'),
+    ('hemoglobin', 'female', 12, 200, 12, 15.5, 'g/dl'),
+    ('wbc', 'any', 0, 200, 4000, 11000, '/µl'),
+    ('wbc', 'any', 0, 12, 5000, 14500, '/µl'),
+    ('platelet', 'any', 0, 200, 150000, 450000, '/µl'),
+    ('glucose', 'any', 0, 200, 70, 100, 'mg/dl'),
+    ('creatinine', 'any', 0, 200, 0.6, 1.2, 'mg/dl'),
+    ('creatinine', 'any', 0, 12, 0.3, 0.7, 'mg/dl'),
+    ('creatinine', 'male', 12, 200, 0.7, 1.3, 'mg/dl'),
+    ('creatinine', 'female', 12, 200, 0.6, 1.1, 'mg/dl'),
+    ('alt', 'any', 0, 200, 7, 56, 'u/l'),
+    ('ast', 'any', 0, 200, 10, 40, 'u/l'),
+    ('tsh', 'any', 0, 200, 0.4, 4.0, 'miu/l'),
+    ('hba1c', 'any', 0, 200, 4.0, 5.6, '%'),
+    ('ldl', 'any', 0, 200, 0, 130, 'mg/dl'),
+    ('cholesterol', 'any', 0, 200, 0, 200, 'mg/dl'),
+    ('sodium', 'any', 0, 200, 135, 145, 'mmol/l'),
+    ('potassium', 'any', 0, 200, 3.5, 5.1, 'mmol/l')
+], columns=['test', 'sex', 'age_min', 'age_max', 'min', 'max', 'unit'])
+
+# Raporda farklı birimle verilen değerlerin referans birimine çarpanları
+UNIT_FACTORS = {
+    ('wbc', '10^3/µl'): 1000,
+    ('platelet', '10^3/µl'): 1000,
+    ('hemoglobin', 'g/l'): 0.1,
+    ('glucose', 'mmol/l'): 18.016,
+    ('cholesterol', 'mmol/l'): 38.67,
+    ('ldl', 'mmol/l'): 38.67,
+    ('creatinine', 'µmol/l'): 1 / 88.42,
+    ('sodium', 'meq/l'): 1,
+    ('potassium', 'meq/l'): 1,
+    ('tsh', 'µiu/ml'): 1
+}
+
+KNOWN_UNITS = set(REFERENCE_RANGES['unit']) | {unit for _, unit in UNIT_FACTORS}
+
+# Test başına referans birimi (dönüştürülen değerler bu birimdedir)
+REFERENCE_UNITS = dict(zip(REFERENCE_RANGES['test'], REFERENCE_RANGES['unit']))
+
+SEX_ALIASES = {
+    'erkek': 'male', 'e': 'male', 'male': 'male', 'm': 'male',
+    'kadın': 'female', 'kadin': 'female', 'k': 'female', 'female': 'female', 'f': 'female'
+}
+
+# Kritik eşikler: referans alt sınırının %70'i ve üst sınırının %130'u
+CRITICAL_LOW_FACTOR = 0.7
+CRITICAL_HIGH_FACTOR = 1.3
+
+STATUS_LABELS = {
+    'critical_low': ('critical', 'Kritik düşük'),
+    'low': ('low', 'Düşük'),
+    'critical_high': ('critical', 'Kritik yüksek'),
+    'high': ('high', 'Yüksek'),
+    'normal': ('normal', 'Normal'),
+    'unknown': (None, None)
+}
+
+CATEGORIES = ['normal', 'high', 'low', 'critical']
+
+
+def normalize_name(name):
+    """Test adını eşleme için sadeleştir (küçük harf, tek boşluk)"""
+    return ' '.join(name.casefold().replace('̇', '').split())
+
+
+def normalize_unit(unit):
+    """Birim yazımlarını tek biçime getir (ör. 'x10^3/uL', 'K/µL' -> '10^3/µl')"""
+    if not isinstance(unit, str) or not unit:
+        return None
+    unit = unit.casefold().replace('μ', 'µ').replace('³', '^3').replace('⁶', '^6')
+    if unit.startswith('x'):
+        unit = unit[1:]
+    if unit.startswith('k/'):
+        unit = '10^3/' + unit[2:]
+    unit = re.sub(r'(^|/)u(?=[a-z])', r'\1µ', unit)
+    unit = re.sub(r'^10(\d)', r'10^\1', unit)
+    return unit if unit in KNOWN_UNITS else None
+
+
+def normalize_sex(values, n):
+    if values is None:
+        return np.full(n, None, dtype=object)
+    return np.array([SEX_ALIASES.get(str(value).strip().casefold()) if value is not None else None
+                     for value in values], dtype=object)
+
+
+class LabResultExtractor:
+    """OCR metninden (test, değer, birim) satırlarını çıkaran derlenmiş ifade
+
+    Tüm test adları uzundan kısaya sıralanmış tek bir alternasyonda
+    birleştirilir; metin test sayısından bağımsız olarak tek geçişte
+    taranır. Çok sayıda belge pandas extractall ile birlikte işlenir ve
+    sonuç sütunsal bir tabloya dönüşür.
+    """
+
+    def __init__(self, aliases=None):
+        aliases = aliases or TEST_ALIASES
+        self.alias_map = {}
+        patterns = {}
+        for test, names in aliases.items():
+            for alias in names:
+                self.alias_map[normalize_name(alias)] = test
+                pattern = r'\s+'.join(re.escape(part) for part in alias.split())
+                patterns[alias] = pattern if alias.islower() else f'(?-i:{pattern})'
+        alternatives = sorted(patterns, key=len, reverse=True)
+        names = '|'.join(patterns[alias] for alias in alternatives)
+        self.pattern = re.compile(
+            rf'(?<!\w)(?P<name>{names})(?!\w)'
+            r'[^\d\n]{0,25}?'
+            r'(?P<value>\d+(?:[.,]\d+)?)'
+            r'[^\S\n]*(?P<unit>(?:x?10\^?\d+|10[³⁶])?/?[A-Za-zµμ%][A-Za-zµμ%/]*)?',
+            re.IGNORECASE
+        )
+
+    def extract(self, text):
+        """Tek belgedeki laboratuvar sonuçları"""
+        return self.extract_many([text]).drop(columns='document')
+
+    def extract_many(self, texts, documents=None):
+        """Belge listesinden tek tabloda sonuçlar (document, test, name, value, unit, raw_value, raw_unit)
+
+        value ve unit referans birimine dönüştürülmüş değerdir; raporda
+        yazan değer ve birim raw_value ve raw_unit sütunlarındadır.
+        """
+        index = pd.Index(range(len(texts)) if documents is None else documents, name='document')
+        matches = pd.Series(list(texts), index=index, dtype=object).fillna('').str.extractall(self.pattern)
+        columns = ['document', 'test', 'name', 'value', 'unit', 'raw_value', 'raw_unit']
+        if matches.empty:
+            return pd.DataFrame(columns=columns)
+        matches = matches.reset_index(level='match', drop=True).reset_index()
+
+        # Dönüşümler yalnızca benzersiz ad ve birimler için yapılır
+        names = matches['name'].astype(object)
+        name_codes, unique_names = pd.factorize(names)
+        tests = np.array([self.alias_map.get(normalize_name(name)) for name in unique_names],
+                         dtype=object)[name_codes]
+        raw_units = matches['unit'].astype(object).where(matches['unit'].notna(), None)
+        unit_codes, unique_units = pd.factorize(raw_units)
+        # Birimsiz eşleşmelerin kodu -1'dir; sondaki None'a denk gelir
+        units = np.array([normalize_unit(unit) for unit in unique_units] + [None], dtype=object)[unit_codes]
+
+        raw_values = pd.to_numeric(matches['value'].astype(object).str.replace(',', '.', regex=False),
+                                   errors='coerce').to_numpy(dtype=np.float64)
+        factors = np.array([UNIT_FACTORS.get((test, unit), 1.0) for test, unit in zip(tests, units)])
+        # Dönüştürülen satırların birimi referans birimi olur
+        units = np.array([REFERENCE_UNITS[test] if (test, unit) in UNIT_FACTORS else unit
+                          for test, unit in zip(tests, units)], dtype=object)
+        return pd.DataFrame({
+            'document': matches['document'],
+            'test': tests,
+            'name': names,
+            'value': raw_values * factors,
+            'unit': units,
+            'raw_value': raw_values,
+            'raw_unit': raw_units.to_numpy(dtype=object)
+        }, columns=columns)
+
+
+class LabReferenceTable:
+    """Test, cinsiyet ve yaş bandına göre indeksli referans aralıkları
+
+    Her sonuç için en özel eşleşen aralık seçilir: cinsiyete özgü satır
+    genel satırdan, dar yaş bandı varsayılan (0-200) banttan önce gelir.
+    Yaşı veya cinsiyeti bilinmeyen sonuçlar varsayılan aralığı kullanır.
+    Seçim kurulumda (test, cinsiyet, yaş bandı) dizisine önceden
+    hesaplanır; sorgu yalnızca dizi indekslemesidir.
+    """
+
+    def __init__(self, ranges=None):
+        self.table = (REFERENCE_RANGES if ranges is None else ranges).reset_index(drop=True)
+        self.tests = pd.Index(pd.unique(self.table['test'].to_numpy(dtype=object)))
+        self.sexes = [None, 'male', 'female']
+        # Yaş bantlarının sınırları; son bant yaşı bilinmeyenler içindir
+        self.breaks = np.unique(self.table[['age_min', 'age_max']].to_numpy(dtype=np.float64))
+        self.unknown_age = len(self.breaks)
+        self.min = self.table['min'].to_numpy(dtype=np.float64)
+        self.max = self.table['max'].to_numpy(dtype=np.float64)
+
+        self.best_row = np.full((len(self.tests), len(self.sexes), len(self.breaks) + 1), -1, dtype=np.intp)
+        for ti, test in enumerate(self.tests):
+            for si, sex in enumerate(self.sexes):
+                for band in range(len(self.breaks) + 1):
+                    age = None if band == self.unknown_age else self.breaks[band]
+                    self.best_row[ti, si, band] = self._select(test, sex, age)
+
+    def _select(self, test, sex, age):
+        best, best_specificity = -1, -1
+        for row in self.table[self.table['test'] == test].itertuples():
+            default_age = row.age_min <= 0 and row.age_max >= 200
+            if row.sex != 'any' and row.sex != sex:
+                continue
+            if age is None and not default_age:
+                continue
+            if age is not None and not (row.age_min <= age < row.age_max):
+                continue
+            specificity = (row.sex != 'any') * 2 + (not default_age)
+            if specificity > best_specificity:
+                best, best_specificity = row.Index, specificity
+        return best
+
+    def lookup(self, tests, ages=None, sexes=None):
+        """Sonuç başına (min, max) dizileri; referansı olmayan testler NaN"""
+        n = len(tests)
+        # Metin sütunları yalnızca benzersiz değerleri üzerinden koda çevrilir (eksikler -1)
+        codes, uniques = pd.factorize(pd.Series(tests))
+        test_codes = np.append(self.tests.get_indexer(pd.Index(uniques, dtype=object)), -1)[codes]
+        if sexes is None:
+            sex_codes = np.zeros(n, dtype=np.intp)
+        else:
+            codes, uniques = pd.factorize(pd.Series(sexes))
+            mapping = [self.sexes.index(sex) for sex in normalize_sex(list(uniques), len(uniques))]
+            sex_codes = np.append(np.array(mapping, dtype=np.intp), 0)[codes]
+        if ages is None:
+            bands = np.full(n, self.unknown_age, dtype=np.intp)
+        else:
+            age = pd.to_numeric(pd.Series(ages), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            bands = np.searchsorted(self.breaks, age, side='right') - 1
+            bands[np.isnan(age) | (bands < 0)] = self.unknown_age
+
+        rows = self.best_row[np.maximum(test_codes, 0), sex_codes, bands]
+        rows[test_codes < 0] = -1
+        found = rows >= 0
+        ref_min = np.where(found, self.min[rows], np.nan)
+        ref_max = np.where(found, self.max[rows], np.nan)
+        return ref_min, ref_max
+
+
+_default_reference = None
+
+
+def default_reference():
+    """Varsayılan referans tablosu (bir kez kurulur)"""
+    global _default_reference
+    if _default_reference is None:
+        _default_reference = LabReferenceTable()
+    return _default_reference
+
+
+def classify_lab_results(results, reference=None):
+    """Sonuç tablosunu tek geçişte sınıflandır
+
+    results: test ve value sütunları (isteğe bağlı age ve sex) olan tablo.
+    ref_min, ref_max, status, category ve label sütunları eklenmiş kopya
+    döner. Sınırlar eski analyze_lab_results ile aynıdır: alt sınırın
+    %70'inin altı veya üst sınırın %130'unun üstü kritiktir.
+    """
+    reference = reference or default_reference()
+    classified = results.copy()
+    ref_min, ref_max = reference.lookup(
+        classified['test'],
+        classified['age'] if 'age' in classified else None,
+        classified['sex'] if 'sex' in classified else None
+    )
+    value = pd.to_numeric(classified['value'], errors='coerce').to_numpy(dtype=np.float64)
+    statuses = list(STATUS_LABELS)
+    codes = np.select(
+        [np.isnan(ref_min) | np.isnan(value),
+         value < ref_min * CRITICAL_LOW_FACTOR, value < ref_min,
+         value > ref_max * CRITICAL_HIGH_FACTOR, value > ref_max],
+        [statuses.index(status) for status in ['unknown', 'critical_low', 'low', 'critical_high', 'high']],
+        statuses.index('normal')
+    )
+    # Kategori ve etiketler durum kodlarından dizi indekslemesiyle türetilir
+    category_codes = np.array([CATEGORIES.index(category) if category else -1
+                               for category, _ in STATUS_LABELS.values()])
+    labels = [label for _, label in STATUS_LABELS.values() if label]
+    label_codes = np.array([labels.index(label) if label else -1 for _, label in STATUS_LABELS.values()])
+
+    classified['ref_min'] = ref_min
+    classified['ref_max'] = ref_max
+    classified['status'] = pd.Categorical.from_codes(codes, statuses)
+    classified['category'] = pd.Categorical.from_codes(category_codes[codes], CATEGORIES)
+    classified['label'] = pd.Categorical.from_codes(label_codes[codes], labels)
+    return classified
+
+
+def summarize_lab_results(classified, names=None, values=None):
+    """Sınıflandırılmış tabloyu {kategori: ['test: değer (etiket)', ...]} sözlüğüne çevir
+
+    names ve values verilirse metinlerde tablodaki yerine bu ad ve
+    değerler (ör. kullanıcının girdiği biçim) kullanılır.
+    """
+    analysis = {category: [] for category in CATEGORIES}
+    names = classified['test'].tolist() if names is None else names
+    values = classified['value'].round(2).tolist() if values is None else values
+    for name, value, category, label in zip(names, values, classified['category'].tolist(),
+                                            classified['label'].tolist()):
+        if isinstance(category, str):
+            analysis[category].append(f"{name}: {value} ({label})")
+    return analysis
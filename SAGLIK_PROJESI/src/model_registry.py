@@ -0,0 +1,70 @@
+import os
+import threading
+import joblib
+
+
+class ModelRegistry:
+    """Süreç genelinde paylaşılan model/artefakt önbelleği.
+
+    Streamlit her etkileşimde betiği yeniden çalıştırır, ancak içe aktarılan
+    modüller süreç boyunca bellekte kalır. Bu nedenle artefaktlar burada bir
+    kez yüklenir ve tüm oturumlar aynı nesneyi paylaşır. Dosyanın imzası
+    (mtime + boyut) değiştiğinde artefakt yeniden yüklenir.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._path_locks = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'loads': 0}
+
+    def _signature(self, path):
+        """Dosyanın değişip değişmediğini anlamak için imza üret"""
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _path_lock(self, key):
+        with self._lock:
+            if key not in self._path_locks:
+                self._path_locks[key] = threading.Lock()
+            return self._path_locks[key]
+
+    def get(self, path, loader=joblib.load):
+        """Artefaktı önbellekten getir, gerekirse (yeniden) yükle"""
+        key = (os.path.abspath(path), loader)
+        signature = self._signature(path)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            self.stats['hits'] += 1
+            return entry[1]
+
+        # Aynı dosyayı eşzamanlı yükleyen oturumlar tek bir yüklemeyi bekler
+        with self._path_lock(key):
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self.stats['hits'] += 1
+                return entry[1]
+
+            obj = loader(path)
+            self._entries[key] = (signature, obj)
+            self.stats['loads'] += 1
+            return obj
+
+    def invalidate(self, path=None):
+        """Belirli bir dosyanın (veya tümünün) önbelleğini temizle"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            abs_path = os.path.abspath(path)
+            for key in [k for k in self._entries if k[0] == abs_path]:
+                del self._entries[key]
+
+
+_registry = ModelRegistry()
+
+
+def get_registry():
+    """Süreç genelindeki tek kayıt defterini döndür"""
+    return _registry
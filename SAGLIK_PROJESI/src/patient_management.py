@@ -4,15 +4,15 @@ from datetime import datetime
 import hashlib
 import uuid
 import base64
+from patient_storage import create_storage
+from user_store import get_user_store
 
 class PatientManagement:
-    def __init__(self):
-        self.patients_dir = "data/patients"
-        self.history_dir = "data/patient_history"
+    def __init__(self, storage=None):
+        # Hasta ve ziyaret kayıtları değiştirilebilir bir arka uçta tutulur
+        self.storage = storage or create_storage()
         self.users_file = 'data/users.json'
         self.users = {}
-        os.makedirs(self.patients_dir, exist_ok=True)
-        os.makedirs(self.history_dir, exist_ok=True)
         self.ensure_data_directory()
         self.load_users()
         
@@ -27,30 +27,14 @@ class PatientManagement:
 
     def load_users(self):
         """Kullanıcıları yükle"""
-        try:
-            with open(self.users_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                if content.strip():  # Dosya boş değilse
-                    self.users = json.loads(content)
-                else:
-                    self.users = {}
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.users = {}
-            # Hatalı dosyayı yeniden oluştur
-            self.save_users()
+        # Kullanıcı indeksi süreç genelinde paylaşılır; her yeniden çalıştırmada
+        # yalnızca diğer süreçlerin yaptığı değişiklikler uygulanır
+        self.user_store = get_user_store(self.users_file)
+        self.users = self.user_store.refresh()
 
     def save_users(self):
-        """Kullanıcıları kaydet"""
-        # Bytes verisini string'e çevir
-        users_copy = {}
-        for username, user_data in self.users.items():
-            user_copy = user_data.copy()
-            if isinstance(user_data.get('password'), bytes):
-                user_copy['password'] = base64.b64encode(user_data['password']).decode('utf-8')
-            users_copy[username] = user_copy
-
-        with open(self.users_file, 'w', encoding='utf-8') as f:
-            json.dump(users_copy, f, ensure_ascii=False, indent=2)
+        """Bekleyen kullanıcı değişikliklerini hemen diske yaz"""
+        self.user_store.flush()
 
     def get_user(self, username):
         """Kullanıcı bilgilerini getir"""
@@ -68,14 +52,13 @@ class PatientManagement:
         if username in self.users:
             return False, "Bu kullanıcı adı zaten kullanılıyor."
         
-        self.users[username] = {
+        self.user_store.set(username, {
             'id': str(len(self.users) + 1),
             'password': password_hash,
             'name': name,
             'email': email,
             'created_at': datetime.now().isoformat()
-        }
-        self.save_users()
+        })
         return True, "Kullanıcı başarıyla oluşturuldu."
 
     def update_user(self, username, data):
@@ -84,7 +67,7 @@ class PatientManagement:
             return False, "Kullanıcı bulunamadı."
         
         self.users[username].update(data)
-        self.save_users()
+        self.user_store.set(username, self.users[username])
         return True, "Kullanıcı bilgileri güncellendi."
 
     def delete_user(self, username):
@@ -92,8 +75,7 @@ class PatientManagement:
         if username not in self.users:
             return False, "Kullanıcı bulunamadı."
         
-        del self.users[username]
-        self.save_users()
+        self.user_store.delete(username)
         return True, "Kullanıcı silindi."
 
     def generate_patient_id(self, tc_no, birth_date):
@@ -116,61 +98,30 @@ class PatientManagement:
             'last_visit': None
         }
         
-        file_path = os.path.join(self.patients_dir, f"{patient_id}.json")
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(patient_data, f, ensure_ascii=False, indent=4)
+        self.storage.save_patient(patient_data)
             
         return patient_id
     
     def get_patient(self, patient_id):
         """Hasta bilgilerini getir"""
-        file_path = os.path.join(self.patients_dir, f"{patient_id}.json")
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return None
+        return self.storage.load_patient(patient_id)
     
     def save_visit_history(self, patient_id, visit_data):
         """Hasta ziyaret geçmişini kaydet"""
-        history_file = os.path.join(self.history_dir, f"{patient_id}_history.json")
-        
-        # Mevcut geçmişi yükle veya yeni oluştur
-        if os.path.exists(history_file):
-            with open(history_file, 'r', encoding='utf-8') as f:
-                history = json.load(f)
-        else:
-            history = []
-        
-        # Yeni ziyareti ekle
+        # Yeni ziyareti ekle; son ziyaret tarihi de aynı zaman damgasıyla güncellenir
         visit_data['timestamp'] = datetime.now().isoformat()
-        history.append(visit_data)
-        
-        # Geçmişi kaydet
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump(history, f, ensure_ascii=False, indent=4)
-        
-        # Son ziyaret tarihini güncelle
-        patient_file = os.path.join(self.patients_dir, f"{patient_id}.json")
-        with open(patient_file, 'r', encoding='utf-8') as f:
-            patient_data = json.load(f)
-        
-        patient_data['last_visit'] = datetime.now().isoformat()
-        
-        with open(patient_file, 'w', encoding='utf-8') as f:
-            json.dump(patient_data, f, ensure_ascii=False, indent=4)
+        self.storage.append_visit(patient_id, visit_data)
     
-    def get_visit_history(self, patient_id):
-        """Hasta ziyaret geçmişini getir"""
-        history_file = os.path.join(self.history_dir, f"{patient_id}_history.json")
-        try:
-            with open(history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return []
+    def get_visit_history(self, patient_id, limit=None, before=None, after=None, newest_first=False):
+        """Hasta ziyaret geçmişini getir
+
+        limit: döndürülecek en fazla ziyaret sayısı
+        before/after: zaman damgası imleçleri (ISO biçimi, hariç)
+        newest_first: en yeni ziyaretten başlayarak döndür
+        """
+        return self.storage.load_visits(patient_id, limit=limit, before=before,
+                                        after=after, newest_first=newest_first)
     
     def clear_visit_history(self, patient_id):
         """Hasta ziyaret geçmişini sil"""
-        history_file = os.path.join(self.history_dir, f"{patient_id}_history.json")
-        if os.path.exists(history_file):
-            os.remove(history_file) 
\ No newline at end of file
+        self.storage.clear_visits(patient_id) 
\ No newline at end of file
@@ -3,9 +3,23 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import folium
-from geopy.geocoders import Nominatim
-from geopy.distance import geodesic
 import requests
+from model_registry import get_registry
+from hospital_index import HospitalIndex, load_hospital_table
+from geocoding import get_geocoder
+
+def load_interaction_table(path):
+    """Etkileşim tablosunu oku ve sırasız ilaç çifti -> etkileşim indeksini kur"""
+    df = pd.read_csv(path)
+    index = {}
+    for drug1, drug2, severity, description in zip(
+            df['drug1'], df['drug2'], df['severity'], df['description']):
+        # Tabloda aynı çift birden fazla varsa ilk satır geçerlidir
+        index.setdefault(frozenset((drug1, drug2)), {
+            'severity': severity,
+            'description': description
+        })
+    return df, index
 
 class PatientSafety:
     def __init__(self):
@@ -16,45 +30,65 @@ class PatientSafety:
             'yesil': '🟢 Düşük risk. Belirtiler devam ederse doktora başvurun.'
         }
         self.hospitals = self.load_hospitals()
-        self.geolocator = Nominatim(user_agent="health_assistant")
+        # Önbellekli geocoder; çevrimdışıyken yerel il/ilçe tablosunu kullanır
+        self.geolocator = get_geocoder()
         
     def load_drug_interactions(self):
         """İlaç etkileşimleri veritabanını yükle"""
         try:
-            return pd.read_csv('data/drug_interactions.csv')
+            # Tablo ve çift indeksi süreç başına bir kez oluşturulur
+            df, self.interaction_index = get_registry().get(
+                'data/drug_interactions.csv', loader=load_interaction_table
+            )
+            return df
         except FileNotFoundError:
+            self.interaction_index = {}
             return pd.DataFrame(columns=['drug1', 'drug2', 'severity', 'description'])
     
     def load_hospitals(self):
         """Hastane veritabanını yükle"""
         try:
-            return pd.read_csv('data/hospitals.csv')
+            # Tablo ve uzamsal indeks süreç başına bir kez oluşturulur
+            df, self.hospital_index = get_registry().get(
+                'data/hospitals.csv', loader=load_hospital_table
+            )
+            return df
         except FileNotFoundError:
-            return pd.DataFrame(columns=['name', 'lat', 'lon', 'type', 'emergency'])
+            df = pd.DataFrame(columns=['name', 'lat', 'lon', 'type', 'emergency'])
+            self.hospital_index = HospitalIndex(df)
+            return df
     
     def check_drug_interactions(self, medications):
         """İlaç etkileşimlerini kontrol et"""
-        warnings = []
         try:
-            for i, drug1 in enumerate(medications):
-                for drug2 in medications[i+1:]:
-                    interaction = self.drug_interactions[
-                        ((self.drug_interactions['drug1'] == drug1) & 
-                         (self.drug_interactions['drug2'] == drug2)) |
-                        ((self.drug_interactions['drug1'] == drug2) & 
-                         (self.drug_interactions['drug2'] == drug1))
-                    ]
-                    if not interaction.empty:
-                        warnings.append({
-                            'drugs': f"{drug1} - {drug2}",
-                            'severity': interaction.iloc[0]['severity'],
-                            'description': interaction.iloc[0]['description']
-                        })
-            return warnings
+            return self.find_interactions(medications)
         except Exception as e:
             st.error(f"İlaç etkileşimi kontrolü hatası: {str(e)}")
             return []
     
+    def find_interactions(self, medications):
+        """İlaç listesindeki tüm çiftleri indekste ara (k ilaç için O(k²) arama)"""
+        warnings = []
+        index = self.interaction_index
+        for i, drug1 in enumerate(medications):
+            for drug2 in medications[i+1:]:
+                interaction = index.get(frozenset((drug1, drug2)))
+                if interaction is not None:
+                    warnings.append({
+                        'drugs': f"{drug1} - {drug2}",
+                        'severity': interaction['severity'],
+                        'description': interaction['description']
+                    })
+        return warnings
+    
+    def check_drug_interactions_bulk(self, medication_lists):
+        """Birden fazla hastanın ilaç listelerini tek seferde kontrol et"""
+        try:
+            return [self.find_interactions(medications) for medications in medication_lists]
+        except Exception as e:
+            st.error(f"İlaç etkileşimi kontrolü hatası: {str(e)}")
+            return [[] for _ in medication_lists]
+    
     def calculate_emergency_level(self, symptoms, vitals, age):
         """Aciliyet seviyesini hesapla"""
         try:
@@ -97,30 +131,21 @@ class PatientSafety:
             st.error(f"Aciliyet seviyesi hesaplama hatası: {str(e)}")
             return 'sari'  # Hata durumunda orta seviye döndür
     
-    def find_nearest_hospitals(self, location, radius_km=10, emergency_only=False):
-        """En yakın hastaneleri bul"""
+    def find_nearest_hospitals(self, location, radius_km=10, emergency_only=False, k=None):
+        """En yakın hastaneleri bul
+
+        radius_km içindeki hastaneler mesafeye göre sıralı döner; k verilirse
+        en yakın k tanesi döner (radius_km=None ile yarıçap sınırı kalkar).
+        """
         try:
             user_location = self.geolocator.geocode(location)
             if not user_location:
                 return None
             
-            nearby_hospitals = []
-            for _, hospital in self.hospitals.iterrows():
-                distance = geodesic(
-                    (user_location.latitude, user_location.longitude),
-                    (hospital['lat'], hospital['lon'])
-                ).km
-                
-                if distance <= radius_km:
-                    if not emergency_only or hospital['emergency']:
-                        nearby_hospitals.append({
-                            'name': hospital['name'],
-                            'distance': round(distance, 2),
-                            'coords': (hospital['lat'], hospital['lon']),
-                            'emergency': hospital['emergency']
-                        })
-            
-            return sorted(nearby_hospitals, key=lambda x: x['distance'])
+            return self.hospital_index.query(
+                user_location.latitude, user_location.longitude,
+                radius_km=radius_km, k=k, emergency_only=emergency_only
+            )
             
         except Exception as e:
             st.error(f"Hastane arama hatası: {str(e)}")
@@ -0,0 +1,232 @@
+import argparse
+import itertools
+import json
+import os
+import sqlite3
+import threading
+from visit_log import get_visit_log
+
+
+class JSONPatientStorage:
+    """Her hasta için ayrı JSON dosyası tutan depolama (varsayılan)
+
+    Ziyaretler hasta başına yalnızca ekleme yapılan bir JSON Lines
+    günlüğünde tutulur. Son ziyaret tarihi hasta dosyasına yazılmaz,
+    okunurken günlüğün son satırından alınır; böylece bir ziyaret kaydı
+    tek bir satır eklemesiyle tamamlanır.
+    """
+
+    def __init__(self, patients_dir='data/patients', history_dir='data/patient_history'):
+        self.patients_dir = patients_dir
+        self.history_dir = history_dir
+        os.makedirs(self.patients_dir, exist_ok=True)
+        self.visit_log = get_visit_log(history_dir)
+
+    def _patient_file(self, patient_id):
+        return os.path.join(self.patients_dir, f"{patient_id}.json")
+
+    def save_patient(self, patient_data):
+        """Hasta kaydını yaz"""
+        with open(self._patient_file(patient_data['id']), 'w', encoding='utf-8') as f:
+            json.dump(patient_data, f, ensure_ascii=False, indent=4)
+
+    def load_patient(self, patient_id):
+        """Hasta kaydını oku"""
+        try:
+            with open(self._patient_file(patient_id), 'r', encoding='utf-8') as f:
+                patient_data = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        last_visit = self.visit_log.last(patient_id)
+        if last_visit is not None:
+            patient_data['last_visit'] = last_visit['timestamp']
+        return patient_data
+
+    def append_visit(self, patient_id, visit_data):
+        """Ziyareti günlüğe ekle (son ziyaret tarihi günlükten türetilir)"""
+        self.visit_log.append(patient_id, visit_data)
+
+    def load_visits(self, patient_id, limit=None, before=None, after=None, newest_first=False):
+        """Ziyaret geçmişini döndür (varsayılan: tümü, kronolojik sırada)"""
+        visits = self.visit_log.iter(patient_id, reverse=newest_first,
+                                     before=before, after=after)
+        return list(itertools.islice(visits, limit))
+
+    def clear_visits(self, patient_id):
+        """Ziyaret geçmişini sil"""
+        self.visit_log.clear(patient_id)
+
+    def iter_patient_ids(self):
+        """Kayıtlı tüm hasta kimliklerini dolaş"""
+        for file_name in sorted(os.listdir(self.patients_dir)):
+            if file_name.endswith('.json'):
+                yield file_name[:-len('.json')]
+
+
+class SQLitePatientStorage:
+    """Gömülü SQLite veritabanında indeksli hasta/ziyaret depolaması
+
+    Hasta kimliği birincil anahtardır; ziyaretler (patient_id, timestamp)
+    ve diagnosis üzerinde indekslidir. Böylece hasta ve ziyaret aramaları
+    kayıt sayısından bağımsız olarak O(log n) kalır.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS patients (
+            patient_id TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS visits (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            patient_id TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            diagnosis TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_visits_patient_timestamp
+            ON visits (patient_id, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_visits_timestamp ON visits (timestamp);
+        CREATE INDEX IF NOT EXISTS idx_visits_diagnosis ON visits (diagnosis);
+    """
+
+    def __init__(self, db_path='data/patients.db'):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # Her iş parçacığı kendi bağlantısını kullanır
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def save_patient(self, patient_data):
+        """Hasta kaydını yaz (varsa üzerine yazar)"""
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO patients (patient_id, data) VALUES (?, ?)',
+                (patient_data['id'], json.dumps(patient_data, ensure_ascii=False))
+            )
+
+    def load_patient(self, patient_id):
+        """Hasta kaydını oku"""
+        row = self._connect().execute(
+            'SELECT data FROM patients WHERE patient_id = ?', (patient_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def append_visit(self, patient_id, visit_data):
+        """Ziyareti ekle ve hastanın son ziyaret tarihini güncelle"""
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO visits (patient_id, timestamp, diagnosis, data) VALUES (?, ?, ?, ?)',
+                (patient_id, visit_data['timestamp'], visit_data.get('diagnosis'),
+                 json.dumps(visit_data, ensure_ascii=False))
+            )
+            conn.execute(
+                "UPDATE patients SET data = json_set(data, '$.last_visit', ?) WHERE patient_id = ?",
+                (visit_data['timestamp'], patient_id)
+            )
+
+    def load_visits(self, patient_id, limit=None, before=None, after=None, newest_first=False):
+        """Ziyaret geçmişini döndür (varsayılan: tümü, kronolojik sırada)"""
+        query = 'SELECT data FROM visits WHERE patient_id = ?'
+        params = [patient_id]
+        if before is not None:
+            query += ' AND timestamp < ?'
+            params.append(before)
+        if after is not None:
+            query += ' AND timestamp > ?'
+            params.append(after)
+        query += ' ORDER BY timestamp DESC, id DESC' if newest_first else ' ORDER BY timestamp, id'
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+        rows = self._connect().execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def clear_visits(self, patient_id):
+        """Ziyaret geçmişini sil ve son ziyaret tarihini sıfırla"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM visits WHERE patient_id = ?', (patient_id,))
+            conn.execute(
+                "UPDATE patients SET data = json_set(data, '$.last_visit', NULL) WHERE patient_id = ?",
+                (patient_id,)
+            )
+
+    def iter_patient_ids(self):
+        """Kayıtlı tüm hasta kimliklerini dolaş"""
+        for row in self._connect().execute('SELECT patient_id FROM patients ORDER BY patient_id'):
+            yield row[0]
+
+    def find_visits_by_diagnosis(self, diagnosis, since=None):
+        """Belirli bir tanıya sahip tüm ziyaretleri (hastalar arası) getir"""
+        query = 'SELECT patient_id, data FROM visits WHERE diagnosis = ?'
+        params = [diagnosis]
+        if since is not None:
+            query += ' AND timestamp >= ?'
+            params.append(since)
+        rows = self._connect().execute(query + ' ORDER BY timestamp', params).fetchall()
+        return [dict(json.loads(data), patient_id=patient_id) for patient_id, data in rows]
+
+
+def create_storage(backend=None):
+    """Yapılandırmaya göre depolama arka ucunu oluştur
+
+    Arka uç PATIENT_STORAGE_BACKEND ortam değişkeniyle seçilir: 'json'
+    (varsayılan) veya 'sqlite'.
+    """
+    backend = backend or os.environ.get('PATIENT_STORAGE_BACKEND', 'json')
+    if backend == 'sqlite':
+        return SQLitePatientStorage(os.environ.get('PATIENT_DB_PATH', 'data/patients.db'))
+    if backend == 'json':
+        return JSONPatientStorage()
+    raise ValueError(f"Bilinmeyen depolama arka ucu: {backend}")
+
+
+def migrate_json_to_sqlite(source, target):
+    """Mevcut JSON dosya ağacını SQLite depolamasına aktar"""
+    patient_count = 0
+    visit_count = 0
+    for patient_id in source.iter_patient_ids():
+        patient_data = source.load_patient(patient_id)
+        if patient_data is None:
+            continue
+        target.save_patient(patient_data)
+        patient_count += 1
+
+        # Tekrar çalıştırıldığında ziyaretler çoğalmasın
+        target.clear_visits(patient_id)
+        for visit in source.load_visits(patient_id):
+            target.append_visit(patient_id, visit)
+            visit_count += 1
+        # append_visit last_visit'i güncellediği için orijinal kaydı geri yaz
+        target.save_patient(patient_data)
+
+    print(f"{patient_count} hasta ve {visit_count} ziyaret aktarıldı.")
+    return patient_count, visit_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON hasta kayıtlarını SQLite'a aktar")
+    parser.add_argument('--patients-dir', default='data/patients')
+    parser.add_argument('--history-dir', default='data/patient_history')
+    parser.add_argument('--db-path', default='data/patients.db')
+    args = parser.parse_args()
+
+    migrate_json_to_sqlite(
+        JSONPatientStorage(args.patients_dir, args.history_dir),
+        SQLitePatientStorage(args.db_path)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+import re
+import threading
+
+# Rapor şablonlarındaki sabit metinlerin önceden çevrilmiş halleri.
+# Değerler şablona olduğu gibi yerleştirilir; {alan} yer tutucuları içerebilir.
+REPORT_LABELS = {
+    'tr': {
+        'title': 'SAĞLIK RAPORU',
+        'date': 'Tarih',
+        'patient_info': 'HASTA BİLGİLERİ',
+        'age': 'Yaş',
+        'gender': 'Cinsiyet',
+        'chronic_conditions': 'Kronik Hastalıklar',
+        'none': 'Yok',
+        'symptoms_section': 'BELİRTİLER',
+        'selected_symptoms': 'Seçilen Belirtiler',
+        'additional_symptoms': 'Ek Şikayetler',
+        'analysis_section': 'ANALİZ SONUÇLARI',
+        'diagnosis': 'Olası Tanı',
+        'diagnosis_confidence': 'Tanı Güven Oranı: %{diagnosis_prob:.1f}',
+        'risk_level': 'Risk Seviyesi',
+        'risk_rate': 'Risk Oranı: %{severity_prob:.1f}',
+        'department': 'Önerilen Bölüm',
+        'recommendations_section': 'ÖNERİLER',
+        'lifestyle_section': 'YAŞAM TARZI ÖNERİLERİ',
+        'lifestyle_advice': (
+            "- Düzenli egzersiz yapmayı deneyin.\n"
+            "- Sağlıklı beslenmeye özen gösterin.\n"
+            "- Stres yönetimi tekniklerini uygulayın."
+        ),
+        'psychological_section': 'PSİKOLOJİK DESTEK',
+        'psychological_advice': (
+            "- Meditasyon veya derin nefes alma tekniklerini uygulayın.\n"
+            "- Gerekirse bir terapiste başvurun."
+        ),
+        'disclaimer': (
+            "NOT: Bu rapor bir yapay zeka asistanı (PulsAI) tarafından oluşturulmuştur ve \n"
+            "sadece bilgilendirme amaçlıdır. Kesin tanı için mutlaka bir sağlık \n"
+            "kuruluşuna başvurunuz."
+        )
+    },
+    'en': {
+        'title': 'HEALTH REPORT',
+        'date': 'Date',
+        'patient_info': 'PATIENT INFORMATION',
+        'age': 'Age',
+        'gender': 'Gender',
+        'chronic_conditions': 'Chronic Conditions',
+        'none': 'None',
+        'symptoms_section': 'SYMPTOMS',
+        'selected_symptoms': 'Selected Symptoms',
+        'additional_symptoms': 'Additional Complaints',
+        'analysis_section': 'ANALYSIS RESULTS',
+        'diagnosis': 'Possible Diagnosis',
+        'diagnosis_confidence': 'Diagnosis Confidence: {diagnosis_prob:.1f}%',
+        'risk_level': 'Risk Level',
+        'risk_rate': 'Risk Rate: {severity_prob:.1f}%',
+        'department': 'Recommended Department',
+        'recommendations_section': 'RECOMMENDATIONS',
+        'lifestyle_section': 'LIFESTYLE RECOMMENDATIONS',
+        'lifestyle_advice': (
+            "- Try to exercise regularly.\n"
+            "- Pay attention to a healthy diet.\n"
+            "- Practice stress management techniques."
+        ),
+        'psychological_section': 'PSYCHOLOGICAL SUPPORT',
+        'psychological_advice': (
+            "- Practice meditation or deep breathing techniques.\n"
+            "- Consult a therapist if necessary."
+        ),
+        'disclaimer': (
+            "NOTE: This report was generated by an AI assistant (PulsAI) and is for\n"
+            "informational purposes only. For a definitive diagnosis, please consult\n"
+            "a healthcare provider."
+        )
+    },
+    'de': {
+        'title': 'GESUNDHEITSBERICHT',
+        'date': 'Datum',
+        'patient_info': 'PATIENTENINFORMATIONEN',
+        'age': 'Alter',
+        'gender': 'Geschlecht',
+        'chronic_conditions': 'Chronische Erkrankungen',
+        'none': 'Keine',
+        'symptoms_section': 'SYMPTOME',
+        'selected_symptoms': 'Ausgewählte Symptome',
+        'additional_symptoms': 'Weitere Beschwerden',
+        'analysis_section': 'ANALYSEERGEBNISSE',
+        'diagnosis': 'Mögliche Diagnose',
+        'diagnosis_confidence': 'Diagnosesicherheit: {diagnosis_prob:.1f} %',
+        'risk_level': 'Risikostufe',
+        'risk_rate': 'Risikorate: {severity_prob:.1f} %',
+        'department': 'Empfohlene Abteilung',
+        'recommendations_section': 'EMPFEHLUNGEN',
+        'lifestyle_section': 'EMPFEHLUNGEN ZUM LEBENSSTIL',
+        'lifestyle_advice': (
+            "- Versuchen Sie, regelmäßig Sport zu treiben.\n"
+            "- Achten Sie auf eine gesunde Ernährung.\n"
+            "- Wenden Sie Techniken zur Stressbewältigung an."
+        ),
+        'psychological_section': 'PSYCHOLOGISCHE UNTERSTÜTZUNG',
+        'psychological_advice': (
+            "- Praktizieren Sie Meditation oder tiefe Atemtechniken.\n"
+            "- Wenden Sie sich bei Bedarf an einen Therapeuten."
+        ),
+        'disclaimer': (
+            "HINWEIS: Dieser Bericht wurde von einem KI-Assistenten (PulsAI) erstellt und\n"
+            "dient nur zu Informationszwecken. Für eine sichere Diagnose wenden Sie sich\n"
+            "bitte an eine Gesundheitseinrichtung."
+        )
+    },
+    'fr': {
+        'title': 'RAPPORT DE SANTÉ',
+        'date': 'Date',
+        'patient_info': 'INFORMATIONS SUR LE PATIENT',
+        'age': 'Âge',
+        'gender': 'Sexe',
+        'chronic_conditions': 'Maladies chroniques',
+        'none': 'Aucune',
+        'symptoms_section': 'SYMPTÔMES',
+        'selected_symptoms': 'Symptômes sélectionnés',
+        'additional_symptoms': 'Plaintes supplémentaires',
+        'analysis_section': "RÉSULTATS DE L'ANALYSE",
+        'diagnosis': 'Diagnostic possible',
+        'diagnosis_confidence': 'Confiance du diagnostic : {diagnosis_prob:.1f} %',
+        'risk_level': 'Niveau de risque',
+        'risk_rate': 'Taux de risque : {severity_prob:.1f} %',
+        'department': 'Service recommandé',
+        'recommendations_section': 'RECOMMANDATIONS',
+        'lifestyle_section': 'RECOMMANDATIONS DE MODE DE VIE',
+        'lifestyle_advice': (
+            "- Essayez de faire de l'exercice régulièrement.\n"
+            "- Veillez à avoir une alimentation saine.\n"
+            "- Appliquez des techniques de gestion du stress."
+        ),
+        'psychological_section': 'SOUTIEN PSYCHOLOGIQUE',
+        'psychological_advice': (
+            "- Pratiquez la méditation ou des techniques de respiration profonde.\n"
+            "- Consultez un thérapeute si nécessaire."
+        ),
+        'disclaimer': (
+            "REMARQUE : Ce rapport a été généré par un assistant d'intelligence artificielle\n"
+            "(PulsAI) et n'est fourni qu'à titre informatif. Pour un diagnostic définitif,\n"
+            "veuillez consulter un établissement de santé."
+        )
+    },
+    'es': {
+        'title': 'INFORME DE SALUD',
+        'date': 'Fecha',
+        'patient_info': 'INFORMACIÓN DEL PACIENTE',
+        'age': 'Edad',
+        'gender': 'Sexo',
+        'chronic_conditions': 'Enfermedades crónicas',
+        'none': 'Ninguna',
+        'symptoms_section': 'SÍNTOMAS',
+        'selected_symptoms': 'Síntomas seleccionados',
+        'additional_symptoms': 'Molestias adicionales',
+        'analysis_section': 'RESULTADOS DEL ANÁLISIS',
+        'diagnosis': 'Diagnóstico posible',
+        'diagnosis_confidence': 'Confianza del diagnóstico: {diagnosis_prob:.1f} %',
+        'risk_level': 'Nivel de riesgo',
+        'risk_rate': 'Tasa de riesgo: {severity_prob:.1f} %',
+        'department': 'Departamento recomendado',
+        'recommendations_section': 'RECOMENDACIONES',
+        'lifestyle_section': 'RECOMENDACIONES DE ESTILO DE VIDA',
+        'lifestyle_advice': (
+            "- Intente hacer ejercicio con regularidad.\n"
+            "- Cuide su alimentación.\n"
+            "- Aplique técnicas de manejo del estrés."
+        ),
+        'psychological_section': 'APOYO PSICOLÓGICO',
+        'psychological_advice': (
+            "- Practique la meditación o técnicas de respiración profunda.\n"
+            "- Consulte a un terapeuta si es necesario."
+        ),
+        'disclaimer': (
+            "NOTA: Este informe ha sido generado por un asistente de inteligencia artificial\n"
+            "(PulsAI) y tiene únicamente fines informativos. Para un diagnóstico definitivo,\n"
+            "acuda a un centro de salud."
+        )
+    },
+    'ar': {
+        'title': 'التقرير الصحي',
+        'date': 'التاريخ',
+        'patient_info': 'معلومات المريض',
+        'age': 'العمر',
+        'gender': 'الجنس',
+        'chronic_conditions': 'الأمراض المزمنة',
+        'none': 'لا يوجد',
+        'symptoms_section': 'الأعراض',
+        'selected_symptoms': 'الأعراض المختارة',
+        'additional_symptoms': 'شكاوى إضافية',
+        'analysis_section': 'نتائج التحليل',
+        'diagnosis': 'التشخيص المحتمل',
+        'diagnosis_confidence': 'نسبة الثقة في التشخيص: {diagnosis_prob:.1f}%',
+        'risk_level': 'مستوى الخطر',
+        'risk_rate': 'نسبة الخطر: {severity_prob:.1f}%',
+        'department': 'القسم الموصى به',
+        'recommendations_section': 'التوصيات',
+        'lifestyle_section': 'توصيات نمط الحياة',
+        'lifestyle_advice': (
+            "- حاول ممارسة الرياضة بانتظام.\n"
+            "- احرص على اتباع نظام غذائي صحي.\n"
+            "- طبّق تقنيات إدارة التوتر."
+        ),
+        'psychological_section': 'الدعم النفسي',
+        'psychological_advice': (
+            "- مارس التأمل أو تقنيات التنفس العميق.\n"
+            "- استشر معالجًا نفسيًا عند الحاجة."
+        ),
+        'disclaimer': (
+            "ملاحظة: تم إنشاء هذا التقرير بواسطة مساعد ذكاء اصطناعي (PulsAI) وهو لأغراض\n"
+            "المعلومات فقط. للحصول على تشخيص نهائي، يرجى مراجعة مؤسسة صحية."
+        )
+    },
+    'ru': {
+        'title': 'ОТЧЁТ О ЗДОРОВЬЕ',
+        'date': 'Дата',
+        'patient_info': 'ИНФОРМАЦИЯ О ПАЦИЕНТЕ',
+        'age': 'Возраст',
+        'gender': 'Пол',
+        'chronic_conditions': 'Хронические заболевания',
+        'none': 'Нет',
+        'symptoms_section': 'СИМПТОМЫ',
+        'selected_symptoms': 'Выбранные симптомы',
+        'additional_symptoms': 'Дополнительные жалобы',
+        'analysis_section': 'РЕЗУЛЬТАТЫ АНАЛИЗА',
+        'diagnosis': 'Возможный диагноз',
+        'diagnosis_confidence': 'Достоверность диагноза: {diagnosis_prob:.1f}%',
+        'risk_level': 'Уровень риска',
+        'risk_rate': 'Степень риска: {severity_prob:.1f}%',
+        'department': 'Рекомендуемое отделение',
+        'recommendations_section': 'РЕКОМЕНДАЦИИ',
+        'lifestyle_section': 'РЕКОМЕНДАЦИИ ПО ОБРАЗУ ЖИЗНИ',
+        'lifestyle_advice': (
+            "- Старайтесь регулярно заниматься физическими упражнениями.\n"
+            "- Следите за здоровым питанием.\n"
+            "- Применяйте техники управления стрессом."
+        ),
+        'psychological_section': 'ПСИХОЛОГИЧЕСКАЯ ПОДДЕРЖКА',
+        'psychological_advice': (
+            "- Практикуйте медитацию или техники глубокого дыхания.\n"
+            "- При необходимости обратитесь к психотерапевту."
+        ),
+        'disclaimer': (
+            "ПРИМЕЧАНИЕ: Этот отчёт создан ИИ-ассистентом (PulsAI) и носит исключительно\n"
+            "информационный характер. Для точного диагноза обязательно обратитесь\n"
+            "в медицинское учреждение."
+        )
+    }
+}
+
+# Şablon sözdizimi: [[etiket]] sabit metin, "## etiket" altı çizili bölüm başlığı,
+# {alan} her istekte doldurulan değer
+PATIENT_REPORT_LAYOUT = """[[title]]
+[[date]]: {date}
+
+## patient_info
+[[age]]: {age}
+[[gender]]: {gender}
+[[chronic_conditions]]: {chronic_conditions}
+
+## symptoms_section
+[[selected_symptoms]]: {symptoms}
+[[additional_symptoms]]: {additional_symptoms}
+
+## analysis_section
+[[diagnosis]]: {diagnosis}
+[[diagnosis_confidence]]
+
+[[risk_level]]: {severity}
+[[risk_rate]]
+
+[[department]]: {department}
+
+## recommendations_section
+{recommendation}
+
+## lifestyle_section
+[[lifestyle_advice]]
+
+## psychological_section
+[[psychological_advice]]
+
+[[disclaimer]]
+"""
+
+SECTION_PATTERN = re.compile(r'^## (\w+)$', re.MULTILINE)
+LABEL_PATTERN = re.compile(r'\[\[(\w+)\]\]')
+
+# Tek satırlık, yer tutucu içermeyen etiketler (alan adı olarak kullanılabilenler)
+FIELD_LABEL_KEYS = [
+    'date', 'age', 'gender', 'chronic_conditions', 'selected_symptoms',
+    'additional_symptoms', 'diagnosis', 'risk_level', 'department'
+]
+
+
+def labels(lang):
+    """Dilin sabit rapor metinleri"""
+    try:
+        return REPORT_LABELS[lang]
+    except KeyError:
+        raise ValueError(f"Desteklenmeyen rapor dili: {lang}")
+
+
+class ReportTemplate:
+    """Dil başına bir kez derlenen rapor şablonu
+
+    Derleme sırasında sabit etiketler ve bölüm başlıkları seçilen dilin
+    metinleriyle doldurulup tek bir biçim dizgisine dönüştürülür ve
+    önbelleğe alınır. Her istekte yalnızca dinamik alanlar yerleştirilir.
+    """
+
+    def __init__(self, layout):
+        self.layout = layout
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def _compile(self, lang):
+        texts = labels(lang)
+
+        def section(match):
+            title = texts[match.group(1)]
+            return f"{title}\n{'-' * len(title)}"
+
+        compiled = SECTION_PATTERN.sub(section, self.layout)
+        return LABEL_PATTERN.sub(lambda match: texts[match.group(1)], compiled)
+
+    def compile(self, lang):
+        compiled = self._compiled.get(lang)
+        if compiled is None:
+            with self._lock:
+                compiled = self._compiled.setdefault(lang, self._compile(lang))
+        return compiled
+
+    def render(self, lang='tr', **values):
+        return self.compile(lang).format_map(values)
+
+
+PATIENT_REPORT = ReportTemplate(PATIENT_REPORT_LAYOUT)
+
+
+def render_patient_report(patient_info, analysis_results, now, lang='tr'):
+    """Hasta analiz raporunu seçilen dilde oluştur"""
+    chronic_conditions = patient_info['chronic_conditions']
+    return PATIENT_REPORT.render(
+        lang,
+        date=now,
+        age=patient_info['age'],
+        gender=patient_info['gender'],
+        chronic_conditions=', '.join(chronic_conditions) if chronic_conditions else labels(lang)['none'],
+        symptoms=', '.join(patient_info['symptoms']),
+        additional_symptoms=patient_info['additional_symptoms'],
+        diagnosis=analysis_results['diagnosis'],
+        diagnosis_prob=analysis_results['diagnosis_prob'],
+        severity=analysis_results['severity'],
+        severity_prob=analysis_results['severity_prob'],
+        department=analysis_results['department'],
+        recommendation=analysis_results['recommendation']
+    )
+
+
+_field_labels = {}
+
+
+def field_label_translations(lang):
+    """Türkçe alan adı -> hedef dildeki karşılığı (önceden çevrilmiş etiketler)"""
+    translations = _field_labels.get(lang)
+    if translations is None:
+        target = labels(lang)
+        translations = {REPORT_LABELS['tr'][key]: target[key] for key in FIELD_LABEL_KEYS}
+        _field_labels[lang] = translations
+    return translations
@@ -0,0 +1,374 @@
+import json
+import os
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Örnek genişliği (bayt) -> PCM veri tipi (8 bit WAV işaretsizdir; 24 bit ayrıca çözülür)
+PCM_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+SUPPORTED_WIDTHS = (1, 2, 3, 4)
+
+
+def pcm_samples(pcm, sample_width):
+    """PCM baytlarını 16 bit ölçeğinde float örneklere çevir"""
+    if sample_width == 3:
+        raw = np.frombuffer(pcm, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        # Küçük uçlu 24 bit; üst bayt işaretiyle genişletilir
+        samples = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        return ((samples << 8) >> 8).astype(np.float64) / 256
+    if sample_width not in PCM_DTYPES:
+        raise ValueError(f"Desteklenmeyen örnek genişliği: {sample_width}")
+    samples = np.frombuffer(pcm, dtype=PCM_DTYPES[sample_width]).astype(np.float64)
+    if sample_width == 1:
+        samples = (samples - 128) * 256
+    elif sample_width == 4:
+        samples /= 65536
+    return samples
+
+
+class AudioClip:
+    """Ham PCM ses parçası ve kaydın başından itibaren başlangıç saniyesi"""
+
+    def __init__(self, pcm, sample_rate, sample_width, channels=1, start=0.0):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.channels = channels
+        self.start = start
+
+    @property
+    def frame_size(self):
+        return self.sample_width * self.channels
+
+    @property
+    def duration(self):
+        return len(self.pcm) / (self.frame_size * self.sample_rate)
+
+    def to_mono16(self):
+        """Vosk gibi motorların beklediği 16 bit tek kanallı PCM"""
+        samples = pcm_samples(self.pcm, self.sample_width)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        return np.clip(samples, -32768, 32767).astype('<i2').tobytes()
+
+
+def read_audio(path):
+    """Ses dosyasını AudioClip olarak oku
+
+    WAV dosyaları wave modülüyle doğrudan okunur; AIFF/FLAC gibi diğer
+    biçimler speech_recognition ile çözülür.
+    """
+    if os.path.splitext(path)[1].lower() == '.wav':
+        with wave.open(path, 'rb') as f:
+            return AudioClip(f.readframes(f.getnframes()), f.getframerate(),
+                             f.getsampwidth(), f.getnchannels())
+
+    import speech_recognition as sr
+
+    with sr.AudioFile(path) as source:
+        audio = sr.Recognizer().record(source)
+    # Motorların hepsi 16 bit PCM'i destekler
+    return AudioClip(audio.get_raw_data(convert_width=2), audio.sample_rate, 2)
+
+
+def _frame_energy(clip, window_frames):
+    """Pencere başına ortalama mutlak genlik (sessizlik aramak için)"""
+    if clip.sample_width not in SUPPORTED_WIDTHS:
+        return None
+    samples = np.abs(pcm_samples(clip.pcm, clip.sample_width).reshape(-1, clip.channels)).mean(axis=1)
+    n_windows = len(samples) // window_frames
+    return samples[:n_windows * window_frames].reshape(n_windows, window_frames).mean(axis=1)
+
+
+def split_clip(clip, chunk_seconds=20.0, search_seconds=2.0, window_seconds=0.05):
+    """Uzun kaydı paralel çözümleme için parçalara böl
+
+    Kesim noktaları hedef uzunluğun etrafındaki search_seconds içinde en
+    sessiz pencereye kaydırılır; böylece kelimeler ortadan bölünmez.
+    """
+    total_frames = len(clip.pcm) // clip.frame_size
+    chunk_frames = int(chunk_seconds * clip.sample_rate)
+    if total_frames <= chunk_frames:
+        return [clip]
+
+    window_frames = max(1, int(window_seconds * clip.sample_rate))
+    energy = _frame_energy(clip, window_frames)
+    search_windows = int(search_seconds / window_seconds)
+
+    cuts = [0]
+    while total_frames - cuts[-1] > chunk_frames:
+        target = cuts[-1] + chunk_frames
+        if energy is not None:
+            center = target // window_frames
+            low = max(center - search_windows, cuts[-1] // window_frames + 1)
+            high = min(center + search_windows, len(energy))
+            if low < high:
+                target = (low + int(np.argmin(energy[low:high]))) * window_frames
+        cuts.append(target)
+    cuts.append(total_frames)
+
+    return [
+        AudioClip(clip.pcm[start * clip.frame_size:end * clip.frame_size], clip.sample_rate,
+                  clip.sample_width, clip.channels, clip.start + start / clip.sample_rate)
+        for start, end in zip(cuts[:-1], cuts[1:])
+    ]
+
+
+class GoogleASRBackend:
+    """speech_recognition üzerinden Google Web Speech (çevrimiçi)"""
+
+    def __init__(self):
+        import speech_recognition as sr
+
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, clip, language):
+        audio = self.sr.AudioData(clip.to_mono16(), clip.sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio, language=language)
+        except self.sr.UnknownValueError:
+            # Sessiz veya anlaşılamayan parça
+            return ""
+
+
+class SphinxBackend:
+    """speech_recognition üzerinden PocketSphinx (çevrimdışı)
+
+    language, PocketSphinx dil paketinin adıdır (ör. 'en-US') veya
+    (akustik model, dil modeli, sözlük) yollarından oluşan üçlüdür.
+    """
+
+    def __init__(self, language=None):
+        import speech_recognition as sr
+
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+        self.language = language
+
+    def transcribe(self, clip, language):
+        audio = self.sr.AudioData(clip.to_mono16(), clip.sample_rate, 2)
+        try:
+            return self.recognizer.recognize_sphinx(audio, language=self.language or language)
+        except self.sr.UnknownValueError:
+            return ""
+
+
+class VoskBackend:
+    """Diskteki Vosk modelleriyle çevrimdışı tanıma
+
+    Modeller model_dir/<dil> dizinlerinden (ör. models/vosk/tr) ilk
+    kullanımda bir kez yüklenir ve iş parçacıkları arasında paylaşılır.
+    Vosk akış tanımayı desteklediği için kısmi sonuçlar da üretebilir.
+    """
+
+    supports_streaming = True
+
+    def __init__(self, model_dir='models/vosk'):
+        import vosk
+
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model_dir = model_dir
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def model(self, language):
+        language = language.split('-')[0].lower()
+        with self._lock:
+            if language not in self._models:
+                path = os.path.join(self.model_dir, language)
+                if not os.path.isdir(path):
+                    raise FileNotFoundError(f"Vosk modeli bulunamadı: {path}")
+                self._models[language] = self.vosk.Model(path)
+            return self._models[language]
+
+    def recognizer(self, language, sample_rate):
+        return self.vosk.KaldiRecognizer(self.model(language), sample_rate)
+
+    def transcribe(self, clip, language):
+        recognizer = self.recognizer(language, clip.sample_rate)
+        recognizer.AcceptWaveform(clip.to_mono16())
+        return json.loads(recognizer.FinalResult()).get('text', '')
+
+    def open_stream(self, language, sample_rate):
+        return VoskStream(self.recognizer(language, sample_rate))
+
+
+class VoskStream:
+    """Vosk tanıyıcısı üzerinde artımlı (kısmi sonuçlu) tanıma"""
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.segments = []
+
+    def feed(self, pcm):
+        if self.recognizer.AcceptWaveform(pcm):
+            text = json.loads(self.recognizer.Result()).get('text', '')
+            if text:
+                self.segments.append(text)
+            return ' '.join(self.segments)
+        partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        return ' '.join(self.segments + ([partial] if partial else []))
+
+    def finish(self):
+        text = json.loads(self.recognizer.FinalResult()).get('text', '')
+        if text:
+            self.segments.append(text)
+        return ' '.join(self.segments)
+
+
+class TranscriptionJob:
+    """Parçalara bölünmüş bir kaydın kuyruktaki çözümleme işi"""
+
+    def __init__(self, futures):
+        self.futures = futures
+
+    @property
+    def progress(self):
+        """Tamamlanan parça oranı (0-1)"""
+        return sum(future.done() for future in self.futures) / len(self.futures)
+
+    def done(self):
+        return all(future.done() for future in self.futures)
+
+    def result(self, timeout=None):
+        """Parça metinlerini kayıt sırasıyla birleştir; hiç metin yoksa hata ver"""
+        texts = [future.result(timeout=timeout) for future in self.futures]
+        text = ' '.join(text.strip() for text in texts if text and text.strip())
+        if not text:
+            raise ValueError("Ses anlaşılamadı")
+        return text
+
+
+class StreamingTranscriber:
+    """Ses gelmeye devam ederken kısmi metin üreten akış tanıma
+
+    Arka uç akışı destekliyorsa (Vosk) her feed çağrısı güncel kısmi metni
+    döndürür. Desteklemiyorsa gelen ses segment_seconds'lık parçalara
+    toplanır, her parça kuyruğa gönderilir ve biten parçaların metni
+    kısmi sonuç olarak döner.
+    """
+
+    def __init__(self, service, language, sample_rate, sample_width=2, channels=1,
+                 segment_seconds=5.0):
+        self.service = service
+        self.language = language
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.channels = channels
+        self.segment_bytes = int(segment_seconds * sample_rate) * sample_width * channels
+        self.stream = None
+        if getattr(service.backend, 'supports_streaming', False):
+            self.stream = service.backend.open_stream(language, sample_rate)
+        self._buffer = bytearray()
+        self._futures = []
+        self._elapsed = 0.0
+
+    def _clip(self, pcm):
+        clip = AudioClip(bytes(pcm), self.sample_rate, self.sample_width, self.channels,
+                         start=self._elapsed)
+        self._elapsed += clip.duration
+        return clip
+
+    def _submit_segments(self, final=False):
+        while len(self._buffer) >= self.segment_bytes or (final and self._buffer):
+            pcm = self._buffer[:self.segment_bytes]
+            del self._buffer[:self.segment_bytes]
+            self._futures.append(self.service.submit_clip(self._clip(pcm), self.language))
+
+    def partial(self):
+        """Şu ana kadar tamamlanan parçaların metni"""
+        texts = []
+        for future in self._futures:
+            if not future.done():
+                break
+            texts.append(future.result())
+        return ' '.join(text for text in texts if text)
+
+    def feed(self, pcm):
+        """Yeni ses verisini ekle ve güncel kısmi metni döndür"""
+        if self.stream is not None:
+            clip = AudioClip(pcm, self.sample_rate, self.sample_width, self.channels)
+            return self.stream.feed(clip.to_mono16())
+        self._buffer.extend(pcm)
+        self._submit_segments()
+        return self.partial()
+
+    def finish(self, timeout=None):
+        """Kalan sesi çözümle ve tam metni döndür"""
+        if self.stream is not None:
+            return self.stream.finish()
+        self._submit_segments(final=True)
+        texts = [future.result(timeout=timeout) for future in self._futures]
+        return ' '.join(text for text in texts if text)
+
+
+class SpeechService:
+    """İş parçacığı havuzlu konuşma tanıma kuyruğu
+
+    Kayıtlar istek iş parçacığında yalnızca okunup parçalara bölünür;
+    tanıma havuzdaki işçilerde yapılır. Uzun kayıtların parçaları paralel
+    çözülür ve sonuçlar kayıt sırasıyla birleştirilir.
+    """
+
+    def __init__(self, backend, max_workers=2, chunk_seconds=20.0):
+        self.backend = backend
+        self.chunk_seconds = chunk_seconds
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='speech')
+
+    def submit_clip(self, clip, language):
+        return self.executor.submit(self.backend.transcribe, clip, language)
+
+    def submit(self, audio, language='tr'):
+        """Dosya yolu veya AudioClip için kuyruğa iş ekle; TranscriptionJob döner"""
+        clip = read_audio(audio) if isinstance(audio, str) else audio
+        chunks = split_clip(clip, self.chunk_seconds)
+        return TranscriptionJob([self.submit_clip(chunk, language) for chunk in chunks])
+
+    def transcribe(self, audio, language='tr', timeout=None):
+        """Kaydı çözümle ve metni döndür"""
+        return self.submit(audio, language).result(timeout=timeout)
+
+    def stream(self, language, sample_rate, sample_width=2, channels=1):
+        """Akış halinde gelen ses için StreamingTranscriber oluştur"""
+        return StreamingTranscriber(self, language, sample_rate, sample_width, channels)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+def create_speech_service(backend=None):
+    """Yapılandırmaya göre konuşma tanıma servisini oluştur
+
+    Arka uç SPEECH_BACKEND ortam değişkeniyle seçilir: 'google'
+    (varsayılan), 'vosk' (VOSK_MODEL_DIR altındaki modeller) veya 'sphinx'.
+    """
+    backend = backend or os.environ.get('SPEECH_BACKEND', 'google')
+    if backend == 'google':
+        backend = GoogleASRBackend()
+    elif backend == 'vosk':
+        backend = VoskBackend(os.environ.get('VOSK_MODEL_DIR', 'models/vosk'))
+    elif backend == 'sphinx':
+        backend = SphinxBackend(os.environ.get('SPHINX_LANGUAGE'))
+    elif isinstance(backend, str):
+        raise ValueError(f"Bilinmeyen konuşma tanıma arka ucu: {backend}")
+    return SpeechService(
+        backend,
+        max_workers=int(os.environ.get('SPEECH_WORKERS', 2)),
+        chunk_seconds=float(os.environ.get('SPEECH_CHUNK_SECONDS', 20))
+    )
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_speech_service():
+    """Süreç genelinde tek bir konuşma tanıma servisi döndür"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = create_speech_service()
+        return _service
@@ -1,16 +1,14 @@
-from googletrans import Translator
-import speech_recognition as sr
-from gtts import gTTS
 import streamlit as st
 import os
-import tempfile
 from datetime import datetime
 import json
+from translation_service import get_translation_service
+from speech_service import get_speech_service
+from tts_service import get_tts_service
+from report_templates import REPORT_LABELS, field_label_translations
 
 class TelehealthSystem:
     def __init__(self):
-        self.translator = Translator()
-        self.recognizer = sr.Recognizer()
         self.supported_languages = {
             'tr': 'Türkçe',
             'en': 'English',
@@ -23,6 +21,12 @@ class TelehealthSystem:
         
         # Tıbbi terimler sözlüğü
         self.medical_terms = self.load_medical_terms()
+        # Önbellekli, toplu çeviri servisi (süreç genelinde paylaşılır)
+        self.translation_service = get_translation_service(self.medical_terms)
+        # Konuşma tanıma işçi havuzunda yapılır (süreç genelinde paylaşılır)
+        self.speech_service = get_speech_service()
+        # Seslendirmeler içerik adresli disk önbelleğinden paylaşılır
+        self.tts_service = get_tts_service()
     
     def load_medical_terms(self):
         """Tıbbi terimleri yükle"""
@@ -38,21 +42,8 @@ class TelehealthSystem:
             if not text:
                 return ""
             
-            # Tıbbi terimleri koru
-            preserved_terms = {}
-            for term in self.medical_terms.get(target_lang, {}):
-                if term in text:
-                    preserved_terms[term] = self.medical_terms[target_lang][term]
-            
-            # Çeviri yap
-            translation = self.translator.translate(text, dest=target_lang)
-            result = translation.text
-            
-            # Tıbbi terimleri geri ekle
-            for term, translation in preserved_terms.items():
-                result = result.replace(term, translation)
-            
-            return result
+            # Çeviri önbellekten veya arka uçtan gelir; tıbbi terimler servis tarafından korunur
+            return self.translation_service.translate(text, target_lang)
         except Exception as e:
             st.error(f"Çeviri hatası: {str(e)}")
             return text
@@ -60,10 +51,16 @@ class TelehealthSystem:
     def speech_to_text(self, audio_file, language='tr'):
         """Ses dosyasını metne çevir"""
         try:
-            with sr.AudioFile(audio_file) as source:
-                audio = self.recognizer.record(source)
-                text = self.recognizer.recognize_google(audio, language=language)
-                return text
+            # Uzun kayıtlar parçalara bölünüp paralel çözülür
+            return self.speech_service.transcribe(audio_file, language)
+        except Exception as e:
+            st.error(f"Ses tanıma hatası: {str(e)}")
+            return None
+    
+    def submit_speech_to_text(self, audio_file, language='tr'):
+        """Ses dosyasını kuyruğa ekle; sonucu bloklamadan izlemek için TranscriptionJob döner"""
+        try:
+            return self.speech_service.submit(audio_file, language)
         except Exception as e:
             st.error(f"Ses tanıma hatası: {str(e)}")
             return None
@@ -71,10 +68,7 @@ class TelehealthSystem:
     def text_to_speech(self, text, language='tr'):
         """Metni sese çevir"""
         try:
-            tts = gTTS(text=text, lang=language)
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-                tts.save(fp.name)
-                return fp.name
+            return self.tts_service.synthesize(text, language)
         except Exception as e:
             st.error(f"Ses oluşturma hatası: {str(e)}")
             return None
@@ -84,11 +78,21 @@ class TelehealthSystem:
         report = f"SAĞLIK RAPORU / HEALTH REPORT\n"
         report += f"Tarih / Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n"
         
-        for key, value in report_data.items():
-            # Başlığı çevir
-            translated_key = self.translate_text(key, target_lang)
-            # Değeri çevir
-            translated_value = self.translate_text(str(value), target_lang)
+        # Bilinen alan adları önceden çevrilmiş etiketlerden gelir; yalnızca
+        # bilinmeyen başlıklar ve değerler tek seferde toplu olarak çevrilir
+        field_labels = field_label_translations(target_lang) if target_lang in REPORT_LABELS else {}
+        unknown_keys = [key for key in report_data if key not in field_labels]
+        texts = unknown_keys + [str(value) for value in report_data.values()]
+        try:
+            translated = self.translation_service.translate_many(texts, target_lang)
+        except Exception as e:
+            st.error(f"Çeviri hatası: {str(e)}")
+            translated = texts
+        key_translations = dict(zip(unknown_keys, translated))
+        translated_values = translated[len(unknown_keys):]
+        
+        for (key, value), translated_value in zip(report_data.items(), translated_values):
+            translated_key = field_labels.get(key) or key_translations[key]
             
             report += f"{key} / {translated_key}:\n"
             report += f"{value} / {translated_value}\n\n"
@@ -0,0 +1,281 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+
+
+class GoogleTranslateBackend:
+    """googletrans ile çevrimiçi çeviri
+
+    googletrans istemcisi iş parçacığı güvenli olmadığından her iş
+    parçacığı kendi Translator'ını kullanır; gruplar kilitsiz, paralel
+    çevrilir. googletrans liste verildiğinde her öğe için ayrı istek
+    attığından tek satırlık metinler satır sonuyla birleştirilip tek
+    istekte çevrilir ve sonuç satırlara geri bölünür.
+    """
+
+    separator = '\n'
+    # Google'ın tek istekteki karakter sınırının altında kalınır
+    max_chars = 4500
+
+    def __init__(self):
+        from googletrans import Translator
+
+        self._translator_class = Translator
+        self._local = threading.local()
+
+    def _translator(self):
+        translator = getattr(self._local, 'translator', None)
+        if translator is None:
+            translator = self._local.translator = self._translator_class()
+        return translator
+
+    def _translate_one(self, text, target_lang):
+        return self._translator().translate(text, dest=target_lang).text
+
+    def _translate_joined(self, texts, target_lang):
+        if len(texts) == 1:
+            return [self._translate_one(texts[0], target_lang)]
+        lines = self._translate_one(self.separator.join(texts), target_lang).split(self.separator)
+        if len(lines) != len(texts):
+            # Satır yapısı korunmadıysa metinler tek tek çevrilir
+            return [self._translate_one(text, target_lang) for text in texts]
+        return [line.strip() for line in lines]
+
+    def translate_batch(self, texts, target_lang):
+        # Çok satırlı veya çok uzun metinler kendi isteğinde çevrilir
+        groups, group, group_chars = [], [], 0
+        for index, text in enumerate(texts):
+            if self.separator in text or len(text) >= self.max_chars:
+                groups.append([index])
+                continue
+            if group and group_chars + len(text) + 1 > self.max_chars:
+                groups.append(group)
+                group, group_chars = [], 0
+            group.append(index)
+            group_chars += len(text) + 1
+        if group:
+            groups.append(group)
+
+        results = [None] * len(texts)
+        for group in groups:
+            for index, translation in zip(group, self._translate_joined([texts[i] for i in group],
+                                                                        target_lang)):
+                results[index] = translation
+        return results
+
+
+class DictionaryBackend:
+    """Sözlükten çevrimdışı çeviri; sözlükte olmayan metin olduğu gibi döner
+
+    phrases: {hedef_dil: {metin: çeviri}}. Testlerde ve ağ olmadan
+    çalışırken kullanılır.
+    """
+
+    def __init__(self, phrases=None):
+        self.phrases = phrases or {}
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def translate_batch(self, texts, target_lang):
+        phrases = self.phrases.get(target_lang, {})
+        return [phrases.get(text, text) for text in texts]
+
+
+class TranslationCache:
+    """(metin, hedef dil) anahtarlı kalıcı SQLite çeviri önbelleği"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS translations (
+            text TEXT NOT NULL,
+            target_lang TEXT NOT NULL,
+            translation TEXT NOT NULL,
+            PRIMARY KEY (text, target_lang)
+        );
+    """
+
+    # SQLite'ın tek sorgudaki parametre sınırının altında kalınır
+    max_query_params = 500
+
+    def __init__(self, db_path='data/translation_cache.db'):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # Her iş parçacığı kendi bağlantısını kullanır
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, texts, target_lang):
+        """Önbellekteki çevirileri {metin: çeviri} olarak döndür"""
+        found = {}
+        texts = list(texts)
+        conn = self._connect()
+        for start in range(0, len(texts), self.max_query_params):
+            chunk = texts[start:start + self.max_query_params]
+            placeholders = ', '.join('?' * len(chunk))
+            rows = conn.execute(
+                f'SELECT text, translation FROM translations '
+                f'WHERE target_lang = ? AND text IN ({placeholders})',
+                [target_lang] + chunk
+            ).fetchall()
+            found.update(rows)
+        return found
+
+    def put_many(self, translations, target_lang):
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO translations (text, target_lang, translation) VALUES (?, ?, ?)',
+                [(text, target_lang, translation) for text, translation in translations.items()]
+            )
+
+
+class MedicalTermMatcher:
+    """Dil başına tek bir derlenmiş düzenli ifade ile tıbbi terim eşleme
+
+    Terimler uzundan kısaya sıralanmış tek bir alternasyonda birleştirilir;
+    metin terim sayısından bağımsız olarak tek geçişte taranır. Terim
+    içermeyen metinler (çoğunluk) bu taramayla hemen döner; terim
+    içerenlerde eski sözlük sırasıyla ardışık replace uygulanır.
+    """
+
+    def __init__(self, medical_terms):
+        self.medical_terms = medical_terms
+        self.patterns = {}
+        for lang, terms in medical_terms.items():
+            if terms:
+                alternatives = sorted(terms, key=len, reverse=True)
+                self.patterns[lang] = re.compile('|'.join(re.escape(term) for term in alternatives))
+
+    def restore(self, source, translated, target_lang):
+        """Kaynakta geçen terimleri çeviride sözlükteki karşılıklarıyla değiştir"""
+        pattern = self.patterns.get(target_lang)
+        if pattern is None or pattern.search(source) is None:
+            return translated
+        for term, replacement in self.medical_terms[target_lang].items():
+            if term in source:
+                translated = translated.replace(term, replacement)
+        return translated
+
+
+class TranslationService:
+    """Önbellekli, toplu ve eşzamanlı çeviri katmanı
+
+    İstenen metinler tekilleştirilir ve önce kalıcı önbellekte aranır.
+    Eksikler batch_size'lık gruplar halinde arka uca gönderilir; gruplar
+    asyncio ile en fazla max_concurrency eşzamanlı istekle çevrilir.
+    Sonuçlar önbelleğe yazılır, tıbbi terimler sonra uygulanır.
+    """
+
+    def __init__(self, backend, cache=None, medical_terms=None, batch_size=20, max_concurrency=4):
+        self.backend = backend
+        self.cache = cache
+        self.term_matcher = MedicalTermMatcher(medical_terms or {})
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.stats = {'requested': 0, 'cache_hits': 0, 'backend_calls': 0}
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    def translate(self, text, target_lang):
+        """Tek metni çevir"""
+        return self.translate_many([text], target_lang)[0]
+
+    def translate_many(self, texts, target_lang):
+        """Metin listesini aynı sırayla çevir
+
+        Çağıran iş parçacığında çalışan bir olay döngüsü varsa iş servisin
+        kendi döngüsünde yürütülür; async kod doğrudan atranslate_many'yi
+        beklemelidir.
+        """
+        coroutine = self.atranslate_many(texts, target_lang)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        return asyncio.run_coroutine_threadsafe(coroutine, self._service_loop()).result()
+
+    def _service_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='translation-loop',
+                                 daemon=True).start()
+            return self._loop
+
+    async def atranslate_many(self, texts, target_lang):
+        texts = [str(text) if text is not None else "" for text in texts]
+        unique = [text for text in dict.fromkeys(texts) if text]
+        self.stats['requested'] += len(texts)
+
+        translations = self.cache.get_many(unique, target_lang) if self.cache is not None else {}
+        self.stats['cache_hits'] += len(translations)
+        missing = [text for text in unique if text not in translations]
+
+        if missing:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            batches = [missing[start:start + self.batch_size]
+                       for start in range(0, len(missing), self.batch_size)]
+            results = await asyncio.gather(*(self._translate_batch(batch, target_lang, semaphore)
+                                             for batch in batches))
+            fetched = {}
+            for batch, translated in zip(batches, results):
+                fetched.update(zip(batch, translated))
+            if self.cache is not None:
+                self.cache.put_many(fetched, target_lang)
+            translations.update(fetched)
+
+        return [self.term_matcher.restore(text, translations[text], target_lang) if text else ""
+                for text in texts]
+
+    async def _translate_batch(self, batch, target_lang, semaphore):
+        async with semaphore:
+            self.stats['backend_calls'] += 1
+            # Arka uçlar senkron; olay döngüsünü bloklamamak için iş parçacığında çalışır
+            return await asyncio.to_thread(self.backend.translate_batch, batch, target_lang)
+
+
+def create_translation_service(medical_terms=None, backend=None):
+    """Yapılandırmaya göre çeviri servisini oluştur
+
+    Arka uç TRANSLATION_BACKEND ortam değişkeniyle seçilir: 'google'
+    (varsayılan) veya 'dictionary' (TRANSLATION_DICTIONARY yolundaki JSON).
+    """
+    backend = backend or os.environ.get('TRANSLATION_BACKEND', 'google')
+    if backend == 'google':
+        backend = GoogleTranslateBackend()
+    elif backend == 'dictionary':
+        backend = DictionaryBackend.from_file(
+            os.environ.get('TRANSLATION_DICTIONARY', 'data/translations.json')
+        )
+    elif isinstance(backend, str):
+        raise ValueError(f"Bilinmeyen çeviri arka ucu: {backend}")
+    cache = TranslationCache(os.environ.get('TRANSLATION_CACHE_PATH', 'data/translation_cache.db'))
+    return TranslationService(backend, cache, medical_terms)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_translation_service(medical_terms=None):
+    """Süreç genelinde tek bir çeviri servisi döndür"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = create_translation_service(medical_terms)
+        return _service
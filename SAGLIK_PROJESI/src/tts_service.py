@@ -0,0 +1,275 @@
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Cümle sonları ve satır sonları bölme noktasıdır
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?…;:])\s+|\n+')
+
+
+def split_sentences(text, max_chars=200):
+    """Metni cümlelere böl ve kısa cümleleri max_chars'a kadar birleştir"""
+    pieces = []
+    current = ""
+    for sentence in SENTENCE_PATTERN.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def cache_key(text, lang, settings, backend):
+    """(metin, dil, ses ayarları, arka uç) için içerik adresi"""
+    payload = json.dumps([text, lang, settings or {}, backend], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AudioCache:
+    """Boyut sınırlı, içerik adresli disk ses önbelleği (LRU)
+
+    Dosyalar <root>/<anahtarın ilk 2 karakteri>/<anahtar>.<uzantı>
+    yolunda tutulur. Erişim sırası bellekte izlenir ve dosya değiştirilme
+    zamanına yansıtılır; yeniden başlatmada sıra bu zamanlardan kurulur.
+    Toplam boyut max_bytes'ı aşınca en uzun süredir kullanılmayanlar silinir.
+    """
+
+    def __init__(self, root='data/tts_cache', max_bytes=200 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        files = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(directory, name)
+                stat = os.stat(path)
+                files.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(files):
+            self._entries[self._key(path)] = (path, size)
+            self._size += size
+
+    def _key(self, path):
+        return os.path.splitext(os.path.basename(path))[0]
+
+    def _path(self, key, extension):
+        return os.path.join(self.root, key[:2], f"{key}{extension}")
+
+    def get(self, key):
+        """Önbellekteki ses verisini döndür; yoksa None
+
+        Dosya kilit altında okunur; aksi halde eşzamanlı bir put onu
+        okunmadan önce tahliye edip silebilir.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            try:
+                with open(entry[0], 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                # Dosya dışarıdan silinmiş
+                del self._entries[key]
+                self._size -= entry[1]
+                return None
+            self._entries.move_to_end(key)
+            try:
+                os.utime(entry[0])
+            except OSError:
+                pass
+        return data
+
+    def put(self, key, data, extension='.mp3'):
+        """Ses verisini yaz ve dosya yolunu döndür"""
+        path = self._path(key, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (path, len(data))
+            self._size += len(data)
+            self._evict()
+        return path
+
+    def _evict(self):
+        # Yeni yazılan kayıt (sonda) tek başına sınırı aşsa da korunur
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            _, (path, size) = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @property
+    def size(self):
+        return self._size
+
+
+class GTTSBackend:
+    """gTTS ile çevrimiçi MP3 sentezi; MP3 parçaları art arda eklenebilir"""
+
+    name = 'gtts'
+    extension = '.mp3'
+    concatenable = True
+
+    def synthesize(self, text, lang, settings=None):
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class Pyttsx3Backend:
+    """pyttsx3 ile çevrimdışı sentez (ses ayarları uygulanır)
+
+    pyttsx3 motoru iş parçacığı güvenli olmadığından tek kilitle kullanılır
+    ve metnin tamamı tek seferde, platformun ürettiği WAV olarak sentezlenir.
+    """
+
+    name = 'pyttsx3'
+    extension = '.wav'
+    concatenable = False
+
+    def __init__(self):
+        self._engine = None
+        self._lock = threading.Lock()
+
+    def _get_engine(self):
+        if self._engine is None:
+            import pyttsx3
+
+            self._engine = pyttsx3.init()
+        return self._engine
+
+    def _select_voice(self, engine, voice_name, lang):
+        for voice in engine.getProperty('voices'):
+            description = f"{voice.id} {voice.name} {getattr(voice, 'languages', '')}".lower()
+            if (voice_name and voice_name.lower() in description) or (lang and lang.lower() in description):
+                engine.setProperty('voice', voice.id)
+                return
+
+    def synthesize(self, text, lang, settings=None):
+        settings = settings or {}
+        with self._lock:
+            engine = self._get_engine()
+            if 'rate' in settings:
+                engine.setProperty('rate', settings['rate'])
+            if 'volume' in settings:
+                engine.setProperty('volume', settings['volume'])
+            self._select_voice(engine, settings.get('voice'), lang)
+            fd, path = tempfile.mkstemp(suffix=self.extension)
+            os.close(fd)
+            try:
+                engine.save_to_file(text, path)
+                engine.runAndWait()
+                with open(path, 'rb') as f:
+                    return f.read()
+            finally:
+                os.remove(path)
+
+
+class TTSService:
+    """Önbellekli, paralel metin-ses servisi
+
+    Sonuçlar (metin, dil, ses ayarları, arka uç) özetiyle önbelleğe
+    alınır; aynı metnin tekrar okunması tek dosya okumasından ibarettir
+    ve yeni dosya oluşturmaz. Önbellekte olmayan uzun metinler cümlelere
+    bölünüp birincil arka uçla paralel sentezlenir ve birleştirilir.
+    Birincil arka uç başarısız olursa yedek (çevrimdışı) arka uç kullanılır.
+    """
+
+    def __init__(self, primary, fallback=None, cache=None, max_workers=4, max_chars=200):
+        self.primary = primary
+        self.fallback = fallback
+        self.cache = cache or AudioCache()
+        self.max_chars = max_chars
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tts')
+        self.stats = {'hits': 0, 'misses': 0, 'fallbacks': 0}
+
+    def _synthesize(self, backend, text, lang, settings):
+        pieces = split_sentences(text, self.max_chars) if backend.concatenable else [text]
+        if len(pieces) == 1:
+            return backend.synthesize(pieces[0], lang, settings)
+        parts = self.executor.map(lambda piece: backend.synthesize(piece, lang, settings), pieces)
+        return b''.join(parts)
+
+    def _cached_or_synthesize(self, backend, text, lang, settings):
+        key = cache_key(text, lang, settings, backend.name)
+        data = self.cache.get(key)
+        if data is not None:
+            self.stats['hits'] += 1
+            return data
+        self.stats['misses'] += 1
+        data = self._synthesize(backend, text, lang, settings)
+        self.cache.put(key, data, backend.extension)
+        return data
+
+    def synthesize(self, text, lang='tr', settings=None):
+        """Metnin ses verisini (bayt) döndür"""
+        if not text or not text.strip():
+            raise ValueError("Seslendirilecek metin boş")
+        try:
+            return self._cached_or_synthesize(self.primary, text, lang, settings)
+        except Exception:
+            if self.fallback is None:
+                raise
+            self.stats['fallbacks'] += 1
+            return self._cached_or_synthesize(self.fallback, text, lang, settings)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+def create_tts_service():
+    """Yapılandırmaya göre metin-ses servisini oluştur
+
+    Önbellek dizini TTS_CACHE_DIR, boyut sınırı TTS_CACHE_MAX_MB ortam
+    değişkenleriyle ayarlanır. TTS_OFFLINE=1 ise yalnızca pyttsx3 kullanılır.
+    """
+    cache = AudioCache(
+        os.environ.get('TTS_CACHE_DIR', 'data/tts_cache'),
+        int(float(os.environ.get('TTS_CACHE_MAX_MB', 200)) * 1024 * 1024)
+    )
+    if os.environ.get('TTS_OFFLINE') == '1':
+        return TTSService(Pyttsx3Backend(), cache=cache)
+    return TTSService(GTTSBackend(), Pyttsx3Backend(), cache)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_tts_service():
+    """Süreç genelinde tek bir metin-ses servisi döndür"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = create_tts_service()
+        return _service
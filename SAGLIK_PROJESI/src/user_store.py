@@ -0,0 +1,230 @@
+import atexit
+import base64
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: yalnızca süreç içi kilit kullanılır
+    fcntl = None
+
+
+class UserStore:
+    """users.json için bellek içi indeks ve geride yazma (write-behind) önbelleği
+
+    Her hesap işlemi bellekteki sözlüğü günceller ve günlük (journal)
+    dosyasına tek satır ekler; bu O(1) maliyetlidir ve çökmeye karşı
+    kaydı korur. Tam users.json dosyası değişiklikler birleştirilerek en
+    fazla flush_interval saniyede bir, geçici dosya + os.replace ile
+    atomik olarak yazılır.
+
+    Aynı dosyayı birden çok sunucu süreci kullanabilir: günlüğe ekleme ve
+    yazma süreçler arası kilit (flock) altında yapılır. refresh,
+    users.json değiştiyse dosyayı yeniden okur, değişmediyse günlüğün
+    yalnızca son okunan konumdan sonraki satırlarını uygular. Yazmadan
+    önce her zaman refresh yapılır; böylece yazılan anlık görüntü tüm
+    süreçlerin günlüğe düşmüş işlemlerini içerir ve günlük güvenle silinir.
+    """
+
+    def __init__(self, users_file='data/users.json', flush_interval=2.0):
+        self.users_file = users_file
+        self.journal_file = f"{users_file}.journal"
+        self.lock_file = f"{users_file}.lock"
+        self.flush_interval = flush_interval
+        self.users = {}
+        # Kullanıcıların diske yazılacak (şifresi base64) kopyaları
+        self._encoded = {}
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._timer = None
+        # Okunan users.json'un imzası ve günlükte uygulanan son konum
+        self._file_signature = None
+        self._journal_offset = 0
+        self.load()
+        atexit.register(self.flush)
+
+    @contextmanager
+    def locked(self):
+        """Süreç içi ve süreçler arası özel kilit"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_file, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _encode(self, user_data):
+        """Bytes şifreyi JSON'a yazılabilir string'e çevir"""
+        user_copy = user_data.copy()
+        if isinstance(user_data.get('password'), bytes):
+            user_copy['password'] = base64.b64encode(user_data['password']).decode('utf-8')
+        return user_copy
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.users_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def load(self):
+        """users.json'u oku ve günlükteki yarım kalmış işlemleri uygula"""
+        with self.locked():
+            self._reload()
+            if self._dirty:
+                # Kurtarılan işlemleri hemen kalıcı dosyaya işle
+                self._write_snapshot()
+            return self.users
+
+    def refresh(self):
+        """Başka süreçlerin yaptığı değişiklikleri uygula (değişiklik yoksa yalnızca stat)"""
+        with self.locked():
+            if self._signature() != self._file_signature:
+                self._reload()
+            elif self._replay_journal():
+                self._dirty = True
+            return self.users
+
+    def _reload(self):
+        signature = self._signature()
+        try:
+            with open(self.users_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+                users = json.loads(content) if content.strip() else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            users = {}
+            self._dirty = True
+
+        # PatientManagement aynı sözlüğü tuttuğundan nesne değiştirilmez
+        self.users.clear()
+        self.users.update(users)
+        self._encoded = {username: user.copy() for username, user in users.items()}
+        self._file_signature = signature
+        self._journal_offset = 0
+        if self._replay_journal():
+            self._dirty = True
+
+    def _replay_journal(self):
+        """Günlükte son okunan konumdan sonraki tam satırları uygula"""
+        try:
+            with open(self.journal_file, 'rb') as f:
+                f.seek(self._journal_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return 0
+
+        replayed = 0
+        # Sonu satır sonuyla bitmeyen parça yazılmakta olan (veya çökmede kalan) satırdır
+        complete = data[:data.rfind(b'\n') + 1]
+        self._journal_offset += len(complete)
+        for line in complete.splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Çökme sırasında yarım kalmış satır
+                continue
+            username = entry['username']
+            if entry['op'] == 'delete':
+                self.users.pop(username, None)
+                self._encoded.pop(username, None)
+            else:
+                self.users[username] = entry['data'].copy()
+                self._encoded[username] = entry['data']
+            replayed += 1
+        return replayed
+
+    def _append_journal(self, entry):
+        """Kilit altında çağrılır; önce diğer süreçlerin satırları uygulanır"""
+        if self._signature() != self._file_signature:
+            self._reload()
+        else:
+            self._replay_journal()
+        line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+        with open(self.journal_file, 'ab') as f:
+            if f.tell() > self._journal_offset:
+                # Çökmede yarım kalmış satır sonraki kayda yapışmasın
+                line = b'\n' + line
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            self._journal_offset = f.tell()
+
+    def set(self, username, user_data):
+        """Kullanıcıyı ekle veya güncelle"""
+        with self.locked():
+            encoded = self._encode(user_data)
+            self._append_journal({'op': 'set', 'username': username, 'data': encoded})
+            self.users[username] = user_data
+            self._encoded[username] = encoded
+            self._mark_dirty()
+
+    def delete(self, username):
+        """Kullanıcıyı sil"""
+        with self.locked():
+            self._append_journal({'op': 'delete', 'username': username})
+            self.users.pop(username, None)
+            self._encoded.pop(username, None)
+            self._mark_dirty()
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Bekleyen değişiklikleri users.json'a atomik olarak yaz"""
+        with self.locked():
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return False
+            # Başka bir süreç bu arada yazdıysa onun anlık görüntüsü ve günlüğü birleştirilir
+            if self._signature() != self._file_signature:
+                self._reload()
+            else:
+                self._replay_journal()
+            self._write_snapshot()
+            return True
+
+    def _write_snapshot(self):
+        """Kilit altında çağrılır; bellekteki durum günlüğün tamamını içerir"""
+        tmp_file = f"{self.users_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._encoded, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.users_file)
+        self._file_signature = self._signature()
+
+        # Günlüğün sonuna kadar okunan tüm satırlar anlık görüntüye işlendi
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self._journal_offset = 0
+        self._dirty = False
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_user_store(users_file='data/users.json'):
+    """Dosya başına süreç genelinde tek bir UserStore döndür
+
+    Streamlit her etkileşimde PatientManagement'ı yeniden oluşturur; aynı
+    dosya için birden fazla önbellek olursa birbirlerinin yazdıklarını
+    ezebilirler.
+    """
+    key = os.path.abspath(users_file)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = UserStore(users_file)
+        return _stores[key]
@@ -0,0 +1,263 @@
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: yalnızca süreç içi kilitler kullanılır
+    fcntl = None
+
+
+def read_lines_reverse(path, block_size=8192):
+    """Dosyanın satırlarını sondan başa doğru, tamamını okumadan döndür"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b''
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size) + remainder
+            lines = block.split(b'\n')
+            # İlk parça bir önceki bloğun devamı olabilir
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line
+        if remainder.strip():
+            yield remainder
+
+
+class VisitLog:
+    """Hasta başına yalnızca ekleme yapılan JSON Lines ziyaret günlüğü
+
+    Her ziyaret <id>_history.jsonl dosyasına tek satır olarak eklenir; dosya
+    yeniden yazılmaz, böylece kayıt maliyeti geçmişin uzunluğundan
+    bağımsızdır. fsync çağrıları arka planda toplu yapılır (en geç
+    fsync_interval saniye). Ekleme ve sıkıştırma aynı hasta için hem süreç
+    içinde hem de süreçler arasında (flock) kilitlenir. Çökme sırasında
+    yarım kalan son satır okumada atlanır ve sıkıştırmada temizlenir.
+    """
+
+    def __init__(self, history_dir='data/patient_history', fsync_interval=1.0):
+        self.history_dir = history_dir
+        self.fsync_interval = fsync_interval
+        os.makedirs(self.history_dir, exist_ok=True)
+
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._dirty = set()
+        self._dirty_lock = threading.Lock()
+        self._flusher = None
+
+    def log_file(self, patient_id):
+        return os.path.join(self.history_dir, f"{patient_id}_history.jsonl")
+
+    def legacy_file(self, patient_id):
+        return os.path.join(self.history_dir, f"{patient_id}_history.json")
+
+    def _lock_file(self, patient_id):
+        return os.path.join(self.history_dir, f"{patient_id}_history.lock")
+
+    @contextmanager
+    def locked(self, patient_id):
+        """Hasta günlüğü için süreç içi ve süreçler arası özel kilit"""
+        with self._locks_guard:
+            lock = self._locks.setdefault(patient_id, threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._lock_file(patient_id), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _ensure_migrated(self, patient_id):
+        if os.path.exists(self.legacy_file(patient_id)):
+            with self.locked(patient_id):
+                self._migrate_legacy(patient_id)
+
+    def _migrate_legacy(self, patient_id):
+        """Eski tek parça JSON geçmişini JSON Lines biçimine bir kez dönüştür"""
+        legacy_file = self.legacy_file(patient_id)
+        if not os.path.exists(legacy_file) or os.path.exists(self.log_file(patient_id)):
+            return
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+        self._write_atomic(patient_id, history)
+        os.remove(legacy_file)
+
+    def _write_atomic(self, patient_id, visits):
+        """Günlüğü geçici dosyaya yazıp rename ile atomik olarak değiştir"""
+        log_file = self.log_file(patient_id)
+        tmp_file = f"{log_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for visit in visits:
+                f.write(json.dumps(visit, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, log_file)
+
+    def append(self, patient_id, visit_data):
+        """Ziyareti günlüğün sonuna ekle (O(1) G/Ç)"""
+        line = (json.dumps(visit_data, ensure_ascii=False) + '\n').encode('utf-8')
+        with self.locked(patient_id):
+            self._migrate_legacy(patient_id)
+            fd = os.open(self.log_file(patient_id), os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                # Önceki yazım yarım kaldıysa yeni kayıt onunla birleşmesin
+                if os.lseek(fd, 0, os.SEEK_END) > 0:
+                    os.lseek(fd, -1, os.SEEK_END)
+                    if os.read(fd, 1) != b'\n':
+                        line = b'\n' + line
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        self._mark_dirty(self.log_file(patient_id))
+
+    def _parse(self, line):
+        try:
+            return json.loads(line)
+        except ValueError:
+            # Çökme sonucu yarım kalmış satır
+            return None
+
+    def read(self, patient_id):
+        """Tüm ziyaretleri kronolojik sırada döndür"""
+        return list(self.iter(patient_id))
+
+    def _iter_lines(self, patient_id, reverse):
+        path = self.log_file(patient_id)
+        try:
+            if reverse:
+                yield from read_lines_reverse(path)
+            else:
+                with open(path, 'rb') as f:
+                    yield from (line for line in f if line.strip())
+        except FileNotFoundError:
+            return
+
+    def iter(self, patient_id, reverse=False, before=None, after=None):
+        """Ziyaretleri dosyanın tamamını belleğe almadan dolaş
+
+        reverse=True en yeni ziyaretten başlar ve dosyayı sondan okur.
+        before/after zaman damgası imleçleridir (ISO biçimi, hariç). Günlük
+        ekleme sırasıyla yazıldığından, imleç aralığının dışına çıkıldığında
+        okuma durur.
+        """
+        self._ensure_migrated(patient_id)
+        for line in self._iter_lines(patient_id, reverse):
+            visit = self._parse(line)
+            if visit is None:
+                continue
+            timestamp = visit.get('timestamp', '')
+            if before is not None and timestamp >= before:
+                if reverse:
+                    continue
+                return
+            if after is not None and timestamp <= after:
+                if reverse:
+                    return
+                continue
+            yield visit
+
+    def last(self, patient_id):
+        """Son ziyareti dosyanın yalnızca sonunu okuyarak döndür"""
+        self._ensure_migrated(patient_id)
+        try:
+            for line in read_lines_reverse(self.log_file(patient_id)):
+                visit = self._parse(line)
+                if visit is not None:
+                    return visit
+        except FileNotFoundError:
+            pass
+        return None
+
+    def clear(self, patient_id):
+        """Hastanın ziyaret günlüğünü sil"""
+        with self.locked(patient_id):
+            for path in (self.log_file(patient_id), self.legacy_file(patient_id)):
+                if os.path.exists(path):
+                    os.remove(path)
+        with self._dirty_lock:
+            self._dirty.discard(self.log_file(patient_id))
+
+    def compact(self, patient_id):
+        """Bozuk satırları ayıklayıp günlüğü atomik olarak yeniden yaz"""
+        with self.locked(patient_id):
+            self._migrate_legacy(patient_id)
+            try:
+                with open(self.log_file(patient_id), 'rb') as f:
+                    visits = [self._parse(line) for line in f if line.strip()]
+            except FileNotFoundError:
+                return 0
+            visits = [visit for visit in visits if visit is not None]
+            self._write_atomic(patient_id, visits)
+            return len(visits)
+
+    def _mark_dirty(self, path):
+        with self._dirty_lock:
+            self._dirty.add(path)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        """Bekleyen fsync'leri aralıklarla toplu yap; iş kalmayınca dur"""
+        while True:
+            time.sleep(self.fsync_interval)
+            self.flush()
+            with self._dirty_lock:
+                if not self._dirty:
+                    self._flusher = None
+                    return
+
+    def flush(self):
+        """Bekleyen eklemeleri diske zorla (fsync); işlenen dosya sayısını döndür"""
+        with self._dirty_lock:
+            paths, self._dirty = self._dirty, set()
+        for path in paths:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        return len(paths)
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def get_visit_log(history_dir='data/patient_history'):
+    """Dizin başına süreç genelinde paylaşılan ziyaret günlüğünü döndür
+
+    Kilitler ve bekleyen fsync listesi aynı dizini kullanan tüm
+    depolamalar arasında paylaşılır; her yeni depolama nesnesi için yeni
+    günlük oluşturulmaz.
+    """
+    key = os.path.realpath(history_dir)
+    with _logs_lock:
+        if key not in _logs:
+            _logs[key] = VisitLog(history_dir)
+        return _logs[key]
+
+
+def _flush_all():
+    with _logs_lock:
+        logs = list(_logs.values())
+    for log in logs:
+        log.flush()
+
+
+atexit.register(_flush_all)
@@ -0,0 +1,301 @@
+import copy
+import math
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+import numpy as np
+
+SECONDS_PER_DAY = 86400.0
+
+# Raporlarda kullanılan pencereler
+WINDOWS = {
+    '7d': timedelta(days=7),
+    '30d': timedelta(days=30),
+    '90d': timedelta(days=90)
+}
+
+
+def to_days(timestamp):
+    """Zaman damgasını epoch'tan itibaren gün cinsine çevir"""
+    return np.datetime64(timestamp, 'us').astype(np.int64) / 1e6 / SECONDS_PER_DAY
+
+
+class RollingVitalStats:
+    """Zaman penceresi üzerinde artımlı (O(1)) istatistikler
+
+    Ortalama/varyans ve eğim için toplamlar, pencereden çıkan ölçüm
+    çıkarılarak güncellenir. Sayısal kararlılık için değerler ilk ölçüme,
+    zamanlar serinin başlangıcına göre kaydırılır. Min/maks monoton
+    kuyruklarla, EWMA tek adımda hesaplanır. Pencere yalnızca ileri
+    akar: son ölçümden eski zamanlı (geç gelen/geriye dönük) ölçümler
+    reddedilir, latest ve eğim bozulmaz; bu ölçümler yalnızca depoda yer
+    alır.
+    """
+
+    def __init__(self, window=timedelta(days=7), alpha=0.3):
+        self.window_days = window.total_seconds() / SECONDS_PER_DAY
+        self.alpha = alpha
+        self.readings = deque()
+        self._min = deque()
+        self._max = deque()
+        self._origin = None
+        self._shift = None
+        self._sum = self._sum_sq = 0.0
+        self._sum_t = self._sum_tt = self._sum_tv = 0.0
+        self.ewma = None
+        self.latest = None
+        # Son kabul edilen ölçüm zamanı (pencere boşalsa da korunur)
+        self._last = None
+
+    @property
+    def count(self):
+        return len(self.readings)
+
+    def _add(self, t, value):
+        v = value - self._shift
+        self._sum += v
+        self._sum_sq += v * v
+        self._sum_t += t
+        self._sum_tt += t * t
+        self._sum_tv += t * v
+
+    def _remove(self, t, value):
+        v = value - self._shift
+        self._sum -= v
+        self._sum_sq -= v * v
+        self._sum_t -= t
+        self._sum_tt -= t * t
+        self._sum_tv -= t * v
+
+    def expire(self, now):
+        """Pencere dışında kalan ölçümleri çıkar (now: datetime)"""
+        if self._origin is None:
+            return
+        cutoff = to_days(now) - self._origin - self.window_days
+        while self.readings and self.readings[0][0] < cutoff:
+            t, value = self.readings.popleft()
+            self._remove(t, value)
+            if self._min and self._min[0][0] == t:
+                self._min.popleft()
+            if self._max and self._max[0][0] == t:
+                self._max.popleft()
+        if not self.readings:
+            # Biriken kayan nokta hatası sıfırlanır
+            self._sum = self._sum_sq = 0.0
+            self._sum_t = self._sum_tt = self._sum_tv = 0.0
+
+    def accepts(self, timestamp):
+        """Ölçüm zaman sırasını bozmuyor mu (son ölçümle aynı an kabul edilir)"""
+        return self._last is None or to_days(timestamp) - self._origin >= self._last
+
+    def update(self, value, timestamp):
+        """Yeni ölçümü ekle; zaman sırasını bozan ölçüm eklenmez ve False döner"""
+        if not self.accepts(timestamp):
+            return False
+        value = float(value)
+        if self._origin is None:
+            self._origin = to_days(timestamp)
+            self._shift = value
+        self.expire(timestamp)
+        t = to_days(timestamp) - self._origin
+        self._last = t
+
+        self.readings.append((t, value))
+        self._add(t, value)
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((t, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((t, value))
+
+        self.ewma = value if self.ewma is None else self.alpha * value + (1 - self.alpha) * self.ewma
+        self.latest = value
+        return True
+
+    @property
+    def mean(self):
+        if not self.readings:
+            return None
+        return self._shift + self._sum / self.count
+
+    @property
+    def variance(self):
+        """Örneklem varyansı"""
+        n = self.count
+        if n < 2:
+            return None
+        return max(0.0, (self._sum_sq - self._sum * self._sum / n) / (n - 1))
+
+    @property
+    def std(self):
+        variance = self.variance
+        return None if variance is None else math.sqrt(variance)
+
+    @property
+    def minimum(self):
+        return self._min[0][1] if self._min else None
+
+    @property
+    def maximum(self):
+        return self._max[0][1] if self._max else None
+
+    @property
+    def slope(self):
+        """En küçük kareler eğimi (birim/gün)"""
+        n = self.count
+        if n < 2:
+            return None
+        sxx = self._sum_tt - self._sum_t * self._sum_t / n
+        if sxx <= 0:
+            return None
+        return (self._sum_tv - self._sum_t * self._sum / n) / sxx
+
+    @property
+    def span_days(self):
+        if self.count < 2:
+            return 0.0
+        return self.readings[-1][0] - self.readings[0][0]
+
+    def trend(self, tolerance=0.1):
+        """Eğimin pencere boyunca yol açtığı değişim ortalamanın %10'unu aşıyor mu"""
+        slope = self.slope
+        if slope is None:
+            return 'stable'
+        change = slope * self.span_days
+        if change > abs(self.mean) * tolerance:
+            return 'increasing'
+        if change < -abs(self.mean) * tolerance:
+            return 'decreasing'
+        return 'stable'
+
+    def copy(self):
+        """Sonraki güncellemelerden etkilenmeyen kopya"""
+        clone = copy.copy(self)
+        clone.readings = deque(self.readings)
+        clone._min = deque(self._min)
+        clone._max = deque(self._max)
+        return clone
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'latest': self.latest,
+            'mean': self.mean,
+            'std': self.std,
+            'min': self.minimum,
+            'max': self.maximum,
+            'ewma': self.ewma,
+            'slope': self.slope,
+            'trend': self.trend()
+        }
+
+
+class VitalsMonitor:
+    """Hasta ve yaşamsal değer türü başına kayan istatistikler ve uyarılar
+
+    Her seri için WINDOWS'taki pencerelerin istatistikleri birlikte
+    tutulur ve depo dosyasından beslenir: seri süreçte ilk kez
+    görüldüğünde en uzun pencere kadar geçmiş okunur, sonraki her
+    erişimde yalnızca son okunan kayıttan sonra eklenenler (başka
+    süreçlerin yazdıkları dahil) O(1) maliyetle işlenir. Ölçüm normal
+    aralığın dışındaysa veya kısa pencerenin ortalamasından k_sigma
+    standart sapmadan fazla uzaksa uyarı üretilir. Sapma, kısa pencere
+    ölçüm zamanına kadar kaydırıldıktan sonra hesaplanır; geç gelen
+    ölçümler yalnızca aralık kontrolünden geçer ve istatistiklere eklenmez.
+    """
+
+    def __init__(self, vitals_store, vital_ranges, k_sigma=3.0, min_samples=10, alpha=0.3):
+        self.vitals_store = vitals_store
+        self.vital_ranges = vital_ranges
+        self.k_sigma = k_sigma
+        self.min_samples = min_samples
+        self.alpha = alpha
+        # Seri -> pencereler; seri -> depo dosyasında okunan kayıt sayısı
+        self._series = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+
+    def _get(self, patient_id, vital_type):
+        """Pencereleri depodaki yeni kayıtlarla güncelle (kilit altında çağrılır)"""
+        key = (str(patient_id), vital_type)
+        windows = self._series.get(key)
+        if windows is None:
+            windows = self._series[key] = {name: RollingVitalStats(window, self.alpha)
+                                           for name, window in WINDOWS.items()}
+        timestamps, values, self._positions[key] = self.vitals_store.read_since(
+            patient_id, vital_type, self._positions.get(key, 0))
+        if len(timestamps):
+            order = np.argsort(timestamps, kind='stable')
+            start = np.datetime64(datetime.now() - max(WINDOWS.values()), 'us')
+            for timestamp, value in zip(timestamps[order], values[order]):
+                if timestamp < start:
+                    continue
+                for stats in windows.values():
+                    stats.update(value, timestamp)
+        return windows
+
+    def observe(self, patient_id, vital_type, value, timestamp):
+        """Ölçümü depodaki geçmişe göre kontrol et ve (varsa) uyarıları döndür
+
+        Ölçüm istatistiklere depoya yazıldıktan sonraki ilk erişimde
+        girer; depoya yazılmadan önce çağrılmalıdır.
+        """
+        with self._lock:
+            recent = self._get(patient_id, vital_type)['7d']
+            if recent.accepts(timestamp):
+                recent.expire(timestamp)
+            else:
+                recent = None
+            return self._check(vital_type, float(value), recent)
+
+    def _check(self, vital_type, value, stats):
+        alerts = []
+        vital_range = self.vital_ranges.get(vital_type)
+        if vital_range is not None:
+            unit = vital_range['unit']
+            if value < vital_range['min']:
+                alerts.append({
+                    'type': 'range',
+                    'message': f"{value:g} {unit} normal aralığın altında (min {vital_range['min']} {unit})"
+                })
+            elif value > vital_range['max']:
+                alerts.append({
+                    'type': 'range',
+                    'message': f"{value:g} {unit} normal aralığın üstünde (maks {vital_range['max']} {unit})"
+                })
+
+        std = None if stats is None else stats.std
+        if std and stats.count >= self.min_samples:
+            z_score = (value - stats.mean) / std
+            if abs(z_score) > self.k_sigma:
+                alerts.append({
+                    'type': 'sigma',
+                    'z_score': round(z_score, 2),
+                    'message': f"{value:g} son 7 günün ortalamasından {abs(z_score):.1f} standart sapma uzakta"
+                })
+        return alerts
+
+    def stats(self, patient_id, vital_type, time_range='7d', now=None):
+        """Pencere istatistiklerinin şimdiye göre güncellenmiş kopyasını döndür"""
+        with self._lock:
+            stats = self._get(patient_id, vital_type).get(time_range)
+            if stats is None:
+                return None
+            stats.expire(now or datetime.now())
+            return stats.copy()
+
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+
+def get_vitals_monitor(vitals_store, vital_ranges):
+    """Depo dizini başına süreç genelinde tek bir VitalsMonitor döndür"""
+    key = os.path.realpath(vitals_store.root)
+    with _monitors_lock:
+        monitor = _monitors.get(key)
+        if monitor is None:
+            monitor = _monitors[key] = VitalsMonitor(vitals_store, vital_ranges)
+        return monitor
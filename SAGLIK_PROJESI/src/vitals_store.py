@@ -0,0 +1,187 @@
+import os
+import threading
+import numpy as np
+
+# Diskteki kayıt biçimi: mikro saniye çözünürlüklü zaman damgası + değer (16 bayt)
+RECORD_DTYPE = np.dtype([('timestamp', '<i8'), ('value', '<f8')])
+
+
+def to_timestamp(value):
+    """datetime / pandas Timestamp / ISO metni epoch mikro saniyeye çevir"""
+    return int(np.datetime64(value, 'us').astype(np.int64))
+
+
+class VitalSeries:
+    """Tek bir hasta ve yaşamsal değer türü için bellekteki sıralı diziler
+
+    Kapasite ikiye katlanarak büyütülür; böylece ekleme amortize O(1),
+    zaman aralığı sorgusu searchsorted ile O(log n) olur.
+    """
+
+    def __init__(self, timestamps, values):
+        order = np.argsort(timestamps, kind='stable')
+        self._timestamps = np.ascontiguousarray(timestamps[order])
+        self._values = np.ascontiguousarray(values[order])
+        self.size = len(order)
+
+    @property
+    def timestamps(self):
+        return self._timestamps[:self.size]
+
+    @property
+    def values(self):
+        return self._values[:self.size]
+
+    def _grow(self):
+        capacity = max(16, 2 * len(self._timestamps))
+        timestamps = np.empty(capacity, dtype=np.int64)
+        values = np.empty(capacity, dtype=np.float64)
+        timestamps[:self.size] = self.timestamps
+        values[:self.size] = self.values
+        self._timestamps, self._values = timestamps, values
+
+    def append(self, timestamps, values):
+        for timestamp, value in zip(timestamps, values):
+            if self.size == len(self._timestamps):
+                self._grow()
+            # Geç gelen ölçüm sıralı konumuna yerleştirilir (nadir durum)
+            position = self.size
+            if self.size and timestamp < self._timestamps[self.size - 1]:
+                position = int(np.searchsorted(self.timestamps, timestamp, side='right'))
+                self._timestamps[position + 1:self.size + 1] = self._timestamps[position:self.size]
+                self._values[position + 1:self.size + 1] = self._values[position:self.size]
+            self._timestamps[position] = timestamp
+            self._values[position] = value
+            self.size += 1
+
+    def range(self, start=None, end=None):
+        """[start, end] aralığındaki ölçümler (kopyalanmadan görünüm olarak)"""
+        timestamps = self.timestamps
+        lo = 0 if start is None else np.searchsorted(timestamps, start, side='left')
+        hi = self.size if end is None else np.searchsorted(timestamps, end, side='right')
+        return timestamps[lo:hi], self.values[lo:hi]
+
+
+class VitalsStore:
+    """Hasta ve yaşamsal değer türü başına yalnızca ekleme yapılan ikili zaman serisi
+
+    Her seri data/vitals/<hasta>/<tür>.bin dosyasında sabit boyutlu
+    kayıtlar olarak tutulur; ekleme dosyanın sonuna tek bir yazma ile
+    yapılır. Seri ilk kullanımda belleğe alınır ve sonraki eklemelerle
+    güncel tutulur; başka bir süreç dosyaya eklediyse yalnızca yeni
+    kayıtlar okunur. Çökme sonucu yarım kalan son kayıt yok sayılır.
+    """
+
+    def __init__(self, root='data/vitals'):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+        self._series = {}
+        # Seri başına diskte okunmuş bayt sayısı
+        self._offsets = {}
+        self._lock = threading.Lock()
+
+    def series_file(self, patient_id, vital_type):
+        return os.path.join(self.root, str(patient_id), f"{vital_type}.bin")
+
+    def _read_records(self, path, offset):
+        try:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return np.empty(0, dtype=RECORD_DTYPE), offset
+        complete = len(data) - len(data) % RECORD_DTYPE.itemsize
+        records = np.frombuffer(data[:complete], dtype=RECORD_DTYPE)
+        return records, offset + complete
+
+    def _load(self, patient_id, vital_type):
+        """Seriyi bellekte güncelle (kilit altında çağrılır)"""
+        key = (str(patient_id), vital_type)
+        path = self.series_file(patient_id, vital_type)
+        offset = self._offsets.get(key, 0)
+        try:
+            if os.path.getsize(path) - offset < RECORD_DTYPE.itemsize and key in self._series:
+                return self._series[key]
+        except FileNotFoundError:
+            return self._series.get(key)
+
+        records, self._offsets[key] = self._read_records(path, offset)
+        if key not in self._series:
+            self._series[key] = VitalSeries(records['timestamp'].astype(np.int64),
+                                            records['value'].astype(np.float64))
+        elif len(records):
+            self._series[key].append(records['timestamp'], records['value'])
+        return self._series[key]
+
+    def append(self, patient_id, vital_type, value, timestamp):
+        """Ölçümü serinin sonuna ekle"""
+        self.append_many(patient_id, vital_type, [value], [timestamp])
+
+    def append_many(self, patient_id, vital_type, values, timestamps):
+        """Birden çok ölçümü tek yazma ile ekle"""
+        records = np.empty(len(values), dtype=RECORD_DTYPE)
+        records['timestamp'] = [to_timestamp(timestamp) for timestamp in timestamps]
+        records['value'] = values
+
+        path = self.series_file(patient_id, vital_type)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                # Önceki yazım yarım kaldıysa kayıt hizası korunsun
+                size = os.lseek(fd, 0, os.SEEK_END)
+                if size % RECORD_DTYPE.itemsize:
+                    os.ftruncate(fd, size - size % RECORD_DTYPE.itemsize)
+                os.write(fd, records.tobytes())
+            finally:
+                os.close(fd)
+            # Yeni kayıtlar (araya giren başka süreç eklemeleriyle birlikte) dosyadan alınır
+            self._load(patient_id, vital_type)
+
+    def range(self, patient_id, vital_type, start=None, end=None):
+        """Zaman aralığındaki ölçümleri (datetime64[us] zamanlar, değerler) döndür
+
+        Seri hiç yoksa None döner.
+        """
+        start = None if start is None else to_timestamp(start)
+        end = None if end is None else to_timestamp(end)
+        with self._lock:
+            series = self._load(patient_id, vital_type)
+            if series is None:
+                return None
+            timestamps, values = series.range(start, end)
+            # Sonraki eklemeler diziyi değiştirebilir; çağırana kopya ver
+            return timestamps.astype('datetime64[us]'), values.copy()
+
+    def read_since(self, patient_id, vital_type, position=0):
+        """Dosyada position. kayıttan sonra eklenenleri yazılma sırasıyla döndür
+
+        (datetime64[us] zamanlar, değerler, yeni konum) döner; konum kayıt
+        sayısıdır ve bir sonraki çağrıya verilir. Başka süreçlerin
+        eklemeleri de dosyadan okunduğu için görülür.
+        """
+        path = self.series_file(patient_id, vital_type)
+        records, end = self._read_records(path, position * RECORD_DTYPE.itemsize)
+        return (records['timestamp'].astype('datetime64[us]'), records['value'].astype(np.float64),
+                end // RECORD_DTYPE.itemsize)
+
+    def vital_types(self, patient_id):
+        """Hastanın kayıtlı yaşamsal değer türleri"""
+        try:
+            file_names = os.listdir(os.path.join(self.root, str(patient_id)))
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len('.bin')] for name in file_names if name.endswith('.bin'))
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_vitals_store(root='data/vitals'):
+    """Dizin başına süreç genelinde tek bir VitalsStore döndür"""
+    key = os.path.abspath(root)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = VitalsStore(root)
+        return _stores[key]
@@ -0,0 +1,373 @@
+import argparse
+import itertools
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: yalnızca süreç içi kilitler kullanılır
+    fcntl = None
+
+# Ölçüm sütunları ve kabul edilen fizyolojik aralıklar (dışındaki satırlar reddedilir)
+WEARABLE_SCHEMA = {
+    'heart_rate': (20, 250),
+    'spo2': (50, 100),
+    'steps': (0, 100000),
+    'temperature': (30, 45),
+    'calories': (0, 20000)
+}
+
+REQUIRED_COLUMNS = ['patient_id', 'timestamp']
+
+# patient_id dizin adı olarak kullanıldığından yalnızca güvenli karakterler kabul edilir
+PATIENT_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+def validate_batch(df):
+    """Şemaya uymayan satırları ayıkla
+
+    patient_id ve timestamp zorunludur; patient_id yalnızca harf, rakam,
+    '_' ve '-' içerebilir. Ölçüm sütunları sayıya çevrilir, eksik ölçümler
+    NaN kalır. Geçerli satırlar ve reddedilen satır sayısı
+    döner.
+    """
+    batch = pd.DataFrame(index=df.index)
+    valid = np.ones(len(df), dtype=bool)
+
+    for column in REQUIRED_COLUMNS:
+        if column not in df.columns:
+            return batch.iloc[0:0], len(df)
+
+    batch['patient_id'] = df['patient_id'].astype(str)
+    valid &= df['patient_id'].notna().to_numpy()
+    valid &= batch['patient_id'].str.fullmatch(PATIENT_ID_PATTERN.pattern).fillna(False).to_numpy(dtype=bool)
+    # Saat dilimli zamanlar UTC'ye çevrilir, dilimsizler olduğu gibi kalır
+    batch['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce', utc=True).dt.tz_localize(None)
+    valid &= batch['timestamp'].notna().to_numpy()
+
+    for column, (low, high) in WEARABLE_SCHEMA.items():
+        if column in df.columns:
+            values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)
+        else:
+            values = np.full(len(df), np.nan)
+        # Eksik ölçüm kabul edilir, aralık dışı ölçüm kabul edilmez
+        valid &= np.isnan(values) | ((values >= low) & (values <= high))
+        batch[column] = values
+
+    return batch[valid], int((~valid).sum())
+
+
+def read_batches(source, batch_size=5000):
+    """Cihaz dışa aktarımını bellek sınırlı parçalar halinde oku
+
+    .jsonl/.json (JSON Lines) ve .csv dosyaları desteklenir; DataFrame'ler
+    batch_size satırlık parçalar olarak döner.
+    """
+    extension = os.path.splitext(source)[1].lower()
+    if extension in ('.jsonl', '.json'):
+        reader = pd.read_json(source, lines=True, chunksize=batch_size,
+                              dtype={'patient_id': str}, convert_dates=False)
+    elif extension == '.csv':
+        reader = pd.read_csv(source, chunksize=batch_size, dtype={'patient_id': str})
+    else:
+        raise ValueError(f"Desteklenmeyen dosya biçimi: {extension}")
+    with reader:
+        yield from reader
+
+
+def batch_records(records, batch_size=5000):
+    """Kayıt (dict) akışını DataFrame parçalarına böl"""
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, batch_size))
+        if not chunk:
+            return
+        yield pd.DataFrame.from_records(chunk)
+
+
+class WearableStore:
+    """Hasta ve gün bazında bölümlenmiş, sütunsal (npz) giyilebilir cihaz deposu
+
+    Her parça data/wearables/<hasta>/<gün>/part-*.npz dosyasıdır ve
+    zaman damgası ile her ölçüm sütunu için ayrı bir dizi içerir. Parçalar
+    yalnızca eklenir (geçici dosya + os.replace); okumada gün dizinleri
+    zaman aralığına göre elenir. compact ile bir günün parçaları
+    birleştirilir: birleşik parça yerini aldığı parçaların adlarını
+    'replaces' dizisinde taşır ve okuyucular bu parçaları yok sayar.
+    Böylece eski parçalar silinmeden önce de (eşzamanlı okuma veya
+    çökme) satırlar iki kez görülmez. Sıkıştırma bölüm başına süreçler
+    arası kilitle yapılır.
+    """
+
+    def __init__(self, root='data/wearables'):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+        self._real_root = os.path.realpath(self.root)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._compact_locks = {}
+
+    def _partition_dir(self, patient_id, day=None):
+        """Bölüm dizini; kök dizinin dışına çıkan yollar reddedilir"""
+        parts = [str(patient_id)] if day is None else [str(patient_id), str(day)]
+        directory = os.path.join(self.root, *parts)
+        real = os.path.realpath(directory)
+        if os.path.commonpath([self._real_root, real]) != self._real_root or real == self._real_root:
+            raise ValueError(f"Geçersiz bölüm yolu: {directory}")
+        return directory
+
+    def _part_name(self):
+        with self._lock:
+            sequence = next(self._counter)
+        return f"part-{time.time_ns()}-{os.getpid()}-{sequence}.npz"
+
+    def _write_part(self, directory, arrays):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self._part_name())
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+        return path
+
+    def split(self, batch):
+        """Doğrulanmış parçayı {(hasta, gün): sütun dizileri} bölümlerine ayır"""
+        if batch.empty:
+            return {}
+        timestamps = batch['timestamp'].to_numpy(dtype='datetime64[us]')
+        days = timestamps.astype('datetime64[D]')
+        patient_ids = batch['patient_id'].to_numpy()
+        columns = {column: batch[column].to_numpy(dtype=np.float64) for column in WEARABLE_SCHEMA}
+
+        # Tek sıralama ile bölümler ardışık dilimlere ayrılır
+        patient_codes = pd.factorize(patient_ids)[0]
+        order = np.lexsort((timestamps, days, patient_codes))
+        codes, sorted_days = patient_codes[order], days[order]
+        boundaries = np.flatnonzero((codes[1:] != codes[:-1]) |
+                                    (sorted_days[1:] != sorted_days[:-1])) + 1
+        partitions = {}
+        for segment in np.split(order, boundaries):
+            arrays = {'timestamp': timestamps[segment].astype(np.int64)}
+            for column, values in columns.items():
+                arrays[column] = values[segment]
+            partitions[(str(patient_ids[segment[0]]), str(days[segment[0]]))] = arrays
+        return partitions
+
+    def write(self, partitions):
+        """Her bölüm için tek parça yaz; birden çok dizi verilen bölümler birleştirilir"""
+        for (patient_id, day), arrays in partitions.items():
+            if isinstance(arrays, list):
+                arrays = {name: np.concatenate([part[name] for part in arrays]) for name in arrays[0]}
+                order = np.argsort(arrays['timestamp'], kind='stable')
+                arrays = {name: values[order] for name, values in arrays.items()}
+            self._write_part(self._partition_dir(patient_id, day), arrays)
+        return len(partitions)
+
+    def append(self, batch):
+        """Doğrulanmış parçayı hasta/gün bölümlerine yaz; yazılan parça sayısı döner"""
+        return self.write(self.split(batch))
+
+    def _part_files(self, directory):
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        return sorted(os.path.join(directory, name) for name in names
+                      if name.startswith('part-') and name.endswith('.npz'))
+
+    def _load_part(self, path):
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    def _live_parts(self, directory, attempts=3):
+        """Bölümün geçerli parçaları ve birleşik parçalarca geçersiz kılınmış dosyalar
+
+        Listeleme ile okuma arasında sıkıştırma parçaları silerse liste
+        yenilenir.
+        """
+        for attempt in range(attempts):
+            paths = self._part_files(directory)
+            try:
+                parts = {path: self._load_part(path) for path in paths}
+            except FileNotFoundError:
+                if attempt == attempts - 1:
+                    raise
+                continue
+            replaced = set()
+            for part in parts.values():
+                replaced.update(part.pop('replaces', np.array([], dtype=str)).tolist())
+            live = {path: part for path, part in parts.items() if os.path.basename(path) not in replaced}
+            superseded = [path for path in parts if os.path.basename(path) in replaced]
+            return live, superseded
+
+    @contextmanager
+    def _compact_lock(self, directory):
+        with self._lock:
+            lock = self._compact_locks.setdefault(directory, threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            # Nokta ile başlayan ad part-*.npz listesine girmez
+            with open(os.path.join(directory, '.compact.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def patient_ids(self):
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.isdir(os.path.join(self.root, name)))
+
+    def days(self, patient_id, start=None, end=None):
+        """Hastanın (isteğe bağlı aralıktaki) kayıtlı günleri"""
+        try:
+            names = os.listdir(self._partition_dir(patient_id))
+        except FileNotFoundError:
+            return []
+        start_day = None if start is None else str(pd.Timestamp(start).date())
+        end_day = None if end is None else str(pd.Timestamp(end).date())
+        # ISO tarih adları metin olarak da doğru sıralanır
+        return sorted(name for name in names
+                      if (start_day is None or name >= start_day) and
+                      (end_day is None or name <= end_day))
+
+    def read(self, patient_id=None, start=None, end=None):
+        """Aralıktaki ölçümleri zaman sırasıyla tek DataFrame olarak döndür"""
+        patient_ids = self.patient_ids() if patient_id is None else [str(patient_id)]
+        frames = []
+        for pid in patient_ids:
+            arrays = [part
+                      for day in self.days(pid, start, end)
+                      for part in self._live_parts(self._partition_dir(pid, day))[0].values()]
+            if not arrays:
+                continue
+            frame = pd.DataFrame({
+                name: np.concatenate([part[name] for part in arrays])
+                for name in ['timestamp'] + list(WEARABLE_SCHEMA)
+            })
+            frame['timestamp'] = frame['timestamp'].astype('datetime64[us]')
+            frame.insert(0, 'patient_id', pid)
+            frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=REQUIRED_COLUMNS + list(WEARABLE_SCHEMA))
+        df = pd.concat(frames, ignore_index=True)
+        if start is not None:
+            df = df[df['timestamp'] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df['timestamp'] <= pd.Timestamp(end)]
+        return df.sort_values(['patient_id', 'timestamp'], kind='stable').reset_index(drop=True)
+
+    def part_count(self, patient_id, day):
+        return len(self._part_files(self._partition_dir(patient_id, day)))
+
+    def compact(self, patient_id, day):
+        """Bir günün parçalarını tek sıralı parçada birleştir"""
+        directory = self._partition_dir(patient_id, day)
+        if not os.path.isdir(directory):
+            return 0
+        with self._compact_lock(directory):
+            live, superseded = self._live_parts(directory)
+            if len(live) >= 2:
+                parts = list(live.values())
+                merged = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+                order = np.argsort(merged['timestamp'], kind='stable')
+                merged = {name: values[order] for name, values in merged.items()}
+                # Yazıldığı anda eski parçaların yerini alır; silme sonra yapılır
+                merged['replaces'] = np.array([os.path.basename(path) for path in live])
+                self._write_part(directory, merged)
+                superseded += list(live)
+            for path in superseded:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        return min(len(live), 1)
+
+
+class WearableIngestor:
+    """Akış halindeki cihaz verisini doğrulayıp bölüm tamponlarıyla depoya ekler
+
+    Mikro parçalar bölüm (hasta, gün) başına bellekte biriktirilir ve her
+    içe alma çağrısının sonunda ya da tamponda flush_rows satır
+    birikince her bölüm için tek parça olarak yazılır. Çağrı sonunda parça
+    sayısı max_parts'ı aşan bölümler sıkıştırılır; böylece okuma
+    maliyeti içe alma sayısıyla büyümez.
+    """
+
+    def __init__(self, store, batch_size=5000, flush_rows=500000, max_parts=8):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_rows = flush_rows
+        self.max_parts = max_parts
+
+    def ingest_batches(self, batches):
+        stats = {'read': 0, 'accepted': 0, 'rejected': 0, 'parts': 0}
+        pending = {}
+        pending_rows = 0
+        touched = set()
+        for batch in batches:
+            valid, rejected = validate_batch(batch)
+            stats['read'] += len(batch)
+            stats['accepted'] += len(valid)
+            stats['rejected'] += rejected
+            for key, arrays in self.store.split(valid).items():
+                pending.setdefault(key, []).append(arrays)
+            pending_rows += len(valid)
+            if pending_rows >= self.flush_rows:
+                stats['parts'] += self.store.write(pending)
+                touched.update(pending)
+                pending, pending_rows = {}, 0
+        stats['parts'] += self.store.write(pending)
+        touched.update(pending)
+
+        for patient_id, day in touched:
+            if self.store.part_count(patient_id, day) > self.max_parts:
+                self.store.compact(patient_id, day)
+        return stats
+
+    def ingest_file(self, path):
+        """JSON Lines veya CSV dışa aktarımını içe al"""
+        return self.ingest_batches(read_batches(path, self.batch_size))
+
+    def ingest_records(self, records):
+        """dict kayıtlarını veya DataFrame'i içe al"""
+        if isinstance(records, pd.DataFrame):
+            batches = (records.iloc[start:start + self.batch_size]
+                       for start in range(0, len(records), self.batch_size))
+        else:
+            batches = batch_records(records, self.batch_size)
+        return self.ingest_batches(batches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Giyilebilir cihaz verisini içe al")
+    parser.add_argument('inputs', nargs='+', help="JSON Lines veya CSV dosyaları")
+    parser.add_argument('--root', default='data/wearables')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--compact', action='store_true', help="İçe aldıktan sonra günleri birleştir")
+    args = parser.parse_args()
+
+    store = WearableStore(args.root)
+    ingestor = WearableIngestor(store, args.batch_size)
+    for path in args.inputs:
+        start = time.perf_counter()
+        stats = ingestor.ingest_file(path)
+        elapsed = time.perf_counter() - start
+        print(f"{path}: {stats['accepted']} kabul, {stats['rejected']} red, "
+              f"{stats['read'] / max(elapsed, 1e-9):.0f} satır/sn")
+    if args.compact:
+        for patient_id in store.patient_ids():
+            for day in store.days(patient_id):
+                store.compact(patient_id, day)
+
+
+if __name__ == "__main__":
+    main()